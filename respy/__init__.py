@@ -18,9 +18,16 @@ from respy.likelihood import get_log_like_func  # noqa: F401
 from respy.method_of_simulated_moments import get_diag_weighting_matrix  # noqa: F401
 from respy.method_of_simulated_moments import get_flat_moments  # noqa: F401
 from respy.method_of_simulated_moments import get_moment_errors_func  # noqa: F401
+from respy.pre_processing.data_processing import (  # noqa: F401
+    collapse_identical_histories,
+)
+from respy.resampling import create_bootstrap_weights  # noqa: F401
+from respy.resampling import create_jackknife_weights  # noqa: F401
+from respy.resampling import get_replicate_log_like_func  # noqa: F401
 from respy.simulate import get_simulate_func  # noqa: F401
 from respy.solve import get_solve_func  # noqa: F401
 from respy.tests.random_model import add_noise_to_params  # noqa: F401
+from respy.tuning import tune_monte_carlo_options  # noqa: F401
 
 
 __all__ = [
@@ -33,6 +40,11 @@ __all__ = [
     "get_diag_weighting_matrix",
     "get_flat_moments",
     "add_noise_to_params",
+    "tune_monte_carlo_options",
+    "collapse_identical_histories",
+    "get_replicate_log_like_func",
+    "create_bootstrap_weights",
+    "create_jackknife_weights",
 ]
 
 __version__ = "2.1.1"
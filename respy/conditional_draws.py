@@ -1,23 +1,28 @@
 """Everything related to conditional draws for the maximum likelihood estimation."""
+import numba as nb
 import numpy as np
 from estimagic.utilities import robust_cholesky
 from numba import guvectorize
 
 from respy.config import MAX_FLOAT
-from respy.config import MAX_LOG_FLOAT
+from respy.draws import fill_antithetic_standard_normal_draws
+from respy.draws import fill_standard_normal_draws
 
 
-def create_draws_and_log_prob_wages(
+def update_shocks_and_log_prob_wages(
     log_wage_observed,
     wages_systematic,
-    base_draws,
     choices,
     shocks_cholesky,
     n_wages,
     meas_sds,
     has_meas_error,
 ):
-    """Evaluate likelihood of observed wages and create conditional draws.
+    """Evaluate likelihood of observed wages and update the distribution of shocks.
+
+    Instead of the conditional draws, the function returns the parameters of the
+    conditional distributions such that the draws can be computed when they are needed
+    with :func:`fill_conditional_draw`.
 
     Let n_obs be the number of period-individual combinations, i.e. the number of rows
     of the empirical dataset.
@@ -25,17 +30,14 @@ def create_draws_and_log_prob_wages(
     Parameters
     ----------
     log_wage_observed : numpy.ndarray
-        Array with shape (n_obs * n_types,) containing observed log wages.
+        Array with shape (n_obs,) containing observed log wages.
     wages_systematic : numpy.ndarray
-        Array with shape (n_obs * n_types, n_choices) containing systematic wages. Can
-        contain numpy.nan or any number for non-wage choices. The non-wage choices only
-        have to be there to not raise index errors.
-    base_draws : numpy.ndarray
-        Array with shape (n_draws, n_choices) with standard normal random variables.
+        Array with shape (n_obs, n_choices) containing systematic wages. Can contain
+        numpy.nan or any number for non-wage choices. The non-wage choices only have to
+        be there to not raise index errors.
     choices : numpy.ndarray
-        Array with shape (n_obs * n_types,) containing observed choices. Is used to
-        select columns of systematic wages. Therefore it has to be coded starting at
-        zero.
+        Array with shape (n_obs,) containing observed choices. Is used to select columns
+        of systematic wages. Therefore it has to be coded starting at zero.
     shocks_cholesky : numpy.ndarray
         Array with shape (n_choices, n_choices) with the lower triangular Cholesky
         factor of the covariance matrix of the shocks.
@@ -49,16 +51,20 @@ def create_draws_and_log_prob_wages(
 
     Returns
     -------
-    draws : numpy.ndarray
-        Array with shape (n_obs * n_types, n_draws, n_choices) containing shocks drawn
-        from a multivariate normal distribution conditional on the observed wages.
+    updated_means : numpy.ndarray
+        Array with shape (n_obs, n_choices) containing the means of the shocks
+        conditional on the observed wages before wage shocks are exponentiated.
     log_prob_wages : numpy.ndarray
-        Array with shape (n_obs * n_types,) containing the unconditional log likelihood
-        of the observed wages, correcting for measurement error if necessary.
+        Array with shape (n_obs,) containing the unconditional log likelihood of the
+        observed wages, correcting for measurement error if necessary.
+    updated_chols : numpy.ndarray
+        Array with shape (n_wages + 1, n_choices, n_choices) containing the Cholesky
+        factors of the conditional covariance matrices. See :func:`update_cholcov`.
+    chol_indices : numpy.ndarray
+        Array with shape (n_obs,) containing the index of the relevant Cholesky factor
+        for each observation.
 
     """
-    n_obs, n_choices = wages_systematic.shape
-
     choices = choices.astype(np.uint16)
     relevant_systematic_wages = np.choose(choices, wages_systematic.T)
     log_wage_systematic = np.log(
@@ -78,11 +84,8 @@ def create_draws_and_log_prob_wages(
         updated_chols = update_cholcov(shocks_cholesky, n_wages)
 
     chol_indices = np.where(np.isfinite(log_wage_observed), choices, n_wages)
-    draws = calculate_conditional_draws(
-        base_draws, updated_means, updated_chols, chol_indices, MAX_LOG_FLOAT
-    )
 
-    return draws, log_prob_wages
+    return updated_means, log_prob_wages, updated_chols, chol_indices
 
 
 @guvectorize(
@@ -274,55 +277,102 @@ def update_cholcov(shocks_cholesky, n_wages):
     return updated_chols
 
 
-@guvectorize(
-    ["f8[:, :], f8[:], f8[:, :, :], u2, f8, f8[:, :]"],
-    "(n_draws, n_choices), (n_choices), (n_wages_plus_one, n_choices, n_choices), (), "
-    "() -> (n_draws, n_choices)",
-    nopython=True,
-)
-def calculate_conditional_draws(
-    base_draws, updated_mean, updated_chols, chol_index, max_log_float, conditional_draw
+@nb.njit
+def transform_base_draw(
+    base_draw, updated_mean, updated_chol, n_wages, max_log_float, conditional_draw
+):
+    """Transform one vector of base draws to a conditional draw."""
+    n_choices = base_draw.shape[0]
+
+    for i in range(n_choices):
+        cd = updated_mean[i]
+        for j in range(i + 1):
+            cd += base_draw[j] * updated_chol[i, j]
+        if i < n_wages:
+            if cd > max_log_float:
+                cd = max_log_float
+            cd = np.exp(cd)
+        conditional_draw[i] = cd
+
+
+@nb.njit(inline="always")
+def fill_conditional_draw(
+    base_draws,
+    seed,
+    rows,
+    antithetic,
+    observation,
+    draw,
+    updated_mean,
+    updated_chol,
+    n_wages,
+    max_log_float,
+    base_draw,
+    conditional_draw,
 ):
-    """Calculate the conditional draws from base draws, updated means and updated chols.
+    """Fill an array with one conditional draw of one observation.
 
-    We need to pass ``max_log_float`` to the function, because the global variables
-    ``MAX_LOG_FLOAT`` cannot be used directly within the guvectorize.
+    The function allows to compute conditional draws one at a time inside a kernel
+    without allocating all of them in advance. It is inlined because it is called once
+    per draw.
 
     Parameters
     ----------
-    base_draws : np.ndarray
-        iid standard normal draws
-    updated_mean : np.ndarray
-        conditional mean, given the observed shock. Contains the observed shock in the
-        corresponding position.
-    updated_chols : np.ndarray
-        cholesky factor of conditional covariance, given the observed shock. If there is
-        no measurement error, it contains a zero column and row at the position of the
-        observed shock.
-    chol_index : float
-        index of the relevant updated cholesky factor
+    base_draws : numpy.ndarray
+        Array with shape (n_obs, n_draws, n_choices) with stored base draws. If it has
+        a single row, the row is shared by all observations, e.g., the nodes of a
+        quadrature rule. If it has no rows, the base draws are counter-based.
+    seed : int
+        Seed of the counter-based draws.
+    rows : numpy.ndarray
+        Array with shape (n_obs,) containing the global ids of the observations for
+        counter-based draws.
+    antithetic : bool
+        Whether the counter-based draws are antithetic.
+    observation : int
+        Index of the observation.
+    draw : int
+        Index of the draw.
+    updated_mean : numpy.ndarray
+        Array with shape (n_choices,) containing the conditional mean of the shocks.
+    updated_chol : numpy.ndarray
+        Array with shape (n_choices, n_choices) containing the Cholesky factor of the
+        conditional covariance matrix of the shocks.
+    n_wages : int
+        Number of wage sectors.
     max_log_float : float
         Value at which numbers soon to be exponentiated are clipped.
-
-    Returns
-    -------
-    conditional draws : np.ndarray
-        draws from the conditional distribution of the shocks.
+    base_draw : numpy.ndarray
+        Scratch array with shape (n_choices,) for counter-based draws.
+    conditional_draw : numpy.ndarray
+        Array with shape (n_choices,) which is filled with the conditional draw.
 
     """
-    n_draws, n_choices = base_draws.shape
-    n_wages = len(updated_chols) - 1
-
-    for d in range(n_draws):
-        for i in range(n_choices):
-            cd = updated_mean[i]
-            for j in range(i + 1):
-                cd += base_draws[d, j] * updated_chols[chol_index, i, j]
-            if i < n_wages:
-                if cd > max_log_float:
-                    cd = max_log_float
-                cd = np.exp(cd)
-            conditional_draw[d, i] = cd
+    if base_draws.shape[0] == 0:
+        if antithetic:
+            fill_antithetic_standard_normal_draws(
+                seed, rows[observation], draw, base_draws.shape[1], base_draw
+            )
+        else:
+            fill_standard_normal_draws(seed, rows[observation], draw, base_draw)
+        transform_base_draw(
+            base_draw,
+            updated_mean,
+            updated_chol,
+            n_wages,
+            max_log_float,
+            conditional_draw,
+        )
+    else:
+        row = observation if base_draws.shape[0] > 1 else 0
+        transform_base_draw(
+            base_draws[row, draw],
+            updated_mean,
+            updated_chol,
+            n_wages,
+            max_log_float,
+            conditional_draw,
+        )
 
 
 def make_cholesky_unique(chol):
@@ -59,6 +59,7 @@ DEFAULT_OPTIONS = {
     "estimation_draws": 200,
     "estimation_seed": 1,
     "estimation_tau": 500,
+    "estimation_deduplicate_observations": False,
     "interpolation_points": -1,
     "simulation_agents": 1000,
     "simulation_seed": 2,
@@ -68,6 +69,17 @@ DEFAULT_OPTIONS = {
     "negative_choice_set": {},
     "monte_carlo_sequence": "random",
     "cache_compression": "snappy",
+    "cache_memory_limit": 1_000_000_000,
+    "solution_cache_memory_limit": 0,
+    "parallel_backend": None,
+    "n_jobs": None,
+    "state_space_path": None,
+    "state_space_cache": None,
+    "store_draws": True,
+    "emax_integration": "monte_carlo",
+    "quadrature_level": 3,
+    "variance_reduction": None,
+    "monte_carlo_standard_errors": False,
 }
 
 KEANE_WOLPIN_1994_MODELS = [f"kw_94_{suffix}" for suffix in ["one", "two", "three"]]
@@ -0,0 +1,691 @@
+"""Standard normal draws which are generated natively.
+
+The module contains two groups of generators.
+
+1. Counter-based draws which are generated on demand.
+2. Randomized quasi-Monte Carlo sequences, i.e., Owen-scrambled Sobol and scrambled
+   Halton sequences.
+
+Stored base draws for the estimation have the shape (n_obs, n_draws, n_choices) and the
+draws for the simulation are created twice with shape (n_agents * n_periods,
+n_choices). For large data sets, these arrays dominate the memory footprint although
+every draw is only used once per evaluation.
+
+A counter-based random number generator is a pure function of a key and a counter.
+Thus, the draw for observation ``row``, draw ``draw`` and choice ``choice`` can be
+recomputed wherever it is needed instead of keeping it in memory. This module
+implements the Philox4x32-10 generator of [1]_ and uses the Box-Muller transform to
+turn four 32-bit integers into two standard normal draws.
+
+Quasi-Monte Carlo sequences reach the same accuracy of the Monte Carlo integrations
+with far fewer points. To estimate the integration error and to avoid that every dense
+key uses exactly the same points, the sequences are randomized with a seed. Sobol
+sequences use the direction numbers of [2]_ and the nested uniform scrambling of [3]_.
+Halton sequences are scrambled with random permutations of the digits for every digit
+position. Uniform points are transformed to standard normal draws with the algorithm of
+[4]_.
+
+References
+----------
+.. [1] Salmon, J. K., Moraes, M. A., Dror, R. O., & Shaw, D. E. (2011). `Parallel
+       Random Numbers: As Easy as 1, 2, 3
+       <https://doi.org/10.1145/2063384.2063405>`_. *Proceedings of the International
+       Conference for High Performance Computing, Networking, Storage and Analysis.*
+.. [2] Joe, S., & Kuo, F. Y. (2008). `Constructing Sobol Sequences with Better
+       Two-Dimensional Projections <https://doi.org/10.1137/070709359>`_. *SIAM Journal
+       on Scientific Computing*, 30(5), 2635-2654.
+.. [3] Owen, A. B. (1995). Randomly Permuted (t,m,s)-Nets and (t,s)-Sequences. In
+       *Monte Carlo and Quasi-Monte Carlo Methods in Scientific Computing* (pp.
+       299-317). Springer, New York, NY.
+.. [4] Wichura, M. J. (1988). `Algorithm AS 241: The Percentage Points of the Normal
+       Distribution <https://doi.org/10.2307/2347330>`_. *Journal of the Royal
+       Statistical Society. Series C (Applied Statistics)*, 37(3), 477-484.
+
+"""
+import numba as nb
+import numpy as np
+
+
+_PHILOX_M0 = np.uint64(0xD2511F53)
+_PHILOX_M1 = np.uint64(0xCD9E8D57)
+_PHILOX_W0 = np.uint64(0x9E3779B9)
+_PHILOX_W1 = np.uint64(0xBB67AE85)
+_PHILOX_ROUNDS = 10
+_MASK_32 = np.uint64(0xFFFFFFFF)
+_SHIFT_32 = np.uint64(32)
+_SHIFT_5 = np.uint64(5)
+_SHIFT_6 = np.uint64(6)
+_TWO_TO_26 = 67_108_864.0
+_TWO_TO_53 = 9_007_199_254_740_992.0
+_TWO_TO_32 = 4_294_967_296.0
+_ONE_MINUS_EPS = 1 - 2**-53
+
+_SOBOL_BITS = 32
+_GOLDEN_GAMMA = np.uint64(0x9E3779B97F4A7C15)
+# Primitive polynomials and initial direction numbers of the first dimensions taken
+# from the file new-joe-kuo-6.21201 of [2]_.
+_SOBOL_POLYNOMIALS = [
+    1,
+    3,
+    7,
+    11,
+    13,
+    19,
+    25,
+    37,
+    41,
+    47,
+    55,
+    59,
+    61,
+    67,
+    91,
+    97,
+    103,
+    109,
+    115,
+    131,
+    137,
+    143,
+    145,
+    157,
+    167,
+    171,
+    185,
+    191,
+    193,
+    203,
+    211,
+    213,
+    229,
+    239,
+    241,
+    247,
+    253,
+    285,
+    299,
+    301,
+    333,
+    351,
+    355,
+    357,
+    361,
+    369,
+    391,
+    397,
+    425,
+    451,
+    463,
+    487,
+    501,
+    529,
+    539,
+    545,
+    557,
+    563,
+    601,
+    607,
+    617,
+    623,
+    631,
+    637,
+]
+_SOBOL_INITIAL_NUMBERS = [
+    [1],
+    [1],
+    [1, 3],
+    [1, 3, 1],
+    [1, 1, 1],
+    [1, 1, 3, 3],
+    [1, 3, 5, 13],
+    [1, 1, 5, 5, 17],
+    [1, 1, 5, 5, 5],
+    [1, 1, 7, 11, 19],
+    [1, 1, 5, 1, 1],
+    [1, 1, 1, 3, 11],
+    [1, 3, 5, 5, 31],
+    [1, 3, 3, 9, 7, 49],
+    [1, 1, 1, 15, 21, 21],
+    [1, 3, 1, 13, 27, 49],
+    [1, 1, 1, 15, 7, 5],
+    [1, 3, 1, 15, 13, 25],
+    [1, 1, 5, 5, 19, 61],
+    [1, 3, 7, 11, 23, 15, 103],
+    [1, 3, 7, 13, 13, 15, 69],
+    [1, 1, 3, 13, 7, 35, 63],
+    [1, 3, 5, 9, 1, 25, 53],
+    [1, 3, 1, 13, 9, 35, 107],
+    [1, 3, 1, 5, 27, 61, 31],
+    [1, 1, 5, 11, 19, 41, 61],
+    [1, 3, 5, 3, 3, 13, 69],
+    [1, 1, 7, 13, 1, 19, 1],
+    [1, 3, 7, 5, 13, 19, 59],
+    [1, 1, 3, 9, 25, 29, 41],
+    [1, 3, 5, 13, 23, 1, 55],
+    [1, 3, 7, 3, 13, 59, 17],
+    [1, 3, 1, 3, 5, 53, 69],
+    [1, 1, 5, 5, 23, 33, 13],
+    [1, 1, 7, 7, 1, 61, 123],
+    [1, 1, 7, 9, 13, 61, 49],
+    [1, 3, 3, 5, 3, 55, 33],
+    [1, 3, 1, 15, 31, 13, 49, 245],
+    [1, 3, 5, 15, 31, 59, 63, 97],
+    [1, 3, 1, 11, 11, 11, 77, 249],
+    [1, 3, 1, 11, 27, 43, 71, 9],
+    [1, 1, 7, 15, 21, 11, 81, 45],
+    [1, 3, 7, 3, 25, 31, 65, 79],
+    [1, 3, 1, 1, 19, 11, 3, 205],
+    [1, 1, 5, 9, 19, 21, 29, 157],
+    [1, 3, 7, 11, 1, 33, 89, 185],
+    [1, 3, 3, 3, 15, 9, 79, 71],
+    [1, 3, 7, 11, 15, 39, 119, 27],
+    [1, 1, 3, 1, 11, 31, 97, 225],
+    [1, 1, 1, 3, 23, 43, 57, 177],
+    [1, 3, 7, 7, 17, 17, 37, 71],
+    [1, 3, 1, 5, 27, 63, 123, 213],
+    [1, 1, 3, 5, 11, 43, 53, 133],
+    [1, 3, 5, 5, 29, 17, 47, 173, 479],
+    [1, 3, 3, 11, 3, 1, 109, 9, 69],
+    [1, 1, 1, 5, 17, 39, 23, 5, 343],
+    [1, 3, 1, 5, 25, 15, 31, 103, 499],
+    [1, 1, 1, 11, 11, 17, 63, 105, 183],
+    [1, 1, 5, 11, 9, 29, 97, 231, 363],
+    [1, 1, 5, 15, 19, 45, 41, 7, 383],
+    [1, 3, 7, 7, 31, 19, 83, 137, 221],
+    [1, 1, 1, 3, 23, 15, 111, 223, 83],
+    [1, 1, 5, 13, 31, 15, 55, 25, 161],
+    [1, 1, 3, 13, 25, 47, 39, 87, 257],
+]
+
+
+# Coefficients of the rational approximations of AS 241 in descending order.
+_AS241_A = (
+    2.5090809287301226727e3,
+    3.3430575583588128105e4,
+    6.7265770927008700853e4,
+    4.5921953931549871457e4,
+    1.3731693765509461125e4,
+    1.9715909503065514427e3,
+    1.3314166789178437745e2,
+    3.3871328727963666080e0,
+)
+_AS241_B = (
+    5.2264952788528545610e3,
+    2.8729085735721942674e4,
+    3.9307895800092710610e4,
+    2.1213794301586595867e4,
+    5.3941960214247511077e3,
+    6.8718700749205790830e2,
+    4.2313330701600911252e1,
+    1.0,
+)
+_AS241_C = (
+    7.74545014278341407640e-4,
+    2.27238449892691845833e-2,
+    2.41780725177450611770e-1,
+    1.27045825245236838258e0,
+    3.64784832476320460504e0,
+    5.76949722146069140550e0,
+    4.63033784615654529590e0,
+    1.42343711074968357734e0,
+)
+_AS241_D = (
+    1.05075007164441684324e-9,
+    5.47593808499534494600e-4,
+    1.51986665636164571966e-2,
+    1.48103976427480074590e-1,
+    6.89767334985100004550e-1,
+    1.67638483018380384940e0,
+    2.05319162663775882187e0,
+    1.0,
+)
+_AS241_E = (
+    2.01033439929228813265e-7,
+    2.71155556874348757815e-5,
+    1.24266094738807843860e-3,
+    2.65321895265761230930e-2,
+    2.96560571828504891230e-1,
+    1.78482653991729133580e0,
+    5.46378491116411436990e0,
+    6.65790464350110377720e0,
+)
+_AS241_F = (
+    2.04426310338993978564e-15,
+    1.42151175831644588870e-7,
+    1.84631831751005468180e-5,
+    7.86869131145613259100e-4,
+    1.48753612908506148525e-2,
+    1.36929880922735805310e-1,
+    5.99832206555887937690e-1,
+    1.0,
+)
+
+
+class CounterBasedDraws:
+    """Standard normal draws which are computed instead of stored.
+
+    The object behaves like a read-only array with shape (n_rows, n_draws, n_choices)
+    or (n_rows, n_choices) if ``n_draws`` is ``None``. Every row is identified by a
+    global id such that subsets of rows, e.g., all observations of one dense key,
+    reproduce exactly the same draws as the complete set.
+
+    Parameters
+    ----------
+    seed : int
+        Seed which is used as the key of the generator.
+    rows : numpy.ndarray
+        Array with the global ids of the rows.
+    n_draws : int or None
+        Number of draws per row. ``None`` drops the dimension.
+    n_choices : int
+        Number of choices.
+    antithetic : bool, default False
+        Whether the second half of the draws of each row are the negative draws of the
+        first half.
+
+    Examples
+    --------
+    >>> draws = CounterBasedDraws(1, np.arange(4), 2, 3)
+    >>> draws.shape
+    (4, 2, 3)
+    >>> np.array_equal(np.asarray(draws)[1:3], np.asarray(draws[1:3]))
+    True
+
+    """
+
+    def __init__(self, seed, rows, n_draws, n_choices, antithetic=False):
+        self.seed = int(seed)
+        self.rows = np.asarray(rows, dtype=np.int64)
+        self.n_draws = n_draws
+        self.n_choices = n_choices
+        self.antithetic = antithetic
+
+    @property
+    def shape(self):
+        n_rows = len(self.rows)
+        if self.n_draws is None:
+            shape = (n_rows, self.n_choices)
+        else:
+            shape = (n_rows, self.n_draws, self.n_choices)
+        return shape
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        """Select rows without materializing the draws."""
+        return CounterBasedDraws(
+            self.seed, self.rows[index], self.n_draws, self.n_choices, self.antithetic
+        )
+
+    def __array__(self, dtype=None):
+        draws = create_counter_based_draws(
+            self.seed,
+            self.rows,
+            1 if self.n_draws is None else self.n_draws,
+            self.n_choices,
+            self.antithetic,
+        )
+        draws = draws.reshape(self.shape)
+        return draws if dtype is None else draws.astype(dtype)
+
+    def __repr__(self):
+        return f"CounterBasedDraws(seed={self.seed}, shape={self.shape})"
+
+
+@nb.njit
+def philox4x32(c0, c1, c2, c3, k0, k1):
+    """Compute the Philox4x32-10 bijection of a counter and a key.
+
+    All inputs and outputs are 32-bit integers held in unsigned 64-bit integers.
+
+    Examples
+    --------
+    The known answer test of the reference implementation.
+
+    >>> zero = np.uint64(0)
+    >>> [hex(i) for i in philox4x32(zero, zero, zero, zero, zero, zero)]
+    ['0x6627e8d5', '0xe169c58d', '0xbc57ac4c', '0x9b00dbd8']
+
+    """
+    for _ in range(_PHILOX_ROUNDS):
+        product_0 = _PHILOX_M0 * c0
+        product_1 = _PHILOX_M1 * c2
+        c0, c1, c2, c3 = (
+            (product_1 >> _SHIFT_32) ^ c1 ^ k0,
+            product_1 & _MASK_32,
+            (product_0 >> _SHIFT_32) ^ c3 ^ k1,
+            product_0 & _MASK_32,
+        )
+        k0 = (k0 + _PHILOX_W0) & _MASK_32
+        k1 = (k1 + _PHILOX_W1) & _MASK_32
+
+    return c0, c1, c2, c3
+
+
+@nb.njit
+def _to_uniform(high, low):
+    """Convert two 32-bit integers to a uniform number in the interval (0, 1)."""
+    high = np.int64(high >> _SHIFT_5)
+    low = np.int64(low >> _SHIFT_6)
+    return (high * _TWO_TO_26 + low + 0.5) / _TWO_TO_53
+
+
+@nb.njit
+def standard_normal_pair(seed, row, draw, pair):
+    """Compute a pair of standard normal draws.
+
+    The counter consists of the row id, the number of the draw and the number of the
+    pair of choices. The seed is the key of the generator.
+
+    """
+    seed = np.uint64(seed)
+    row = np.uint64(row)
+    c0, c1, c2, c3 = philox4x32(
+        row & _MASK_32,
+        row >> _SHIFT_32,
+        np.uint64(draw),
+        np.uint64(pair),
+        seed & _MASK_32,
+        (seed >> _SHIFT_32) & _MASK_32,
+    )
+    radius = np.sqrt(-2 * np.log(_to_uniform(c0, c1)))
+    angle = 2 * np.pi * _to_uniform(c2, c3)
+
+    return radius * np.cos(angle), radius * np.sin(angle)
+
+
+@nb.njit
+def fill_standard_normal_draws(seed, row, draw, out):
+    """Fill an array with the standard normal draws of one row and one draw."""
+    n_choices = out.shape[0]
+    for pair in range((n_choices + 1) // 2):
+        z_0, z_1 = standard_normal_pair(seed, row, draw, pair)
+        out[2 * pair] = z_0
+        if 2 * pair + 1 < n_choices:
+            out[2 * pair + 1] = z_1
+
+
+@nb.njit
+def fill_antithetic_standard_normal_draws(seed, row, draw, n_draws, out):
+    """Fill an array with antithetic standard normal draws of one row and one draw.
+
+    The first ``ceil(n_draws / 2)`` draws are the same as in
+    :func:`fill_standard_normal_draws` and the remaining draws are their negatives.
+
+    """
+    n_pairs = (n_draws + 1) // 2
+    if draw < n_pairs:
+        fill_standard_normal_draws(seed, row, draw, out)
+    else:
+        fill_standard_normal_draws(seed, row, draw - n_pairs, out)
+        for i in range(out.shape[0]):
+            out[i] = -out[i]
+
+
+@nb.njit(parallel=True)
+def create_counter_based_draws(seed, rows, n_draws, n_choices, antithetic):
+    """Materialize the counter-based draws for a set of rows.
+
+    Returns
+    -------
+    draws : numpy.ndarray
+        Array with shape (n_rows, n_draws, n_choices).
+
+    """
+    n_rows = rows.shape[0]
+    draws = np.empty((n_rows, n_draws, n_choices))
+
+    for i in nb.prange(n_rows):
+        for d in range(n_draws):
+            if antithetic:
+                fill_antithetic_standard_normal_draws(
+                    seed, rows[i], d, n_draws, draws[i, d]
+                )
+            else:
+                fill_standard_normal_draws(seed, rows[i], d, draws[i, d])
+
+    return draws
+
+
+def create_scrambled_quasi_random_draws(shape, seed, monte_carlo_sequence):
+    """Create standard normal draws from a scrambled quasi-random sequence.
+
+    Parameters
+    ----------
+    shape : tuple(int)
+        Tuple representing the shape of the resulting array. The last dimension is the
+        dimension of the sequence, all other dimensions are filled with consecutive
+        points.
+    seed : int
+        Seed to control the scrambling.
+    monte_carlo_sequence : {"scrambled_sobol", "scrambled_halton"}
+        Name of the sequence.
+
+    Returns
+    -------
+    draws : numpy.ndarray
+        Array with the given shape.
+
+    Examples
+    --------
+    >>> draws = create_scrambled_quasi_random_draws((1_024, 2), 1, "scrambled_sobol")
+    >>> draws.shape
+    (1024, 2)
+    >>> bool((np.abs(draws.mean(axis=0)) < 1e-2).all())
+    True
+
+    """
+    n_dims = shape[-1]
+    n_points = int(np.prod(shape[:-1]))
+
+    if monte_carlo_sequence == "scrambled_sobol":
+        if n_dims > len(_SOBOL_POLYNOMIALS):
+            raise ValueError(
+                f"Scrambled Sobol sequences support up to {len(_SOBOL_POLYNOMIALS)} "
+                "choices."
+            )
+        directions = _create_sobol_direction_numbers(n_dims)
+        uniforms = _create_owen_scrambled_sobol_points(n_points, directions, seed)
+    elif monte_carlo_sequence == "scrambled_halton":
+        bases = _create_primes(n_dims)
+        permutations = _create_digit_permutations(bases, seed)
+        uniforms = _create_scrambled_halton_points(n_points, bases, permutations)
+    else:
+        raise NotImplementedError
+
+    return _inverse_standard_normal_cdf(uniforms).reshape(shape)
+
+
+def _create_sobol_direction_numbers(n_dims):
+    """Create the direction numbers of the Sobol sequence.
+
+    Returns
+    -------
+    directions : numpy.ndarray
+        Array with shape (n_dims, 32) where the k-th column contains the direction
+        numbers of the k-th bit shifted to the left.
+
+    """
+    directions = np.zeros((n_dims, _SOBOL_BITS), dtype=np.uint64)
+    directions[0] = 1
+
+    for dim in range(1, n_dims):
+        polynomial = _SOBOL_POLYNOMIALS[dim]
+        degree = polynomial.bit_length() - 1
+        directions[dim, :degree] = _SOBOL_INITIAL_NUMBERS[dim]
+        for k in range(degree, _SOBOL_BITS):
+            value = directions[dim, k - degree] ^ (
+                directions[dim, k - degree] << np.uint64(degree)
+            )
+            for i in range(1, degree):
+                if (polynomial >> (degree - i)) & 1:
+                    value ^= directions[dim, k - i] << np.uint64(i)
+            directions[dim, k] = value
+
+    shifts = np.arange(_SOBOL_BITS - 1, -1, -1, dtype=np.uint64)
+    return directions << shifts
+
+
+@nb.njit(parallel=True)
+def _create_owen_scrambled_sobol_points(n_points, directions, seed):
+    """Create Owen-scrambled points of the Sobol sequence.
+
+    The i-th point is the XOR of the direction numbers of all set bits of the i-th Gray
+    code. Every bit of a coordinate is flipped depending on a hash of the seed, the
+    dimension and all more significant bits, which is the nested uniform scrambling.
+    The bits beyond the 32nd are filled with uniform random bits.
+
+    """
+    n_dims = directions.shape[0]
+    points = np.empty((n_points, n_dims))
+    one = np.uint64(1)
+
+    for i in nb.prange(n_points):
+        gray_code = np.uint64(i ^ (i >> 1))
+        for dim in range(n_dims):
+            key = _mix_64(np.uint64(seed) ^ _mix_64(np.uint64(dim) + _GOLDEN_GAMMA))
+
+            x = np.uint64(0)
+            index = gray_code
+            bit = 0
+            while index:
+                if index & one:
+                    x ^= directions[dim, bit]
+                index >>= one
+                bit += 1
+
+            # The leading one of the node encodes the depth in the binary tree.
+            scrambled = np.uint64(0)
+            for depth in range(_SOBOL_BITS):
+                shift = np.uint64(_SOBOL_BITS - 1 - depth)
+                node = (x >> shift) >> one | (one << np.uint64(depth))
+                flip = _mix_64(key ^ node) & one
+                scrambled |= (((x >> shift) & one) ^ flip) << shift
+
+            tail = _mix_64(key ^ _mix_64(x + _GOLDEN_GAMMA)) >> np.uint64(11)
+            points[i, dim] = (
+                np.int64(scrambled) + (np.int64(tail) + 0.5) / _TWO_TO_53
+            ) / _TWO_TO_32
+
+    return points
+
+
+@nb.njit
+def _mix_64(x):
+    """Mix the bits of an integer with the finalizer of SplitMix64."""
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _create_primes(n):
+    """Create the first n prime numbers.
+
+    Examples
+    --------
+    >>> _create_primes(5)
+    array([ 2,  3,  5,  7, 11])
+
+    """
+    primes = []
+    candidate = 2
+    while len(primes) < n:
+        if all(candidate % prime for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return np.array(primes)
+
+
+def _create_digit_permutations(bases, seed):
+    """Create random permutations of the digits for every dimension and position.
+
+    The number of positions is chosen such that the last digit is below the precision
+    of a double in the smallest base. Unused entries are filled with -1.
+
+    """
+    n_digits = int(np.ceil(53 * np.log(2) / np.log(bases.min()))) + 1
+    permutations = np.full((len(bases), n_digits, bases.max()), -1)
+
+    state = np.random.RandomState(seed)
+    for dim, base in enumerate(bases):
+        for digit in range(n_digits):
+            permutations[dim, digit, :base] = state.permutation(base)
+
+    return permutations
+
+
+@nb.njit(parallel=True)
+def _create_scrambled_halton_points(n_points, bases, permutations):
+    """Create points of the Halton sequence with scrambled digits.
+
+    Once all non-zero digits of the index are processed, the remaining digits are
+    zeros whose permuted values are summed up in advance.
+
+    """
+    n_dims, n_digits, _ = permutations.shape
+    points = np.empty((n_points, n_dims))
+
+    tails = np.zeros((n_dims, n_digits + 1))
+    for dim in range(n_dims):
+        for digit in range(n_digits - 1, -1, -1):
+            tails[dim, digit] = tails[dim, digit + 1] + permutations[
+                dim, digit, 0
+            ] / bases[dim] ** (digit + 1.0)
+
+    for i in nb.prange(n_points):
+        for dim in range(n_dims):
+            base = bases[dim]
+            index = np.int64(i)
+            factor = 1.0 / base
+            value = 0.0
+            digit = 0
+            while index and digit < n_digits:
+                value += permutations[dim, digit, index % base] * factor
+                index //= base
+                factor /= base
+                digit += 1
+            points[i, dim] = min(max(value + tails[dim, digit], 1e-300), _ONE_MINUS_EPS)
+
+    return points
+
+
+@nb.njit
+def _evaluate_polynomial(coefficients, x):
+    """Evaluate a polynomial with coefficients in descending order."""
+    result = 0.0
+    for coefficient in coefficients:
+        result = result * x + coefficient
+    return result
+
+
+@nb.vectorize("f8(f8)")
+def _inverse_standard_normal_cdf(p):
+    """Compute the quantile function of the standard normal distribution.
+
+    The algorithm AS 241 is accurate to about 1e-16.
+
+    Examples
+    --------
+    >>> _inverse_standard_normal_cdf(np.array([0.5, 0.975])).round(6)
+    array([0.      , 1.959964])
+
+    """
+    q = p - 0.5
+    if abs(q) <= 0.425:
+        r = 0.180625 - q * q
+        return q * _evaluate_polynomial(_AS241_A, r) / _evaluate_polynomial(_AS241_B, r)
+
+    r = p if q < 0 else 1 - p
+    if r <= 0:
+        return -np.inf if q < 0 else np.inf
+    r = np.sqrt(-np.log(r))
+
+    if r <= 5:
+        r -= 1.6
+        value = _evaluate_polynomial(_AS241_C, r) / _evaluate_polynomial(_AS241_D, r)
+    else:
+        r -= 5
+        value = _evaluate_polynomial(_AS241_E, r) / _evaluate_polynomial(_AS241_F, r)
+
+    return -value if q < 0 else value
@@ -6,8 +6,10 @@ import numpy as np
 
 from respy.config import MAX_LOG_FLOAT
 from respy.parallelization import parallelize_across_dense_dimensions
+from respy.quadrature import get_integration_weights
 from respy.shared import calculate_expected_value_functions
 from respy.shared import calculate_value_functions_and_flow_utilities
+from respy.shared import subset_cholesky_factor_to_choice_set
 
 
 def kw_94_interpolation(
@@ -105,6 +107,18 @@ def kw_94_interpolation(
         wages, nonpecs, continuation_values, expected_shocks, optim_paras["delta"]
     )
 
+    weights = {
+        dense_key: get_integration_weights(*draws.shape, options)
+        for dense_key, draws in period_draws_emax_risk.items()
+    }
+
+    if options["variance_reduction"] == "control_variate":
+        control_variate_shocks = _compute_expected_draws(
+            dense_key_to_choice_set_in_period, optim_paras
+        )
+    else:
+        control_variate_shocks = {key: np.empty(0) for key in expected_shocks}
+
     endogenous = _compute_lhs_variable(
         wages,
         nonpecs,
@@ -112,6 +126,8 @@ def kw_94_interpolation(
         max_emax,
         not_interpolated,
         period_draws_emax_risk,
+        weights,
+        control_variate_shocks,
         optim_paras["delta"],
     )
 
@@ -186,9 +202,9 @@ def _split_interpolation_points_evenly(dense_key_to_n_states, period, options):
             n_states[pos] -= 1
 
     share_interp_points_per_dense_index = {
-        dense_key: dense_key_to_interpolation_points[dense_index]
+        dense_key: dense_key_to_interpolation_points[dense_key]
         / dense_key_to_n_states[dense_key]
-        for dense_index in dense_key_to_n_states
+        for dense_key in dense_key_to_n_states
     }
     if (np.array(list(share_interp_points_per_dense_index.values())) < 0.01).any():
         warnings.warn(
@@ -219,9 +235,9 @@ def _get_not_interpolated_indicator(interpolation_points, n_states, seed):
         Array of shape (n_states,) indicating states which will not be interpolated.
 
     """
-    np.random.seed(seed)
+    random_state = np.random.RandomState(seed)
 
-    indices = np.random.choice(n_states, size=interpolation_points, replace=False)
+    indices = random_state.choice(n_states, size=interpolation_points, replace=False)
     not_interpolated = np.zeros(n_states, dtype="bool")
     not_interpolated[indices] = True
 
@@ -244,6 +260,31 @@ def _compute_expected_shocks(dense_key_to_choice_set_in_period, optim_paras):
     return expected_shocks
 
 
+def _compute_expected_draws(dense_key_to_choice_set_in_period, optim_paras):
+    """Compute the expected value of the draws used for the Monte Carlo integration.
+
+    In contrast to :func:`_compute_expected_shocks`, the variances of the shocks are
+    computed from the Cholesky factor subsetted to the choice set which is also used to
+    transform the draws. Thus, the expected values are exact for the draws.
+
+    """
+    n_wages_raw = len(optim_paras["choices_w_wage"])
+
+    expected_draws = {}
+    for dense_key, choice_set in dense_key_to_choice_set_in_period.items():
+        cholesky = subset_cholesky_factor_to_choice_set(
+            optim_paras["shocks_cholesky"], choice_set
+        )
+        n_wages = sum(choice_set[:n_wages_raw])
+        var = (cholesky**2).sum(axis=1)
+
+        expected_draws_ = np.zeros(len(var))
+        expected_draws_[:n_wages] = np.exp(np.clip(var[:n_wages], 0, MAX_LOG_FLOAT) / 2)
+        expected_draws[dense_key] = expected_draws_
+
+    return expected_draws
+
+
 @parallelize_across_dense_dimensions
 def _compute_rhs_variables(wages, nonpec, continuation_values, draws, delta):
     """Compute right-hand side variables of the linear model.
@@ -297,13 +338,17 @@ def _compute_lhs_variable(
     max_value_functions,
     not_interpolated,
     draws,
+    weights,
+    expected_shocks,
     delta,
 ):
     """Calculate left-hand side variable for all states which are not interpolated.
 
     The function computes the full solution for a subset of states. Then, the dependent
     variable is the expected value function minus the maximum of value function with the
-    expected shocks.
+    expected shocks. If ``expected_shocks`` is not empty, the maximum of value function
+    with the expected shocks is the expectation of a control variate which reduces the
+    variance of the Monte Carlo integration.
 
     Parameters
     ----------
@@ -321,6 +366,11 @@ def _compute_lhs_variable(
         continuation_values.
     draws : numpy.ndarray
         Array with shape (n_draws, n_choices) containing draws.
+    weights : numpy.ndarray
+        Array with shape (n_draws,) containing the weights of the draws.
+    expected_shocks : numpy.ndarray
+        Array with shape (n_choices,) containing the expected value of the shocks or an
+        empty array if no control variate is used.
     delta : float
         Discount factor.
 
@@ -330,6 +380,8 @@ def _compute_lhs_variable(
         nonpec[not_interpolated],
         continuation_values[not_interpolated],
         draws,
+        weights,
+        expected_shocks,
         delta,
     )
     endogenous = expected_value_functions - max_value_functions[not_interpolated]
@@ -378,7 +430,7 @@ def _predict_with_linear_model(
     return predictions
 
 
-@nb.njit
+@nb.njit(nogil=True)
 def ols(y, x):
     """Calculate the coefficients of a linear model with OLS using a pseudo-inverse.
 
@@ -6,22 +6,33 @@ import numba as nb
 import numpy as np
 import pandas as pd
 from scipy import special
+from scipy import stats
 
-from respy.conditional_draws import create_draws_and_log_prob_wages
+from respy.conditional_draws import fill_conditional_draw
+from respy.conditional_draws import update_shocks_and_log_prob_wages
 from respy.config import MAX_FLOAT
+from respy.config import MAX_LOG_FLOAT
 from respy.config import MIN_FLOAT
+from respy.draws import CounterBasedDraws
 from respy.parallelization import parallelize_across_dense_dimensions
 from respy.parallelization import split_and_combine_df
+from respy.parallelization import use_parallel_backend_from_options
 from respy.pre_processing.data_checking import check_estimation_data
+from respy.pre_processing.model_processing import ParameterPlan
 from respy.pre_processing.model_processing import process_params_and_options
 from respy.pre_processing.process_covariates import identify_necessary_covariates
+from respy.quadrature import create_integration_nodes_and_weights
+from respy.quadrature import get_integration_weights
 from respy.shared import aggregate_keane_wolpin_utility
 from respy.shared import compute_covariates
+from respy.shared import create_antithetic_draws
 from respy.shared import convert_labeled_variables_to_codes
 from respy.shared import create_base_draws
+from respy.shared import create_unit_draws
 from respy.shared import downcast_to_smallest_dtype
 from respy.shared import generate_column_dtype_dict_for_estimation
 from respy.shared import map_observations_to_states
+from respy.shared import map_observations_to_states_of_types
 from respy.shared import pandas_dot
 from respy.shared import rename_labels_to_internal
 from respy.shared import select_valid_choices
@@ -29,7 +40,7 @@ from respy.shared import subset_cholesky_factor_to_choice_set
 from respy.solve import get_solve_func
 
 
-def get_log_like_func(params, options, df, return_scalar=True):
+def get_log_like_func(params, options, df, return_scalar=True, weights=None):
     """Get the criterion function for maximum likelihood estimation.
 
     Return a version of the likelihood functions in respy where all arguments
@@ -59,6 +70,26 @@ def get_log_like_func(params, options, df, return_scalar=True):
             - ``kind`` : Kind of contribution (e.g choice or wage).
             - ``type`` and `log_type_probability``: Will be included in models with
             types.
+        - "choice_probability_standard_errors": Monte Carlo standard errors of the
+        simulated choice probabilities (pandas.Series) indexed by identifier, period
+        and, in models with types, the type. Only included if
+        ``options["monte_carlo_standard_errors"]`` is true.
+        - "weights": frequency weights of individuals (numpy.array). Only included if
+        ``weights`` is given.
+    weights : str, default None
+        Name of a column in ``df`` which contains frequency weights of individuals,
+        e.g., the column ``"Weight"`` created by
+        :func:`~respy.pre_processing.data_processing.collapse_identical_histories`.
+        The weights must be constant within individuals. If None, all individuals have
+        the same weight.
+
+        The contributions remain the unweighted log likelihoods of individuals and the
+        mean log likelihood is their weighted mean, ``np.average(contributions,
+        weights=weights)``. The log likelihood of the uncollapsed sample is
+        ``weights @ contributions``. Quantities which are computed from the
+        contributions of individuals must use the weights as frequencies, e.g., the
+        outer product of gradients sums the outer products of the gradients of the
+        contributions multiplied with the weights and not with the squared weights.
 
     Returns
     -------
@@ -69,6 +100,11 @@ def get_log_like_func(params, options, df, return_scalar=True):
     ------
     AssertionError
         If data has not the expected format.
+    ValueError
+        If the data contains wages, the shocks are extreme value distributed, and there
+        are no measurement errors.
+    ValueError
+        If the weights are not positive or not constant within individuals.
 
     Examples
     --------
@@ -95,46 +131,101 @@ def get_log_like_func(params, options, df, return_scalar=True):
     optim_paras = _update_optim_paras_with_initial_experience_levels(optim_paras, df)
 
     check_estimation_data(df, optim_paras)
+    weights = _process_weights(df, weights)
 
     solve = get_solve_func(params, options)
     state_space = solve.keywords["state_space"]
 
-    df, type_covariates = _process_estimation_data(
+    df, dense_keys, type_covariates = _process_estimation_data(
         df, state_space, optim_paras, options
     )
 
-    # Replace with decorator.
+    if (
+        optim_paras["shocks_distribution"] == "extreme_value"
+        and not optim_paras["has_meas_error"]
+        and df["log_wage"].notna().any()
+    ):
+        raise ValueError(
+            "Extreme value shocks do not enter wages. Observed wages require standard "
+            "deviations of measurement errors in 'meas_error'."
+        )
+
+    # The draws of every dense key are created for the rows of the observations with
+    # the dense key in the panel where types are stacked on top of each other. Counter-
+    # based draws only depend on the observation and are shared by all types.
+    n_observations = len(df)
+    use_counter_based_draws = (
+        not options["store_draws"] and options["monte_carlo_sequence"] == "random"
+    )
+    if use_counter_based_draws:
+        counter_seed = next(options["estimation_seed_startup"])
+    # With deduplication, draws are only created for the first observation of every
+    # cell of identical observations and shared by the cell.
+    if options["estimation_deduplicate_observations"]:
+        is_representative = df["is_representative"].to_numpy()
+
     base_draws_est = {}
-    for dense_key, indices in df.groupby("dense_key").groups.items():
+    flat_dense_keys = dense_keys.T.ravel()
+    for dense_key, indices in (
+        pd.Series(flat_dense_keys).groupby(flat_dense_keys).indices.items()
+    ):
+        if options["estimation_deduplicate_observations"]:
+            indices = indices[is_representative[indices % n_observations]]
         n_choices = sum(state_space.dense_key_to_choice_set[dense_key])
-        draws = create_base_draws(
-            (len(indices), options["estimation_draws"], n_choices),
-            next(options["estimation_seed_startup"]),
-            options["monte_carlo_sequence"],
-        )
-        base_draws_est[dense_key] = draws
+        seed = next(options["estimation_seed_startup"])
+        if optim_paras["shocks_distribution"] == "extreme_value":
+            # The choice probabilities have a closed form and no draws are necessary.
+            draws = None
+        elif get_integration_of_choice_probabilities(options) != "monte_carlo":
+            # The nodes are shared by all observations. See
+            # :func:`~respy.conditional_draws.fill_conditional_draw`.
+            draws, _ = create_integration_nodes_and_weights(n_choices, options)
+        elif not use_counter_based_draws:
+            draws = create_base_draws(
+                (len(indices), options["estimation_draws"], n_choices),
+                seed,
+                options["monte_carlo_sequence"],
+            )
+            if options["variance_reduction"] == "antithetic":
+                draws = create_antithetic_draws(draws)
+        else:
+            draws = CounterBasedDraws(
+                counter_seed,
+                indices % n_observations,
+                options["estimation_draws"],
+                n_choices,
+                antithetic=options["variance_reduction"] == "antithetic",
+            )
+        base_draws_est[int(dense_key)] = draws
 
     criterion_function = partial(
         log_like,
         df=df,
+        dense_keys=dense_keys,
         base_draws_est=base_draws_est,
         solve=solve,
         type_covariates=type_covariates,
         options=options,
         return_scalar=return_scalar,
+        parameter_plan=ParameterPlan(params, options),
+        weights=weights,
     )
 
     return criterion_function
 
 
+@use_parallel_backend_from_options
 def log_like(
     params,
     df,
+    dense_keys,
     base_draws_est,
     solve,
     type_covariates,
     options,
     return_scalar,
+    parameter_plan=None,
+    weights=None,
 ):
     """Criterion function for the likelihood maximization.
 
@@ -145,44 +236,129 @@ def log_like(
     params : pandas.Series
         Parameter Series
     df : pandas.DataFrame
-        The DataFrame contains choices, log wages, the indices of the states for the
-        different types.
-    base_draws_est : numpy.ndarray
-        Set of draws to calculate the probability of observed wages.
+        The DataFrame contains choices, log wages and the core indices of the states
+        with one row per observation.
+    dense_keys : numpy.ndarray
+        Array with shape (n_observations, n_types) containing the dense keys of the
+        states of every observation and type.
+    base_draws_est : dict
+        Set of draws per dense key to calculate the probability of observed wages. The
+        values are arrays or :class:`~respy.draws.CounterBasedDraws` if
+        ``options["store_draws"]`` is ``False``.
     solve : :func:`~respy.solve.solve`
         Function which solves the model with new parameters.
     options : dict
         Contains model options.
+    parameter_plan : ~respy.pre_processing.model_processing.ParameterPlan, optional
+        Processes the parameters faster if only their values change.
+    weights : numpy.ndarray, optional
+        Array with shape (n_individuals,) containing frequency weights of individuals.
+        They only enter the mean log likelihood and are returned separately from the
+        unweighted contributions.
 
     """
-    optim_paras, options = process_params_and_options(params, options)
-
-    state_space = solve(params)
-
-    contribs, df, log_type_probabilities = _internal_log_like_obs(
-        state_space, df, base_draws_est, type_covariates, optim_paras, options
+    (
+        contribs,
+        loglikes,
+        log_type_probabilities,
+        optim_paras,
+        options,
+    ) = compute_log_likelihood_contributions(
+        params,
+        df,
+        dense_keys,
+        base_draws_est,
+        solve,
+        type_covariates,
+        options,
+        parameter_plan,
     )
 
     # Return mean log likelihood or log likelihood contributions.
-    out = contribs.mean()
+    out = contribs.mean() if weights is None else np.average(contribs, weights=weights)
     if not return_scalar:
         out = {
             "value": out,
             "contributions": contribs,
             "comparison_plot_data": _create_comparison_plot_data(
-                df, log_type_probabilities, optim_paras
+                df, loglikes, log_type_probabilities, optim_paras
             ),
         }
+        if weights is not None:
+            out["weights"] = weights
+        if options["monte_carlo_standard_errors"]:
+            out["choice_probability_standard_errors"] = (
+                loglikes["se_choice"].stack()
+                if optim_paras["n_types"] >= 2
+                else loglikes["se_choice"]
+            )
     return out
 
 
+def compute_log_likelihood_contributions(
+    params,
+    df,
+    dense_keys,
+    base_draws_est,
+    solve,
+    type_covariates,
+    options,
+    parameter_plan=None,
+):
+    """Solve the model and compute the log likelihood contributions of individuals.
+
+    The arguments are the same as in :func:`log_like`.
+
+    Returns
+    -------
+    contribs : numpy.ndarray
+        Array with shape (n_individuals,) containing the unweighted log likelihood
+        contributions of individuals.
+    loglikes : pandas.DataFrame
+        Contains the log likelihoods of choices and wages of every observation.
+    log_type_probabilities : pandas.DataFrame or None
+        Contains the log type probabilities of every individual in models with types.
+    optim_paras : dict
+        Dictionary with quantities that were extracted from the parameter vector.
+    options : dict
+        Processed options of the model.
+
+    """
+    if parameter_plan is None:
+        optim_paras, options = process_params_and_options(params, options)
+    else:
+        optim_paras, options = parameter_plan(params)
+
+    state_space = solve(params)
+
+    contribs, loglikes, log_type_probabilities = _internal_log_like_obs(
+        state_space,
+        df,
+        dense_keys,
+        base_draws_est,
+        type_covariates,
+        optim_paras,
+        options,
+    )
+
+    return contribs, loglikes, log_type_probabilities, optim_paras, options
+
+
 def _internal_log_like_obs(
-    state_space, df, base_draws_est, type_covariates, optim_paras, options
+    state_space,
+    df,
+    dense_keys,
+    base_draws_est,
+    type_covariates,
+    optim_paras,
+    options,
 ):
     """Calculate the likelihood contribution of each individual in the sample.
 
     The function calculates all likelihood contributions for all observations in the
-    data which means all individual-period-type combinations.
+    data which means all individual-period-type combinations. The data has one row per
+    observation and the contributions are computed for one type after another where
+    only the dense keys of the observations change.
 
     Then, likelihoods are accumulated within each individual and type over all periods.
     After that, the result is multiplied with the type-specific shares which yields the
@@ -193,11 +369,13 @@ def _internal_log_like_obs(
     state_space : :class:`~respy.state_space.StateSpace`
         Class of state space.
     df : pandas.DataFrame
-        The DataFrame contains choices, log wages, the indices of the states for the
-        different types.
-    base_draws_est : numpy.ndarray
-        Array with shape (n_periods, n_draws, n_choices) containing i.i.d. draws from
-        standard normal distributions.
+        The DataFrame contains choices, log wages and the core indices of the states
+        with one row per observation.
+    dense_keys : numpy.ndarray
+        Array with shape (n_observations, n_types) containing the dense keys of the
+        states of every observation and type.
+    base_draws_est : dict
+        Set of draws per dense key.
     type_covariates : pandas.DataFrame or None
         If the model includes types, this is a :class:`pandas.DataFrame` containing the
         covariates to compute the type probabilities.
@@ -211,12 +389,13 @@ def _internal_log_like_obs(
     contribs : numpy.ndarray
         Array with shape (n_individuals,) containing contributions of individuals in the
         empirical data.
-    df : pandas.DataFrame
-        Contains log wages, choices and
+    loglikes : pandas.DataFrame
+        Contains the log likelihoods of choices and wages of every observation. In
+        models with types, the columns have a second level for the type.
+    log_type_probabilities : pandas.DataFrame or None
+        Contains the log type probabilities of every individual in models with types.
 
     """
-    df = df.copy()
-
     n_types = optim_paras["n_types"]
 
     wages = state_space.wages
@@ -228,25 +407,36 @@ def _internal_log_like_obs(
             **state_space.get_continuation_values(period),
         }
 
-    df = _compute_wage_and_choice_log_likelihood_contributions(
-        df,
-        base_draws_est,
-        wages,
-        nonpecs,
-        continuation_values,
-        state_space.dense_key_to_choice_set,
-        optim_paras,
-        options,
-    )
+    columns = ["loglike_choice", "loglike_wage"]
+    if options["monte_carlo_standard_errors"]:
+        columns.append("se_choice")
+
+    kernel_columns = ["choice", "log_wage", "core_index"]
+    if options["estimation_deduplicate_observations"]:
+        kernel_columns += ["cell", "is_representative"]
+
+    type_loglikes = []
+    for type_ in range(n_types):
+        df_type = df[kernel_columns].assign(dense_key=dense_keys[:, type_])
+        df_type = _compute_wage_and_choice_log_likelihood_contributions(
+            df_type,
+            base_draws_est,
+            wages,
+            nonpecs,
+            continuation_values,
+            state_space.dense_key_to_choice_set,
+            optim_paras,
+            options,
+        )
+        type_loglikes.append(df_type[columns])
 
     # Aggregate choice probabilities and wage densities to log likes per observation.
-    loglikes = (
-        df.groupby(["identifier", "period", "type"])[["loglike_choice", "loglike_wage"]]
-        .first()
-        .unstack("type")
-        if optim_paras["n_types"] >= 2
-        else df[["loglike_choice", "loglike_wage"]]
-    )
+    if n_types >= 2:
+        loglikes = pd.concat(
+            type_loglikes, axis=1, keys=range(n_types), names=["type", None]
+        ).swaplevel(axis=1)
+    else:
+        loglikes = type_loglikes[0]
     per_observation_loglikes = loglikes["loglike_choice"] + loglikes["loglike_wage"]
     per_individual_loglikes = per_observation_loglikes.groupby("identifier").sum()
 
@@ -257,7 +447,9 @@ def _internal_log_like_obs(
         log_type_probabilities = _compute_log_type_probabilities(
             type_covariates, optim_paras, options
         )
-        weighted_loglikes = per_individual_loglikes + log_type_probabilities
+        weighted_loglikes = (
+            per_individual_loglikes.to_numpy() + log_type_probabilities.to_numpy()
+        )
 
         contribs = special.logsumexp(weighted_loglikes, axis=1)
     else:
@@ -266,7 +458,7 @@ def _internal_log_like_obs(
 
     contribs = np.clip(contribs, MIN_FLOAT, MAX_FLOAT)
 
-    return contribs, df, log_type_probabilities
+    return contribs, loglikes, log_type_probabilities
 
 
 @split_and_combine_df
@@ -281,26 +473,66 @@ def _compute_wage_and_choice_log_likelihood_contributions(
     optim_paras,
     options,
 ):
-    """Compute wage and choice log likelihood contributions."""
+    """Compute wage and choice log likelihood contributions.
+
+    If ``options["estimation_deduplicate_observations"]`` is true, the contributions
+    are only computed for the first observation of every cell of identical
+    observations and assigned to all observations of the cell. See
+    :func:`_find_cells_of_identical_observations`.
+
+    """
     n_wages = len(select_valid_choices(optim_paras["choices_w_wage"], choice_set))
 
-    indices = df["core_index"].to_numpy()
+    if options["estimation_deduplicate_observations"]:
+        cells = df["cell"].to_numpy()
+        observations = df[df["is_representative"].to_numpy()]
+    else:
+        cells = slice(None)
+        observations = df
+
+    indices = observations["core_index"].to_numpy()
 
     selected_wages = wages[indices]
-    log_wages_observed = df["log_wage"].to_numpy()
+    log_wages_observed = observations["log_wage"].to_numpy()
 
     choices = _map_choice_codes_to_indices_of_valid_choice_set(
-        df["choice"].to_numpy(), choice_set
+        observations["choice"].to_numpy(), choice_set
     )
 
+    if optim_paras["shocks_distribution"] == "extreme_value":
+        n_choices = wages.shape[1]
+        choice_loglikes = _compute_log_probability_of_observed_choice_with_ev_shocks(
+            selected_wages,
+            nonpecs[indices],
+            continuation_values[indices],
+            create_unit_draws(n_choices, n_wages),
+            optim_paras["beta_delta"],
+            choices,
+            optim_paras["shocks_ev_scale"],
+        )
+        wage_loglikes = _compute_log_probability_of_wages_with_ev_shocks(
+            log_wages_observed, selected_wages, choices, optim_paras["meas_error"]
+        )
+
+        df["loglike_choice"] = np.clip(choice_loglikes[cells], MIN_FLOAT, MAX_FLOAT)
+        df["loglike_wage"] = np.clip(wage_loglikes[cells], MIN_FLOAT, MAX_FLOAT)
+        if options["monte_carlo_standard_errors"]:
+            df["se_choice"] = 0.0
+
+        return df
+
     shocks_cholesky = subset_cholesky_factor_to_choice_set(
         optim_paras["shocks_cholesky"], choice_set
     )
 
-    draws, wage_loglikes = create_draws_and_log_prob_wages(
+    (
+        updated_means,
+        wage_loglikes,
+        updated_chols,
+        chol_indices,
+    ) = update_shocks_and_log_prob_wages(
         log_wages_observed,
         selected_wages,
-        base_draws_est,
         choices,
         shocks_cholesky,
         n_wages,
@@ -308,28 +540,75 @@ def _compute_wage_and_choice_log_likelihood_contributions(
         optim_paras["has_meas_error"],
     )
 
+    # Counter-based draws are passed as an empty array which carries the number of
+    # draws. Stored draws with a single row, e.g., nodes of quadrature rules, are shared
+    # by all observations.
     n_choices = wages.shape[1]
-    n_observations = df.shape[0]
-    draws = draws.reshape(n_observations, -1, n_choices)
-
-    selected_continuation_values = continuation_values[indices]
+    if isinstance(base_draws_est, CounterBasedDraws):
+        base_draws = np.empty((0, base_draws_est.n_draws, n_choices))
+        seed = base_draws_est.seed
+        rows = base_draws_est.rows
+        antithetic = base_draws_est.antithetic
+    else:
+        base_draws = base_draws_est.reshape(-1, *base_draws_est.shape[-2:])
+        seed = 0
+        rows = np.empty(0, dtype=np.int64)
+        antithetic = False
+
+    weights = get_integration_weights(
+        base_draws.shape[1],
+        n_choices,
+        options,
+        get_integration_of_choice_probabilities(options),
+    )
 
-    choice_loglikes = _simulate_log_probability_of_individuals_observed_choice(
+    choice_loglikes, standard_errors = _simulate_log_probabilities_of_observed_choices(
         selected_wages,
         nonpecs[indices],
-        selected_continuation_values,
-        draws,
-        optim_paras["beta_delta"],
+        continuation_values[indices],
         choices,
-        options["estimation_tau"],
+        base_draws,
+        seed,
+        rows,
+        antithetic,
+        updated_means,
+        updated_chols,
+        chol_indices,
+        weights,
+        n_wages,
+        optim_paras["beta_delta"],
+        float(options["estimation_tau"]),
+        options["variance_reduction"] == "control_variate",
+        options["monte_carlo_standard_errors"],
     )
 
-    df["loglike_choice"] = np.clip(choice_loglikes, MIN_FLOAT, MAX_FLOAT)
-    df["loglike_wage"] = np.clip(wage_loglikes, MIN_FLOAT, MAX_FLOAT)
+    df["loglike_choice"] = np.clip(choice_loglikes[cells], MIN_FLOAT, MAX_FLOAT)
+    df["loglike_wage"] = np.clip(wage_loglikes[cells], MIN_FLOAT, MAX_FLOAT)
+    if options["monte_carlo_standard_errors"]:
+        df["se_choice"] = standard_errors[cells]
 
     return df
 
 
+def get_integration_of_choice_probabilities(options):
+    """Get the integration rule of the choice probabilities in the likelihood.
+
+    The smoothed choice probabilities require non-negative weights. Smolyak rules have
+    negative weights. Thus, the choice probabilities are simulated with Monte Carlo
+    integration instead while the expected value functions use the sparse grid.
+
+    Examples
+    --------
+    >>> get_integration_of_choice_probabilities({"emax_integration": "smolyak"})
+    'monte_carlo'
+    >>> get_integration_of_choice_probabilities({"emax_integration": "gauss_hermite"})
+    'gauss_hermite'
+
+    """
+    rule = options["emax_integration"]
+    return "monte_carlo" if rule == "smolyak" else rule
+
+
 def _compute_log_type_probabilities(df, optim_paras, options):
     """Compute the log type probabilities."""
     x_betas = _compute_x_beta_for_type_probabilities(
@@ -396,21 +675,193 @@ def _logsumexp(x):
     return log_sum_exp
 
 
-@nb.guvectorize(
-    ["f8[:], f8[:], f8[:], f8[:, :], f8, i8, f8, f8[:]"],
-    "(n_choices), (n_choices), (n_choices), (n_draws, n_choices), (), (), () -> ()",
-    nopython=True,
-    target="parallel",
-)
+@nb.njit
+def _weighted_logsumexp(x, weights):
+    """Compute the logarithm of the weighted sum of exponentials of `x`.
+
+    With weights of one, the result is equal to :func:`_logsumexp`. The weights must
+    be non-negative, see :func:`get_integration_of_choice_probabilities`.
+
+    """
+    max_x = x[0]
+    for i in range(1, len(x)):
+        if x[i] > max_x:
+            max_x = x[i]
+
+    sum_exp = 0.0
+    for i in range(len(x)):
+        sum_exp += weights[i] * np.exp(x[i] - max_x)
+
+    return max_x + np.log(sum_exp)
+
+
+@nb.njit(parallel=True)
+def _simulate_log_probabilities_of_observed_choices(
+    wages,
+    nonpecs,
+    continuation_values,
+    choices,
+    base_draws,
+    seed,
+    rows,
+    antithetic,
+    updated_means,
+    updated_chols,
+    chol_indices,
+    weights,
+    n_wages,
+    delta,
+    tau,
+    use_control_variate,
+    compute_standard_errors,
+):
+    """Simulate the log probabilities of the observed choices of all observations.
+
+    The conditional draws are computed one at a time inside the loop over draws with
+    :func:`~respy.conditional_draws.fill_conditional_draw`. The observations are split
+    into one chunk per thread and the scratch arrays are allocated once per chunk.
+    Thus, the array of conditional draws with shape (n_obs, n_draws, n_choices) is
+    never allocated. The functions for single observations are inlined to avoid the
+    overhead of calls in the innermost loops.
+
+    Parameters
+    ----------
+    wages, nonpecs, continuation_values : numpy.ndarray
+        Arrays with shape (n_obs, n_choices).
+    choices : numpy.ndarray
+        Array with shape (n_obs,) containing the indices of the observed choices.
+    base_draws, seed, rows, antithetic
+        Source of the base draws. See
+        :func:`~respy.conditional_draws.fill_conditional_draw`.
+    updated_means : numpy.ndarray
+        Array with shape (n_obs, n_choices) containing the means of the shocks
+        conditional on the observed wages.
+    updated_chols : numpy.ndarray
+        Array with shape (n_wages + 1, n_choices, n_choices) containing the Cholesky
+        factors of the conditional covariance matrices.
+    chol_indices : numpy.ndarray
+        Array with shape (n_obs,) containing the index of the relevant Cholesky factor.
+    weights : numpy.ndarray
+        Array with shape (n_draws,) containing the weights of the draws.
+    n_wages : int
+        Number of choices with wages.
+    delta : float
+        Discount rate.
+    tau : float
+        Smoothing parameter for choice probabilities.
+    use_control_variate : bool
+        Whether to simulate the probabilities with a control variate.
+    compute_standard_errors : bool
+        Whether to compute the standard errors of the simulated probabilities.
+
+    Returns
+    -------
+    log_probabilities : numpy.ndarray
+        Array with shape (n_obs,) containing the simulated smoothed log probabilities.
+    standard_errors : numpy.ndarray
+        Array with shape (n_obs,) containing the Monte Carlo standard errors of the
+        simulated probabilities or NaNs.
+
+    """
+    n_obs, n_choices = wages.shape
+    n_draws = weights.shape[0]
+    log_probabilities = np.empty(n_obs)
+    standard_errors = np.empty(n_obs)
+
+    n_chunks = max(min(nb.get_num_threads(), n_obs), 1)
+    chunk_size = (n_obs + n_chunks - 1) // n_chunks
+
+    for chunk in nb.prange(n_chunks):
+        base_draw = np.empty(n_choices)
+        conditional_draw = np.empty(n_choices)
+        smoothed_value_functions = np.empty(n_choices)
+        gradient = np.empty(n_choices)
+        values_of_draws = np.empty(n_draws)
+        controls = np.empty(n_draws)
+
+        for i in range(chunk * chunk_size, min((chunk + 1) * chunk_size, n_obs)):
+            if use_control_variate:
+                (
+                    log_probability,
+                    standard_error,
+                ) = _simulate_log_probability_with_control_variate(
+                    wages[i],
+                    nonpecs[i],
+                    continuation_values[i],
+                    choices[i],
+                    base_draws,
+                    seed,
+                    rows,
+                    antithetic,
+                    i,
+                    updated_means[i],
+                    updated_chols[chol_indices[i]],
+                    weights,
+                    n_wages,
+                    delta,
+                    tau,
+                    compute_standard_errors,
+                    base_draw,
+                    conditional_draw,
+                    smoothed_value_functions,
+                    gradient,
+                    values_of_draws,
+                    controls,
+                )
+            else:
+                (
+                    log_probability,
+                    standard_error,
+                ) = _simulate_log_probability_of_individuals_observed_choice(
+                    wages[i],
+                    nonpecs[i],
+                    continuation_values[i],
+                    choices[i],
+                    base_draws,
+                    seed,
+                    rows,
+                    antithetic,
+                    i,
+                    updated_means[i],
+                    updated_chols[chol_indices[i]],
+                    weights,
+                    n_wages,
+                    delta,
+                    tau,
+                    compute_standard_errors,
+                    base_draw,
+                    conditional_draw,
+                    smoothed_value_functions,
+                    values_of_draws,
+                )
+            log_probabilities[i] = log_probability
+            standard_errors[i] = standard_error
+
+    return log_probabilities, standard_errors
+
+
+@nb.njit(inline="always")
 def _simulate_log_probability_of_individuals_observed_choice(
     wages,
     nonpec,
     continuation_values,
-    draws,
-    delta,
     choice,
+    base_draws,
+    seed,
+    rows,
+    antithetic,
+    observation,
+    updated_mean,
+    updated_chol,
+    weights,
+    n_wages,
+    delta,
     tau,
-    smoothed_log_probability,
+    compute_standard_error,
+    base_draw,
+    draw,
+    smoothed_value_functions,
+    smoothed_log_probabilities,
 ):
     r"""Simulate the probability of observing the agent's choice.
 
@@ -429,7 +880,13 @@ def _simulate_log_probability_of_individuals_observed_choice(
 
     The following function is numerically more robust. The derivation with the two
     consecutive `logsumexp` functions is included in `#278
-    <https://github.com/OpenSourceEconomics/respy/pull/288>`_.
+    <https://github.com/OpenSourceEconomics/respy/pull/288>`_. The second `logsumexp`
+    averages the probabilities with ``weights`` which may be negative for sparse grids.
+    Then, the average is bounded from below by a small positive number.
+
+    If ``compute_standard_error`` is true, the Monte Carlo standard error of the
+    simulated probability is computed like in
+    :func:`~respy.shared.calculate_expected_maximum_of_value_functions`.
 
     Parameters
     ----------
@@ -439,31 +896,61 @@ def _simulate_log_probability_of_individuals_observed_choice(
         Array with shape (n_choices,).
     continuation_values : numpy.ndarray
         Array with shape (n_choices,)
-    draws : numpy.ndarray
-        Array with shape (n_draws, n_choices)
-    delta : float
-        Discount rate.
     choice : int
         Choice of the agent.
+    base_draws, seed, rows, antithetic, observation
+        Source of the base draws. See
+        :func:`~respy.conditional_draws.fill_conditional_draw`.
+    updated_mean : numpy.ndarray
+        Array with shape (n_choices,) containing the conditional mean of the shocks.
+    updated_chol : numpy.ndarray
+        Array with shape (n_choices, n_choices) containing the Cholesky factor of the
+        conditional covariance matrix of the shocks.
+    weights : numpy.ndarray
+        Array with shape (n_draws,) containing the weights of the draws.
+    n_wages : int
+        Number of choices with wages.
+    delta : float
+        Discount rate.
     tau : float
         Smoothing parameter for choice probabilities.
+    compute_standard_error : bool
+        Whether to compute the standard error of the simulated probability.
+    base_draw, draw, smoothed_value_functions : numpy.ndarray
+        Scratch arrays with shape (n_choices,).
+    smoothed_log_probabilities : numpy.ndarray
+        Scratch array with shape (n_draws,).
 
     Returns
     -------
     smoothed_log_probability : float
         Simulated Smoothed log probability of choice.
+    standard_error : float
+        Monte Carlo standard error of the simulated probability or NaN.
 
     """
-    n_draws, n_choices = draws.shape
-
-    smoothed_log_probabilities = np.empty(n_draws)
-    smoothed_value_functions = np.empty(n_choices)
+    n_draws = weights.shape[0]
+    n_choices = wages.shape[0]
 
     for i in range(n_draws):
+        fill_conditional_draw(
+            base_draws,
+            seed,
+            rows,
+            antithetic,
+            observation,
+            i,
+            updated_mean,
+            updated_chol,
+            n_wages,
+            MAX_LOG_FLOAT,
+            base_draw,
+            draw,
+        )
 
         for j in range(n_choices):
             value_function, _ = aggregate_keane_wolpin_utility(
-                wages[j], nonpec[j], continuation_values[j], draws[i, j], delta
+                wages[j], nonpec[j], continuation_values[j], draw[j], delta
             )
 
             smoothed_value_functions[j] = value_function / tau
@@ -472,9 +959,251 @@ def _simulate_log_probability_of_individuals_observed_choice(
             smoothed_value_functions
         )
 
-    smoothed_log_prob = _logsumexp(smoothed_log_probabilities) - np.log(n_draws)
+    smoothed_log_probability = _weighted_logsumexp(
+        smoothed_log_probabilities, weights
+    ) - np.log(weights.sum())
+
+    standard_error = np.nan
+    if compute_standard_error:
+        probability = np.exp(smoothed_log_probability)
+        sum_squared_residuals = 0.0
+        for i in range(n_draws):
+            residual = np.exp(smoothed_log_probabilities[i]) - probability
+            sum_squared_residuals += weights[i] ** 2 * residual**2
+        standard_error = np.sqrt(sum_squared_residuals) / weights.sum()
+
+    return smoothed_log_probability, standard_error
+
+
+@nb.njit(inline="always")
+def _simulate_log_probability_with_control_variate(
+    wages,
+    nonpec,
+    continuation_values,
+    choice,
+    base_draws,
+    seed,
+    rows,
+    antithetic,
+    observation,
+    mean_shocks,
+    updated_chol,
+    weights,
+    n_wages,
+    delta,
+    tau,
+    compute_standard_error,
+    base_draw,
+    draw,
+    smoothed_value_functions,
+    gradient,
+    probabilities,
+    controls,
+):
+    r"""Simulate the probability of the agent's choice with a control variate.
+
+    The control variate is the first-order Taylor approximation of the smoothed choice
+    probability around the mean of the shocks :math:`\mu`, i.e.,
+    :math:`x_i = \nabla p(\mu)^T (\epsilon_i - \mu)` with expectation zero. Wage
+    shocks are the logarithms of the draws. The simulated probability is
+
+    .. math::
+
+        \hat{p} = \bar{p} - \hat{\beta} \bar{x}
+
+    where :math:`\hat{\beta}` is the regression coefficient of the probabilities on the
+    control variate over the draws. If the corrected probability is not positive, the
+    average :math:`\bar{p}` is used. The standard error is computed from the residuals
+    of the probabilities net of the control variate.
+
+    Parameters
+    ----------
+    wages, nonpec, continuation_values : numpy.ndarray
+        Arrays with shape (n_choices,).
+    choice : int
+        Choice of the agent.
+    base_draws, seed, rows, antithetic, observation
+        Source of the base draws. See
+        :func:`~respy.conditional_draws.fill_conditional_draw`.
+    mean_shocks : numpy.ndarray
+        Array with shape (n_choices,) containing the mean of the shocks before wage
+        shocks are exponentiated.
+    updated_chol : numpy.ndarray
+        Array with shape (n_choices, n_choices) containing the Cholesky factor of the
+        conditional covariance matrix of the shocks.
+    weights : numpy.ndarray
+        Array with shape (n_draws,) containing the weights of the draws.
+    n_wages : int
+        Number of choices with wages.
+    delta : float
+        Discount rate.
+    tau : float
+        Smoothing parameter for choice probabilities.
+    compute_standard_error : bool
+        Whether to compute the standard error of the simulated probability.
+    base_draw, draw, smoothed_value_functions, gradient : numpy.ndarray
+        Scratch arrays with shape (n_choices,).
+    probabilities, controls : numpy.ndarray
+        Scratch arrays with shape (n_draws,).
+
+    Returns
+    -------
+    smoothed_log_probability : float
+        Simulated Smoothed log probability of choice.
+    standard_error : float
+        Monte Carlo standard error of the simulated probability or NaN.
+
+    """
+    n_draws = weights.shape[0]
+    n_choices = wages.shape[0]
+
+    # Compute the gradient of the probability with respect to the shocks at the mean.
+    # The derivatives of the smoothed value functions are stored in ``gradient`` first.
+    for j in range(n_choices):
+        if j < n_wages:
+            mean_draw = np.exp(min(mean_shocks[j], MAX_LOG_FLOAT))
+            gradient[j] = wages[j] * mean_draw / tau
+        else:
+            mean_draw = mean_shocks[j]
+            gradient[j] = wages[j] / tau
+        value_function, _ = aggregate_keane_wolpin_utility(
+            wages[j], nonpec[j], continuation_values[j], mean_draw, delta
+        )
+        smoothed_value_functions[j] = value_function / tau
+
+    log_sum_exp = _logsumexp(smoothed_value_functions)
+    probability_at_mean = np.exp(smoothed_value_functions[choice] - log_sum_exp)
+    for j in range(n_choices):
+        indicator = 1.0 if j == choice else 0.0
+        probability_j = np.exp(smoothed_value_functions[j] - log_sum_exp)
+        gradient[j] = probability_at_mean * (indicator - probability_j) * gradient[j]
+
+    probability = 0.0
+    control = 0.0
+    control_squared = 0.0
+    cross_product = 0.0
+    for i in range(n_draws):
+        fill_conditional_draw(
+            base_draws,
+            seed,
+            rows,
+            antithetic,
+            observation,
+            i,
+            mean_shocks,
+            updated_chol,
+            n_wages,
+            MAX_LOG_FLOAT,
+            base_draw,
+            draw,
+        )
+
+        control_ = 0.0
+        for j in range(n_choices):
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[j], nonpec[j], continuation_values[j], draw[j], delta
+            )
+            smoothed_value_functions[j] = value_function / tau
+
+            if j < n_wages:
+                shock = np.log(max(draw[j], 1 / MAX_FLOAT))
+            else:
+                shock = draw[j]
+            control_ += gradient[j] * (shock - mean_shocks[j])
+
+        probability_ = np.exp(
+            smoothed_value_functions[choice] - _logsumexp(smoothed_value_functions)
+        )
+        probabilities[i] = probability_
+        controls[i] = control_
+        probability += weights[i] * probability_
+        control += weights[i] * control_
+        control_squared += weights[i] * control_**2
+        cross_product += weights[i] * control_ * probability_
+
+    sum_weights = weights.sum()
+    probability /= sum_weights
+    control /= sum_weights
+    average_probability = probability
+
+    coefficient = 0.0
+    variance = control_squared / sum_weights - control**2
+    if variance > 0:
+        covariance = cross_product / sum_weights - control * probability
+        corrected_probability = probability - covariance / variance * control
+        if corrected_probability > 0:
+            probability = corrected_probability
+            coefficient = covariance / variance
+
+    smoothed_log_probability = np.log(max(probability, 1 / MAX_FLOAT))
+
+    standard_error = np.nan
+    if compute_standard_error:
+        sum_squared_residuals = 0.0
+        for i in range(n_draws):
+            residual = (probabilities[i] - average_probability) - coefficient * (
+                controls[i] - control
+            )
+            sum_squared_residuals += weights[i] ** 2 * residual**2
+        standard_error = np.sqrt(sum_squared_residuals) / sum_weights
+
+    return smoothed_log_probability, standard_error
+
+
+@nb.guvectorize(
+    ["f8[:], f8[:], f8[:], f8[:], f8, i8, f8, f8[:]"],
+    "(n_choices), (n_choices), (n_choices), (n_choices), (), (), () -> ()",
+    nopython=True,
+    target="parallel",
+)
+def _compute_log_probability_of_observed_choice_with_ev_shocks(
+    wages, nonpec, continuation_values, draws, delta, choice, scale, log_probability
+):
+    """Compute the log probability of the agent's choice with extreme value shocks.
+
+    With i.i.d. extreme value shocks, the choice probabilities are the softmax of the
+    value functions without shocks divided by the scale of the shocks. The ``draws``
+    are created by :func:`~respy.shared.create_unit_draws` such that
+    :func:`~respy.shared.aggregate_keane_wolpin_utility` returns the value functions
+    without shocks.
+
+    """
+    n_choices = wages.shape[0]
+    value_functions = np.empty(n_choices)
+
+    for j in range(n_choices):
+        value_function, _ = aggregate_keane_wolpin_utility(
+            wages[j], nonpec[j], continuation_values[j], draws[j], delta
+        )
+        value_functions[j] = value_function / scale
+
+    log_probability[0] = value_functions[choice] - _logsumexp(value_functions)
+
+
+def _compute_log_probability_of_wages_with_ev_shocks(
+    log_wages_observed, wages, choices, meas_sds
+):
+    """Compute the log likelihood of observed wages with extreme value shocks.
+
+    Extreme value shocks do not enter wages. Thus, observed log wages deviate from the
+    systematic log wages only by the measurement error. Missing wages and wages of
+    non-wage choices have a log likelihood of zero.
+
+    """
+    log_wages_systematic = np.log(
+        np.clip(np.choose(choices, wages.T), 1 / MAX_FLOAT, MAX_FLOAT)
+    )
+    sds = meas_sds[choices]
+    is_observed = np.isfinite(log_wages_observed) & (sds > 0)
+
+    log_prob_wages = np.zeros(len(log_wages_observed))
+    log_prob_wages[is_observed] = stats.norm.logpdf(
+        log_wages_observed[is_observed],
+        log_wages_systematic[is_observed],
+        sds[is_observed],
+    )
 
-    smoothed_log_probability[0] = smoothed_log_prob
+    return log_prob_wages
 
 
 def _process_estimation_data(df, state_space, optim_paras, options):
@@ -483,8 +1212,8 @@ def _process_estimation_data(df, state_space, optim_paras, options):
     All necessary objects for :func:`_internal_log_like_obs` dependent on the data are
     produced.
 
-    Some objects have to be repeated for each type which is a desirable format for the
-    estimation where every observations is weighted by type probabilities.
+    The data is not repeated for each type. The core index of an observation does not
+    depend on the type and only the dense keys are computed for every type.
 
     Parameters
     ----------
@@ -492,27 +1221,23 @@ def _process_estimation_data(df, state_space, optim_paras, options):
         The DataFrame which contains the data used for estimation. The DataFrame
         contains individual identifiers, periods, experiences, lagged choices, choices
         in current period, the wage and other observed data.
-    indexer : numpy.ndarray
-        Indexer for the core state space.
+    state_space : :class:`~respy.state_space.StateSpace`
     optim_paras : dict
     options : dict
 
     Returns
     -------
-    choices : numpy.ndarray
-        Array with shape (n_observations, n_types) where information is only repeated
-        over the second axis.
-    idx_indiv_first_obs : numpy.ndarray
-        Array with shape (n_individuals,) containing indices for the first observations
-        of each individual.
-    indices : numpy.ndarray
-        Array with shape (n_observations, n_types) containing indices for states which
-        correspond to observations.
-    log_wages_observed : numpy.ndarray
-        Array with shape (n_observations, n_types) containing clipped log wages.
-    type_covariates : numpy.ndarray
-        Array with shape (n_individuals, n_type_covariates) containing covariates to
-        predict probabilities for each type.
+    df : pandas.DataFrame
+        Contains one row per observation with the choice, the clipped log wage and the
+        core index of the state. If ``options["estimation_deduplicate_observations"]``
+        is true, the columns ``"cell"`` and ``"is_representative"`` are added. See
+        :func:`_find_cells_of_identical_observations`.
+    dense_keys : numpy.ndarray
+        Array with shape (n_observations, n_types) containing the dense keys of the
+        states of every observation and type.
+    type_covariates : pandas.DataFrame or None
+        Contains the covariates of the first observation of each individual to predict
+        the type probabilities in models with types.
 
     """
     n_types = optim_paras["n_types"]
@@ -525,21 +1250,31 @@ def _process_estimation_data(df, state_space, optim_paras, options):
     )
     df = convert_labeled_variables_to_codes(df, optim_paras)
 
-    # Duplicate observations for each type.
+    # Observations are not duplicated for each type. Only the dense keys differ.
     if n_types >= 2:
-        df = pd.concat([df.copy().assign(type=i) for i in range(n_types)])
-
-    df["dense_key"], df["core_index"] = map_observations_to_states(
-        df, state_space, optim_paras
-    )
+        dense_keys, df["core_index"] = map_observations_to_states_of_types(
+            df, state_space, optim_paras
+        )
+    else:
+        dense_key, df["core_index"] = map_observations_to_states(
+            df, state_space, optim_paras
+        )
+        dense_keys = dense_key.reshape(-1, 1)
 
-    # For the estimation, log wages are needed with shape (n_observations, n_types).
     df["log_wage"] = np.log(np.clip(df.wage.to_numpy(), 1 / MAX_FLOAT, MAX_FLOAT))
     df = df.drop(columns="wage")
 
+    if options["estimation_deduplicate_observations"]:
+        (
+            df["cell"],
+            df["is_representative"],
+        ) = _find_cells_of_identical_observations(df, dense_keys[:, 0])
+
     # For the type covariates, we only need the first observation of each individual.
+    # The dense keys of the first type are used to split the data.
     if n_types >= 2:
-        initial_states = df.query("period == 0").copy()
+        is_initial = df.index.get_level_values("period") == 0
+        initial_states = df.loc[is_initial].assign(dense_key=dense_keys[is_initial, 0])
         type_covariates = compute_covariates(
             initial_states, options["covariates_core"], raise_errors=False
         )
@@ -547,7 +1282,112 @@ def _process_estimation_data(df, state_space, optim_paras, options):
     else:
         type_covariates = None
 
-    return df, type_covariates
+    return df, dense_keys, type_covariates
+
+
+def _find_cells_of_identical_observations(df, dense_key):
+    """Find cells of observations which contribute identically to the likelihood.
+
+    Observations without a wage share a cell if they have the same dense key, core
+    index and choice. Their choice probabilities are equal if the draws are shared by
+    the cell. Observations with wages form cells on their own. The cells do not depend
+    on the type because types only change the dense keys of all observations in the
+    same way. Thus, the dense keys of any type can be used.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Contains the choice, the log wage and the core index of every observation.
+    dense_key : numpy.ndarray
+        Array with shape (n_observations,) containing the dense keys of one type.
+
+    Returns
+    -------
+    cell : numpy.ndarray
+        Array with shape (n_observations,) containing the number of the cell among the
+        cells of the same dense key in the order of appearance.
+    is_representative : numpy.ndarray
+        Array with shape (n_observations,) which indicates the first observation of
+        every cell.
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({
+    ...     "choice": [0, 0, 1, 0, 0],
+    ...     "log_wage": [np.nan, np.nan, np.nan, 1.0, 1.0],
+    ...     "core_index": [3, 3, 3, 3, 3],
+    ... })
+    >>> cell, is_representative = _find_cells_of_identical_observations(
+    ...     df, np.array([0, 0, 0, 0, 1])
+    ... )
+    >>> cell
+    array([0, 0, 1, 2, 0])
+    >>> is_representative
+    array([ True, False,  True,  True,  True])
+
+    """
+    n_observations = len(df)
+    has_wage = df["log_wage"].notna().to_numpy()
+    identifiers = pd.DataFrame(
+        {
+            "dense_key": dense_key,
+            "core_index": df["core_index"].to_numpy(),
+            "choice": df["choice"].to_numpy(),
+            "observation": np.where(has_wage, np.arange(n_observations), -1),
+        }
+    )
+    global_cell = identifiers.groupby(list(identifiers), sort=False).ngroup().to_numpy()
+
+    _, first_observations = np.unique(global_cell, return_index=True)
+    is_representative = np.zeros(n_observations, dtype=bool)
+    is_representative[first_observations] = True
+
+    position_in_dense_key = (
+        pd.Series(is_representative).groupby(dense_key).cumsum().to_numpy() - 1
+    )
+    global_to_local_cell = np.empty(len(first_observations), dtype=np.int64)
+    global_to_local_cell[global_cell[first_observations]] = position_in_dense_key[
+        first_observations
+    ]
+    cell = global_to_local_cell[global_cell]
+
+    return cell, is_representative
+
+
+def _process_weights(df, weights):
+    """Extract the frequency weights of individuals from the data.
+
+    Examples
+    --------
+    >>> index = pd.MultiIndex.from_product(
+    ...     [range(2), range(2)], names=["Identifier", "Period"]
+    ... )
+    >>> df = pd.DataFrame({"Weight": [3, 3, 1, 1]}, index=index)
+    >>> _process_weights(df, "Weight")
+    array([3., 1.])
+    >>> _process_weights(df.assign(Weight=[3, 2, 1, 1]), "Weight")
+    Traceback (most recent call last):
+     ...
+    ValueError: The weights in column 'Weight' must be constant within individuals.
+
+    """
+    if weights is None:
+        return None
+
+    if weights not in df.columns:
+        raise ValueError(f"The data has no column '{weights}' with weights.")
+
+    grouped_weights = df[weights].groupby("Identifier")
+    if (grouped_weights.nunique() != 1).any():
+        raise ValueError(
+            f"The weights in column '{weights}' must be constant within individuals."
+        )
+
+    weights_of_individuals = grouped_weights.first().to_numpy(dtype=float)
+    if not (np.isfinite(weights_of_individuals) & (weights_of_individuals > 0)).all():
+        raise ValueError(f"The weights in column '{weights}' must be positive.")
+
+    return weights_of_individuals
 
 
 def _update_optim_paras_with_initial_experience_levels(optim_paras, df):
@@ -576,9 +1416,25 @@ def _update_optim_paras_with_initial_experience_levels(optim_paras, df):
     return optim_paras
 
 
-def _create_comparison_plot_data(df, log_type_probabilities, optim_paras):
-    """Create DataFrame for estimagic's comparison plot."""
-    df = df.copy()
+def _create_comparison_plot_data(df, loglikes, log_type_probabilities, optim_paras):
+    """Create DataFrame for estimagic's comparison plot.
+
+    In models with types, the log likelihoods are reported for every type.
+
+    """
+    columns = ["loglike_choice", "loglike_wage"]
+    if optim_paras["n_types"] >= 2:
+        loglikes = loglikes[columns].stack("type")
+        observations = loglikes.index.droplevel("type")
+        id_vars = ["identifier", "period", "type", "choice"]
+    else:
+        loglikes = loglikes[columns]
+        observations = loglikes.index
+        id_vars = ["identifier", "period", "choice"]
+
+    data = df[["choice", "log_wage"]].reindex(observations)
+    data.index = loglikes.index
+    df = pd.concat([data, loglikes], axis=1)
 
     df["choice"] = (
         df["choice"].replace(dict(enumerate(optim_paras["choices"]))).astype("category")
@@ -593,7 +1449,7 @@ def _create_comparison_plot_data(df, log_type_probabilities, optim_paras):
     columns = df.filter(like="loglike").columns.tolist() + ["choice"]
     df = df[columns]
 
-    df = df.reset_index().melt(id_vars=["identifier", "period", "choice"])
+    df = df.reset_index().melt(id_vars=id_vars)
     df = df.astype({"identifier": "uint16", "period": "uint8"})
 
     splitted_label = df.variable.str.split("_", expand=True)
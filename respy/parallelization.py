@@ -1,11 +1,101 @@
 """This module contains the code to control parallel execution."""
+import contextlib
+import contextvars
 import functools
+import inspect
+import os
 
 import joblib
 import pandas as pd
 
 
-def parallelize_across_dense_dimensions(func=None, *, n_jobs=1):
+PARALLEL_BACKENDS = ["serial", "threads", "processes"]
+"""list : Backends which can execute functions across dense dimensions.
+
+- ``"serial"`` evaluates the function for one dense key after another.
+- ``"threads"`` uses a pool of threads which is useful if the function spends most of
+  its time in compiled code which releases the GIL.
+- ``"processes"`` uses the persistent process pool of :mod:`joblib`. Large arrays are
+  not pickled for every call, but dumped once per call of the decorated function to
+  memory-mapped files which are shared by all workers.
+
+"""
+
+_JOBLIB_BACKENDS = {"threads": "threading", "processes": "loky"}
+
+# The active backend is local to the thread and the context such that criterion
+# functions which run concurrently in different threads do not change each other's
+# backend.
+_ACTIVE_BACKEND = contextvars.ContextVar("respy_active_backend", default=("serial", 1))
+
+
+@contextlib.contextmanager
+def parallel_backend(backend=None, n_jobs=None):
+    """Select the backend of :func:`parallelize_across_dense_dimensions`.
+
+    Parameters
+    ----------
+    backend : str or None, default None
+        One of :data:`PARALLEL_BACKENDS`. If ``None``, the active backend is kept.
+    n_jobs : int or None, default None
+        Number of workers. If ``None``, all available cores are used for parallel
+        backends.
+
+    Examples
+    --------
+    >>> with parallel_backend("threads", n_jobs=2):
+    ...     get_active_backend()
+    ('threads', 2)
+    >>> get_active_backend()
+    ('serial', 1)
+
+    """
+    if backend is not None and backend not in PARALLEL_BACKENDS:
+        raise ValueError(
+            f"Backend '{backend}' is unknown. Use one of {PARALLEL_BACKENDS}."
+        )
+
+    if backend is None:
+        active = _ACTIVE_BACKEND.get()
+    elif backend == "serial":
+        active = ("serial", 1)
+    else:
+        active = (backend, os.cpu_count() if n_jobs is None else n_jobs)
+
+    token = _ACTIVE_BACKEND.set(active)
+    try:
+        yield
+    finally:
+        _ACTIVE_BACKEND.reset(token)
+
+
+def get_active_backend():
+    """Get the name of the active backend and the number of workers."""
+    return _ACTIVE_BACKEND.get()
+
+
+def use_parallel_backend_from_options(func):
+    """Run the decorated function with the backend requested in its options.
+
+    The decorated function must have an argument called ``options`` which contains the
+    keys ``"parallel_backend"`` and ``"n_jobs"``. If the backend is ``None``, the
+    backend selected with :func:`parallel_backend` is used.
+
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper_use_parallel_backend_from_options(*args, **kwargs):
+        options = signature.bind(*args, **kwargs).arguments["options"]
+        with parallel_backend(options["parallel_backend"], options["n_jobs"]):
+            out = func(*args, **kwargs)
+
+        return out
+
+    return wrapper_use_parallel_backend_from_options
+
+
+def parallelize_across_dense_dimensions(func=None, *, n_jobs=None):
     """Parallelizes decorated function across dense state space dimensions.
 
     Parallelization is only possible if the decorated function has no side-effects to
@@ -21,6 +111,10 @@ def parallelize_across_dense_dimensions(func=None, *, n_jobs=1):
     across dense dimensions by patching the attribute access such that each sub state
     space can only access its attributes.
 
+    The backend which executes the function across dense dimensions is selected with
+    :func:`parallel_backend`. If ``n_jobs`` is passed to the decorator, it overrides the
+    number of workers of the active backend.
+
     The decorator can be applied to functions without trailing parentheses. At the same
     time, the `*` prohibits to use the decorator with positional arguments.
 
@@ -35,9 +129,8 @@ def parallelize_across_dense_dimensions(func=None, *, n_jobs=1):
             if dense_keys:
                 args_, kwargs_ = _broadcast_arguments(args, kwargs, dense_keys)
 
-                out = joblib.Parallel(n_jobs=n_jobs)(
-                    joblib.delayed(func)(*args_[idx], **kwargs_[idx], **bypass)
-                    for idx in dense_keys
+                out = _map_over_dense_keys(
+                    func, args_, kwargs_, bypass, dense_keys, n_jobs
                 )
                 # Re-order multiple return values from list of tuples to tuple of lists
                 # to tuple of dictionaries to set as state space attributes.
@@ -65,6 +158,22 @@ def parallelize_across_dense_dimensions(func=None, *, n_jobs=1):
         return decorator_parallelize_across_dense_dimensions
 
 
+def _map_over_dense_keys(func, args, kwargs, bypass, dense_keys, n_jobs):
+    """Evaluate the function for every dense key with the active backend."""
+    backend, n_jobs_ = get_active_backend()
+    n_jobs = n_jobs_ if n_jobs is None else n_jobs
+
+    if backend == "serial" or n_jobs == 1 or len(dense_keys) == 1:
+        out = [func(*args[idx], **kwargs[idx], **bypass) for idx in dense_keys]
+    else:
+        out = joblib.Parallel(n_jobs=n_jobs, backend=_JOBLIB_BACKENDS[backend])(
+            joblib.delayed(func)(*args[idx], **kwargs[idx], **bypass)
+            for idx in dense_keys
+        )
+
+    return out
+
+
 def split_and_combine_df(func):
     """Split the data across dense indices, run a function, and combine again."""
 
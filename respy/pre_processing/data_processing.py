@@ -0,0 +1,106 @@
+"""Process data before the estimation."""
+import numpy as np
+import pandas as pd
+
+
+def collapse_identical_histories(df, weights=None):
+    """Collapse individuals with identical histories into weighted individuals.
+
+    Individuals have identical histories if they are observed in the same periods and
+    all variables including choices, wages and observable characteristics are equal
+    in every period. Only the first individual of every group of identical individuals
+    is kept and the identifiers are renumbered consecutively in the order of first
+    appearance. The number of individuals in the group is stored in the column
+    ``"Weight"`` which can be passed to :func:`~respy.likelihood.get_log_like_func`.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+        Data for the estimation with a :class:`pandas.MultiIndex` of ``"Identifier"``
+        and ``"Period"``.
+    weights : str, default None
+        Name of a column with frequency weights of individuals which is summed for
+        identical individuals and excluded from the comparison. Allows to collapse
+        data which is already collapsed. If None, every individual has weight one.
+
+    Returns
+    -------
+    df : pandas.DataFrame
+        Data with one individual per history and the column ``"Weight"``.
+
+    Raises
+    ------
+    ValueError
+        If the data contains a column ``"Weight"`` which is not passed as ``weights``.
+        Otherwise, the column would be overwritten, e.g., the weights of data which is
+        already collapsed would be lost.
+
+    Examples
+    --------
+    >>> index = pd.MultiIndex.from_product(
+    ...     [range(3), range(2)], names=["Identifier", "Period"]
+    ... )
+    >>> df = pd.DataFrame({"Choice": ["a", "b", "a", "a", "a", "b"]}, index=index)
+    >>> collapsed = collapse_identical_histories(df)
+    >>> collapsed.groupby("Identifier")["Weight"].first().to_dict()
+    {0: 2, 1: 1}
+    >>> collapsed.loc[1, "Choice"].tolist()
+    ['a', 'a']
+
+    Collapsed data can be collapsed again by passing its weights.
+
+    >>> collapsed = collapse_identical_histories(collapsed, weights="Weight")
+    >>> collapsed.groupby("Identifier")["Weight"].first().to_dict()
+    {0: 2, 1: 1}
+
+    """
+    if "Weight" in df.columns and weights != "Weight":
+        raise ValueError(
+            "The data already contains a column 'Weight'. Pass weights='Weight' if it "
+            "contains frequency weights or rename the column."
+        )
+
+    df = df.sort_index()
+    identifiers = df.index.get_level_values("Identifier")
+    columns = [column for column in df.columns if column != weights]
+
+    # Compare histories in a wide format with one row per individual. Factorizing the
+    # variables allows to compare categoricals and missing wages.
+    codes = pd.DataFrame(
+        {column: pd.factorize(df[column])[0] for column in columns}, index=df.index
+    )
+    histories = codes.unstack("Period", fill_value=-2)
+    _, first_individuals, groups, counts = np.unique(
+        histories.to_numpy(),
+        axis=0,
+        return_index=True,
+        return_inverse=True,
+        return_counts=True,
+    )
+    groups = groups.reshape(-1)
+
+    if weights is None:
+        group_weights = counts
+    else:
+        individual_weights = df[weights].groupby(identifiers).first().to_numpy()
+        group_weights = np.bincount(groups, weights=individual_weights).astype(
+            individual_weights.dtype
+        )
+
+    order = np.argsort(first_individuals)
+    representatives = histories.index[first_individuals[order]]
+
+    collapsed = df.loc[identifiers.isin(representatives), columns].copy()
+    new_identifiers = pd.Series(np.arange(len(representatives)), index=representatives)
+    collapsed.index = pd.MultiIndex.from_arrays(
+        [
+            new_identifiers.loc[collapsed.index.get_level_values("Identifier")],
+            collapsed.index.get_level_values("Period"),
+        ],
+        names=["Identifier", "Period"],
+    )
+    collapsed["Weight"] = group_weights[order][
+        collapsed.index.get_level_values("Identifier")
+    ]
+
+    return collapsed.sort_index()
@@ -1,19 +1,25 @@
 """Everything related to validate the model."""
+from pathlib import Path
+
 import numba as nb
 import numpy as np
 
+from respy.parallelization import PARALLEL_BACKENDS
+from respy.quadrature import QUADRATURE_RULES
+
 
 def validate_options(o):
     """Validate the options provided by the user."""
     assert _is_positive_nonzero_integer(o["n_periods"])
 
     for option, value in o.items():
-        if "draws" in option:
+        if "draws" in option and option != "store_draws":
             assert _is_positive_nonzero_integer(value)
         elif option.endswith("_seed"):
             assert _is_nonnegative_integer(value)
 
     assert 0 < o["estimation_tau"]
+    assert isinstance(o["estimation_deduplicate_observations"], bool)
     assert (
         _is_positive_nonzero_integer(o["interpolation_points"])
         or o["interpolation_points"] == -1
@@ -28,7 +34,26 @@ def validate_options(o):
         and all(isinstance(condition, str) for condition in val)
         for key, val in o["negative_choice_set"].items()
     )
-    assert o["monte_carlo_sequence"] in ["random", "halton", "sobol"]
+    assert o["monte_carlo_sequence"] in [
+        "random",
+        "halton",
+        "sobol",
+        "scrambled_halton",
+        "scrambled_sobol",
+    ]
+    assert o["cache_compression"] in [None, "snappy", "gzip", "brotli", "lz4", "zstd"]
+    assert _is_nonnegative_integer(o["cache_memory_limit"])
+    assert _is_nonnegative_integer(o["solution_cache_memory_limit"])
+    assert o["parallel_backend"] is None or o["parallel_backend"] in PARALLEL_BACKENDS
+    assert o["n_jobs"] is None or _is_positive_nonzero_integer(o["n_jobs"])
+    for option in ["state_space_path", "state_space_cache"]:
+        assert o[option] is None or isinstance(o[option], (str, Path))
+    assert isinstance(o["store_draws"], bool)
+    assert o["emax_integration"] in ["monte_carlo"] + QUADRATURE_RULES
+    assert _is_positive_nonzero_integer(o["quadrature_level"])
+    assert o["variance_reduction"] in [None, "antithetic", "control_variate"]
+    assert o["variance_reduction"] is None or o["emax_integration"] == "monte_carlo"
+    assert isinstance(o["monte_carlo_standard_errors"], bool)
 
 
 def validate_params(params, optim_paras):
@@ -40,6 +65,11 @@ def _validate_shocks(params, optim_paras):
     """Validate that the elements of the shock matrix are correctly sorted."""
     choices = list(optim_paras["choices"])
 
+    if "shocks_ev" in params.index:
+        names = params.loc["shocks_ev"].index.get_level_values("name")
+        assert list(names) == ["scale"], "'shocks_ev' only contains the 'scale'."
+        return
+
     if "shocks_sdcorr" in params.index:
         sds_flat = [f"sd_{c}" for c in choices]
 
@@ -52,6 +52,277 @@ def process_params_and_options(params, options):
     return optim_paras, options
 
 
+class ParameterPlan:
+    """Map parameters with a fixed structure to ``optim_paras`` and ``options``.
+
+    During an estimation, only the values of the parameters change whereas the index of
+    ``params`` and the options stay the same. :func:`process_params_and_options` parses
+    the complete model specification on every call. The plan parses the specification
+    once and records the positions of all parameters which enter ``optim_paras`` as
+    numbers, for example, the coefficients of the rewards, the discount factor, the
+    shocks and the coefficients of distributions like the type probabilities.
+
+    Calling the plan with new parameters only updates these numeric entries. The
+    remaining parameters, like probabilities or the maximum experience, influence the
+    structure of the model. If their values or the index of ``params`` differ from the
+    parameters the plan was built with, the plan falls back to
+    :func:`process_params_and_options`.
+
+    Parameters
+    ----------
+    params : pandas.DataFrame or pandas.Series
+        Contains the parameters of the model.
+    options : dict
+        Contains the options of the model.
+
+    """
+
+    def __init__(self, params, options):
+        self.options = options
+        params = _read_params(params)
+        self.optim_paras, self.processed_options = process_params_and_options(
+            params, options
+        )
+        self.index = params.index
+
+        try:
+            values = params.to_numpy(dtype=np.float64)
+        except (TypeError, ValueError):
+            self.updaters = None
+        else:
+            self.updaters = self._create_updaters()
+            covered = np.concatenate(
+                [np.empty(0, dtype=np.int64)]
+                + [updater[1] for updater in self.updaters]
+            )
+            self.structural_positions = np.setdiff1d(np.arange(len(values)), covered)
+            self.structural_values = values[self.structural_positions]
+
+    def __call__(self, params):
+        """Process the parameters.
+
+        Returns
+        -------
+        optim_paras : dict
+            Parsed model parameters affected by the optimization.
+        options : dict
+            Optimization independent model options.
+
+        """
+        params = _read_params(params)
+
+        values = self._get_values_with_same_structure(params)
+        if values is None:
+            optim_paras, options = process_params_and_options(params, self.options)
+
+        else:
+            optim_paras = _copy_containers(self.optim_paras)
+            for path, positions, function in self.updaters:
+                container = optim_paras
+                for key in path[:-1]:
+                    container = container[key]
+                container[path[-1]] = function(values[positions])
+            optim_paras["beta_delta"] = optim_paras["beta"] * optim_paras["delta"]
+
+            options = _copy_containers(self.processed_options)
+            options = _create_internal_seeds_from_user_seeds(options)
+
+        return optim_paras, options
+
+    def _get_values_with_same_structure(self, params):
+        """Get the values of the parameters if they share the structure of the plan."""
+        values = None
+        if self.updaters is not None and (
+            params.index is self.index or params.index.equals(self.index)
+        ):
+            try:
+                values_ = params.to_numpy(dtype=np.float64)
+            except (TypeError, ValueError):
+                pass
+            else:
+                if np.array_equal(
+                    values_[self.structural_positions],
+                    self.structural_values,
+                    equal_nan=True,
+                ):
+                    values = values_
+
+        return values
+
+    def _create_updaters(self):
+        """Create functions which map parameter values to entries of ``optim_paras``.
+
+        Each updater is a tuple of the path to the entry in ``optim_paras``, the
+        positions of the parameters in ``params`` and a function which converts the
+        values of the parameters to the entry.
+
+        """
+        optim_paras = self.optim_paras
+        categories = self.index.get_level_values("category")
+        names = self.index.get_level_values("name")
+
+        updaters = [(("delta",), self.index.get_indexer([("delta", "delta")]), _first)]
+        if ("beta", "beta") in self.index:
+            updaters.append(
+                (("beta",), self.index.get_indexer([("beta", "beta")]), _first)
+            )
+
+        for category, function in [
+            ("shocks_sdcorr", _sdcorr_params_to_cholesky),
+            ("shocks_cov", _cov_params_to_cholesky),
+            ("shocks_chol", chol_params_to_lower_triangular_matrix),
+        ]:
+            if category in categories:
+                updaters.append(
+                    (
+                        ("shocks_cholesky",),
+                        np.flatnonzero(categories == category),
+                        function,
+                    )
+                )
+
+        if optim_paras["shocks_distribution"] == "extreme_value":
+            updaters.append(
+                (
+                    ("shocks_ev_scale",),
+                    self.index.get_indexer([("shocks_ev", "scale")]),
+                    _parse_extreme_value_scale,
+                )
+            )
+
+        if optim_paras["has_meas_error"]:
+            labels = [("meas_error", f"sd_{c}") for c in optim_paras["choices_w_wage"]]
+            updaters.append(
+                (
+                    ("meas_error",),
+                    self.index.get_indexer(labels),
+                    _MeasurementErrors(len(optim_paras["choices"])),
+                )
+            )
+
+        # Collect the paths to all coefficients in ``optim_paras`` and their category.
+        paths = [
+            ((f"{kind}_{choice}",), f"{kind}_{choice}")
+            for kind in ["wage", "nonpec"]
+            for choice in optim_paras["choices"]
+        ]
+        paths += [
+            (("type_prob", type_), f"type_{type_}")
+            for type_ in optim_paras.get("type_prob", {})
+        ]
+        paths += [
+            ((f"lagged_choice_{lag}", choice), f"lagged_choice_{lag}_{choice}")
+            for lag in range(1, optim_paras["n_lagged_choices"] + 1)
+            for choice in optim_paras[f"lagged_choice_{lag}"]
+        ]
+        paths += [
+            (("choices", choice, "start", level), f"initial_exp_{choice}_{level}")
+            for choice in optim_paras["choices_w_exp"]
+            for level in optim_paras["choices"][choice]["start"]
+        ]
+        paths += [
+            ((kind, name, level), f"{prefix}_{name}_{level}")
+            for kind, prefix in [
+                ("observables", "observable"),
+                ("exogenous_processes", "exogenous_process"),
+            ]
+            for name in optim_paras[kind]
+            for level in optim_paras[kind][name]
+        ]
+
+        for path, category in paths:
+            positions = np.flatnonzero(categories == category)
+            entry = optim_paras
+            for key in path:
+                entry = entry.get(key) if isinstance(entry, dict) else None
+
+            # Probabilities are transformed to logit coefficients. Their values are
+            # treated as structural.
+            if (
+                len(positions)
+                and isinstance(entry, pd.Series)
+                and entry.index.equals(names[positions])
+            ):
+                updaters.append((path, positions, _SeriesWithIndex(entry)))
+
+        return updaters
+
+
+def _first(x):
+    """Return the first element of an array."""
+    return x[0]
+
+
+def _parse_extreme_value_scale(x):
+    """Return the scale of the extreme value shocks which must be positive.
+
+    The check is part of the parser and the updater of :class:`ParameterPlan` such that
+    invalid scales are also rejected during an optimization.
+
+    Examples
+    --------
+    >>> _parse_extreme_value_scale([0.5])
+    0.5
+    >>> _parse_extreme_value_scale([0])
+    Traceback (most recent call last):
+     ...
+    ValueError: The scale of the extreme value shocks must be positive, but is 0.0.
+
+    """
+    scale = float(x[0])
+    if not (np.isfinite(scale) and scale > 0):
+        raise ValueError(
+            f"The scale of the extreme value shocks must be positive, but is {scale}."
+        )
+
+    return scale
+
+
+def _sdcorr_params_to_cholesky(x):
+    """Convert standard deviations and correlations to the Cholesky factor."""
+    return robust_cholesky(sdcorr_params_to_matrix(x))
+
+
+def _cov_params_to_cholesky(x):
+    """Convert the elements of a covariance matrix to the Cholesky factor."""
+    return robust_cholesky(cov_params_to_matrix(x))
+
+
+class _SeriesWithIndex:
+    """Create a :class:`pandas.Series` with the index and name of a template."""
+
+    def __init__(self, template):
+        self.index = template.index
+        self.name = template.name
+
+    def __call__(self, values):
+        return pd.Series(values, index=self.index, name=self.name)
+
+
+class _MeasurementErrors:
+    """Create the array of standard deviations of measurement errors for all choices."""
+
+    def __init__(self, n_choices):
+        self.n_choices = n_choices
+
+    def __call__(self, values):
+        meas_error = np.zeros(self.n_choices)
+        meas_error[: len(values)] = values
+        return meas_error
+
+
+def _copy_containers(x):
+    """Copy nested dictionaries and lists without copying their elements."""
+    if isinstance(x, dict):
+        out = {key: _copy_containers(value) for key, value in x.items()}
+    elif isinstance(x, list):
+        out = [_copy_containers(value) for value in x]
+    else:
+        out = x
+
+    return out
+
+
 def _read_options(dict_or_path):
     """Read the options which can either be a dictionary or a path."""
     if isinstance(dict_or_path, Path):
@@ -302,9 +573,22 @@ def _parse_initial_and_max_experience(optim_paras, params, options):
 
 
 def _parse_shocks(optim_paras, params):
-    """Parse the shock parameters and create the Cholesky factor."""
-    if sum(f"shocks_{i}" in params.index for i in ["sdcorr", "cov", "chol"]) >= 2:
+    """Parse the shock parameters and create the Cholesky factor.
+
+    The shocks follow a multivariate normal distribution unless the category
+    ``"shocks_ev"`` contains the ``"scale"`` of i.i.d. extreme value shocks with mean
+    zero. Extreme value shocks enter the rewards of all choices additively and the
+    Cholesky factor is set to zero.
+
+    """
+    if sum(f"shocks_{i}" in params.index for i in ["sdcorr", "cov", "chol", "ev"]) >= 2:
         raise ValueError("It is not allowed to define multiple shock matrices.")
+    elif "shocks_ev" in params.index:
+        n_choices = len(optim_paras["choices"])
+        optim_paras["shocks_ev_scale"] = _parse_extreme_value_scale(
+            [params.loc[("shocks_ev", "scale")]]
+        )
+        optim_paras["shocks_cholesky"] = np.zeros((n_choices, n_choices))
     elif "shocks_sdcorr" in params.index:
         cov = sdcorr_params_to_matrix(params.loc["shocks_sdcorr"])
         optim_paras["shocks_cholesky"] = robust_cholesky(cov)
@@ -318,6 +602,10 @@ def _parse_shocks(optim_paras, params):
     else:
         raise KeyError("No shock matrix is specified.")
 
+    optim_paras["shocks_distribution"] = (
+        "extreme_value" if "shocks_ev" in params.index else "normal"
+    )
+
     return optim_paras
 
 
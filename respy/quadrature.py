@@ -0,0 +1,172 @@
+"""Quadrature rules for the integration over the shocks.
+
+The expected value functions and the choice probabilities are integrals over the
+multivariate normal distribution of the shocks. By default, they are approximated by
+Monte Carlo integration where every draw has the same weight. For models with few
+choices, Gauss-Hermite quadrature reaches the same accuracy with far fewer nodes.
+
+The rules in this module integrate over the standard normal distribution. The nodes
+replace the standard normal base draws and are transformed with the Cholesky factor of
+the shocks like them. The weights sum to one.
+
+- ``"gauss_hermite"`` is the tensor product of one-dimensional Gauss-Hermite rules with
+  ``options["quadrature_level"]`` nodes each. The number of nodes grows exponentially
+  with the number of choices.
+- ``"smolyak"`` combines tensor products of smaller rules to a sparse grid following
+  [1]_. The largest one-dimensional rule has ``options["quadrature_level"]`` nodes.
+  Some weights are negative. Since the maximum over the value functions has kinks, the
+  rule is less accurate than for smooth integrands and the error does not vanish with
+  higher levels. In kw_94_one with ten periods, the expected value functions with
+  levels 3 and 5 deviate by up to 9% from a Monte Carlo solution with 10,000 draws
+  while the deviations of Gauss-Hermite rules are 2% and 1%. Thus, the rule is only
+  suited for quick approximations of the expected value functions in models with many
+  choices, e.g., to explore a model or to find starting values.
+
+Both rules are used for the expected value functions. In the likelihood, the choice
+probabilities are smoothed with a logit kernel over the nodes. Negative weights make
+the smoothed probabilities negative or close to zero and bias the likelihood severely.
+Thus, only ``"gauss_hermite"`` is used for the choice probabilities. With
+``"smolyak"``, they are simulated with Monte Carlo integration and
+``options["estimation_draws"]`` draws while the expected value functions still use the
+sparse grid. See :func:`~respy.likelihood.get_integration_of_choice_probabilities`.
+
+References
+----------
+.. [1] Heiss, F., & Winschel, V. (2008). `Likelihood approximation by numerical
+       integration on sparse grids <https://doi.org/10.1016/j.jeconom.2007.12.004>`_.
+       *Journal of Econometrics*, 144(1), 62-80.
+
+"""
+import functools
+import itertools
+from math import comb
+
+import numpy as np
+
+
+QUADRATURE_RULES = ["gauss_hermite", "smolyak"]
+
+
+def create_integration_nodes_and_weights(n_dims, options, rule=None):
+    """Create the nodes and weights of the quadrature rule in the options.
+
+    Parameters
+    ----------
+    n_dims : int
+        Number of dimensions, i.e., the number of admissible choices.
+    options : dict
+        Contains ``"emax_integration"`` and ``"quadrature_level"``.
+    rule : str, default None
+        Quadrature rule which overrides ``options["emax_integration"]``.
+
+    Returns
+    -------
+    nodes : numpy.ndarray
+        Array with shape (n_nodes, n_dims) containing the nodes.
+    weights : numpy.ndarray
+        Array with shape (n_nodes,) containing the weights which sum to one.
+
+    Examples
+    --------
+    >>> options = {"emax_integration": "gauss_hermite", "quadrature_level": 3}
+    >>> nodes, weights = create_integration_nodes_and_weights(2, options)
+    >>> nodes.shape
+    (9, 2)
+    >>> round(float(weights @ nodes[:, 0] ** 2), 12)
+    1.0
+
+    """
+    rule = options["emax_integration"] if rule is None else rule
+    return _create_quadrature_rule(n_dims, rule, options["quadrature_level"])
+
+
+def get_integration_weights(n_draws, n_dims, options, rule=None):
+    """Get the weights of the integration nodes.
+
+    Monte Carlo integration uses weights of one which are normalized by their sum in
+    the kernels. Thus, the results are the same as with the simple average. ``rule``
+    overrides ``options["emax_integration"]``.
+
+    """
+    rule = options["emax_integration"] if rule is None else rule
+    if rule == "monte_carlo":
+        weights = np.ones(n_draws)
+    else:
+        weights = create_integration_nodes_and_weights(n_dims, options, rule)[1]
+    return weights
+
+
+@functools.lru_cache(maxsize=None)
+def _create_quadrature_rule(n_dims, rule, level):
+    if rule == "gauss_hermite":
+        nodes_1d, weights_1d = _create_gauss_hermite_rule(level)
+        nodes = np.array(list(itertools.product(nodes_1d, repeat=n_dims)))
+        weights = np.array(
+            [np.prod(w) for w in itertools.product(weights_1d, repeat=n_dims)]
+        )
+    elif rule == "smolyak":
+        nodes, weights = _create_smolyak_rule(n_dims, level)
+    else:
+        raise NotImplementedError(f"Unknown quadrature rule '{rule}'.")
+
+    nodes = nodes.reshape(-1, n_dims)
+    nodes.flags.writeable = False
+    weights.flags.writeable = False
+
+    return nodes, weights
+
+
+def _create_gauss_hermite_rule(n_nodes):
+    """Create a Gauss-Hermite rule for the standard normal distribution.
+
+    Examples
+    --------
+    >>> nodes, weights = _create_gauss_hermite_rule(3)
+    >>> nodes.round(4) + 0
+    array([-1.7321,  0.    ,  1.7321])
+    >>> weights.round(4)
+    array([0.1667, 0.6667, 0.1667])
+
+    """
+    nodes, weights = np.polynomial.hermite_e.hermegauss(n_nodes)
+    return nodes, weights / weights.sum()
+
+
+def _create_smolyak_rule(n_dims, level):
+    """Create a sparse grid with the combination technique of Smolyak.
+
+    The rule is the weighted sum of the tensor products of Gauss-Hermite rules with
+    ``i_1, ..., i_d`` nodes where ``max(d, q - d + 1) <= i_1 + ... + i_d <= q`` and
+    ``q = d + level - 1``. Nodes which appear in multiple tensor products are merged.
+
+    """
+    q = n_dims + level - 1
+    key_to_node_and_weight = {}
+
+    for n_nodes in itertools.product(range(1, level + 1), repeat=n_dims):
+        norm = sum(n_nodes)
+        if not max(n_dims, q - n_dims + 1) <= norm <= q:
+            continue
+        coefficient = (-1) ** (q - norm) * comb(n_dims - 1, q - norm)
+
+        rules = [_create_gauss_hermite_rule(n) for n in n_nodes]
+        for node, weight in zip(
+            itertools.product(*[rule[0] for rule in rules]),
+            itertools.product(*[rule[1] for rule in rules]),
+        ):
+            key = tuple(np.round(node, 12) + 0)
+            node_, weight_ = key_to_node_and_weight.get(key, (node, 0))
+            key_to_node_and_weight[key] = (
+                node_,
+                weight_ + coefficient * np.prod(weight),
+            )
+
+    nodes_and_weights = [
+        (node, weight)
+        for node, weight in key_to_node_and_weight.values()
+        if abs(weight) > 1e-15
+    ]
+    nodes = np.array([node for node, _ in nodes_and_weights])
+    weights = np.array([weight for _, weight in nodes_and_weights])
+
+    return nodes, weights
@@ -0,0 +1,271 @@
+r"""Resample the likelihood with the bootstrap and the jackknife.
+
+The log likelihood is a weighted mean of the contributions of individuals. A
+replicate of a resampling method only changes how often each individual enters the
+sample and can be written as a vector of frequency weights :math:`w_r`. The
+contributions :math:`c` only depend on the parameters. Thus, the model is solved and
+the contributions are computed once per parameter vector and the mean log likelihoods
+of all replicates follow from one matrix-vector product
+
+.. math::
+
+    \ell_r = \frac{w_r^\top c}{w_r^\top \mathbf{1}}.
+
+Replicates are much cheaper than evaluations of the likelihood on resampled data. The
+draws of an observation do not change between replicates which is exact with shared
+quadrature nodes and removes the simulation noise between replicates with Monte Carlo
+integration.
+
+"""
+from functools import partial
+
+import numpy as np
+from scipy import sparse
+
+from respy.likelihood import compute_log_likelihood_contributions
+from respy.likelihood import get_log_like_func
+from respy.parallelization import use_parallel_backend_from_options
+
+
+def get_replicate_log_like_func(params, options, df, replicate_weights):
+    """Get a function which computes the mean log likelihood of replicates.
+
+    Parameters
+    ----------
+    params : pandas.DataFrame
+        DataFrame containing model parameters.
+    options : dict
+        Dictionary containing model options.
+    df : pandas.DataFrame
+        The model is fit to this dataset.
+    replicate_weights : numpy.ndarray or scipy.sparse.spmatrix
+        Array with shape (n_replicates, n_individuals) containing the frequency weights
+        of individuals in every replicate, e.g., created with
+        :func:`create_bootstrap_weights` or :func:`create_jackknife_weights`. The
+        columns follow the sorted identifiers in ``df``. If ``df`` is collapsed, the
+        weights refer to the collapsed individuals.
+
+    Returns
+    -------
+    replicate_log_like : :func:`replicate_log_like`
+        Function where all arguments except the parameter vector are set.
+
+    Raises
+    ------
+    ValueError
+        If the shape of ``replicate_weights`` does not match the number of individuals,
+        if weights are negative or if a replicate has no individuals.
+
+    Examples
+    --------
+    >>> import respy as rp
+    >>> params, options, data = rp.get_example_model("robinson_crusoe_basic")
+    >>> replicate_weights = rp.create_bootstrap_weights(
+    ...     500, data.index.get_level_values("Identifier").nunique(), seed=0
+    ... )
+    >>> replicate_log_like = rp.get_replicate_log_like_func(
+    ...     params, options, data, replicate_weights
+    ... )
+    >>> replicate_log_like(params).shape
+    (500,)
+
+    """
+    log_like = get_log_like_func(params, options, df)
+    keywords = {
+        key: value
+        for key, value in log_like.keywords.items()
+        if key not in ["return_scalar", "weights"]
+    }
+
+    n_individuals = keywords["df"].index.get_level_values("identifier").nunique()
+    replicate_weights = _process_replicate_weights(replicate_weights, n_individuals)
+
+    return partial(replicate_log_like, replicate_weights=replicate_weights, **keywords)
+
+
+@use_parallel_backend_from_options
+def replicate_log_like(
+    params,
+    replicate_weights,
+    df,
+    dense_keys,
+    base_draws_est,
+    solve,
+    type_covariates,
+    options,
+    parameter_plan=None,
+):
+    """Compute the mean log likelihood of every replicate.
+
+    The remaining arguments are the same as in :func:`~respy.likelihood.log_like`.
+
+    Parameters
+    ----------
+    params : pandas.Series
+        Parameter Series
+    replicate_weights : numpy.ndarray or scipy.sparse.csr_matrix
+        Array with shape (n_replicates, n_individuals) containing the frequency weights
+        of individuals in every replicate.
+
+    Returns
+    -------
+    values : numpy.ndarray
+        Array with shape (n_replicates,) containing the mean log likelihood of every
+        replicate.
+
+    """
+    contribs, *_ = compute_log_likelihood_contributions(
+        params,
+        df,
+        dense_keys,
+        base_draws_est,
+        solve,
+        type_covariates,
+        options,
+        parameter_plan,
+    )
+
+    values = replicate_weights @ contribs / _sum_over_individuals(replicate_weights)
+
+    return np.asarray(values).reshape(-1)
+
+
+def create_bootstrap_weights(n_replicates, weights, seed=None):
+    """Create the frequency weights of individuals in bootstrap replicates.
+
+    Each replicate draws as many individuals with replacement as the sample contains.
+    If the data is collapsed, each collapsed individual stands for as many individuals
+    as its weight and is drawn with a probability proportional to its weight. Thus, the
+    replicates are the same as for the uncollapsed data.
+
+    Parameters
+    ----------
+    n_replicates : int
+        Number of bootstrap replicates.
+    weights : int or numpy.ndarray
+        Number of individuals or array with shape (n_individuals,) containing integer
+        frequency weights of collapsed individuals.
+    seed : int, default None
+        Seed of the random number generator.
+
+    Returns
+    -------
+    replicate_weights : numpy.ndarray
+        Array with shape (n_replicates, n_individuals) containing how often every
+        individual is drawn in every replicate.
+
+    Examples
+    --------
+    >>> replicate_weights = create_bootstrap_weights(3, [2, 1], seed=0)
+    >>> replicate_weights.shape
+    (3, 2)
+    >>> replicate_weights.sum(axis=1).tolist()
+    [3, 3, 3]
+
+    """
+    weights = _process_weights_of_individuals(weights)
+    rng = np.random.default_rng(seed)
+
+    replicate_weights = rng.multinomial(
+        weights.sum(), weights / weights.sum(), size=n_replicates
+    )
+
+    return replicate_weights.astype(np.int32)
+
+
+def create_jackknife_weights(weights):
+    """Create the frequency weights of individuals in delete-one jackknife replicates.
+
+    Replicate :math:`i` leaves out one individual with the characteristics of individual
+    :math:`i`. If the data is collapsed, the replicate stands for as many replicates of
+    the uncollapsed data as the weight of the collapsed individual which must be
+    accounted for when the replicates are aggregated. The replicates of individuals with
+    a weight of one lead to the same replicates as for the uncollapsed data.
+
+    The array has one row and one column per individual. For large samples, collapse
+    identical histories with
+    :func:`~respy.pre_processing.data_processing.collapse_identical_histories` first.
+
+    Parameters
+    ----------
+    weights : int or numpy.ndarray
+        Number of individuals or array with shape (n_individuals,) containing integer
+        frequency weights of collapsed individuals.
+
+    Returns
+    -------
+    replicate_weights : numpy.ndarray
+        Array with shape (n_individuals, n_individuals) containing the weights of
+        individuals in every replicate.
+
+    Examples
+    --------
+    >>> create_jackknife_weights([2, 1]).tolist()
+    [[1, 1], [2, 0]]
+
+    """
+    weights = _process_weights_of_individuals(weights)
+
+    replicate_weights = np.tile(weights.astype(np.int32), (len(weights), 1))
+    np.fill_diagonal(replicate_weights, weights - 1)
+
+    return replicate_weights
+
+
+def _process_weights_of_individuals(weights):
+    """Convert the number of individuals or their weights to an array of weights.
+
+    Examples
+    --------
+    >>> _process_weights_of_individuals(3)
+    array([1, 1, 1])
+    >>> _process_weights_of_individuals([1.5, 1])
+    Traceback (most recent call last):
+     ...
+    ValueError: The weights of individuals must be positive integers.
+
+    """
+    if np.ndim(weights) == 0:
+        weights = np.ones(int(weights), dtype=np.int64)
+    else:
+        weights = np.asarray(weights)
+        if (
+            weights.ndim != 1
+            or not (weights > 0).all()
+            or not (weights == np.round(weights)).all()
+        ):
+            raise ValueError("The weights of individuals must be positive integers.")
+        weights = weights.astype(np.int64)
+
+    return weights
+
+
+def _process_replicate_weights(replicate_weights, n_individuals):
+    """Validate the weights of replicates.
+
+    Dense arrays are converted to floats and sparse matrices to the CSR format.
+
+    """
+    if sparse.issparse(replicate_weights):
+        replicate_weights = sparse.csr_matrix(replicate_weights, dtype=float)
+        values = replicate_weights.data
+    else:
+        replicate_weights = np.atleast_2d(np.asarray(replicate_weights, dtype=float))
+        values = replicate_weights
+
+    if replicate_weights.ndim != 2 or replicate_weights.shape[1] != n_individuals:
+        raise ValueError(
+            f"The replicate weights must have shape (n_replicates, {n_individuals}), "
+            f"but have shape {replicate_weights.shape}."
+        )
+    if not (np.isfinite(values) & (values >= 0)).all():
+        raise ValueError("The replicate weights must be non-negative.")
+    if not (_sum_over_individuals(replicate_weights) > 0).all():
+        raise ValueError("Every replicate must contain at least one individual.")
+
+    return replicate_weights
+
+
+def _sum_over_individuals(replicate_weights):
+    """Sum the weights of individuals in every replicate."""
+    return np.asarray(replicate_weights.sum(axis=1)).reshape(-1)
@@ -4,16 +4,18 @@ This module should only import from other packages or modules of respy which als
 import from respy itself. This is to prevent circular imports.
 
 """
+import json
 import shutil
 
 import numba as nb
 import numpy as np
 import pandas as pd
+from scipy import special
 
-from respy._numba import array_to_tuple
 from respy.config import CHAOSPY_INSTALLED
 from respy.config import MAX_LOG_FLOAT
 from respy.config import MIN_LOG_FLOAT
+from respy.draws import create_scrambled_quasi_random_draws
 from respy.parallelization import parallelize_across_dense_dimensions
 
 if CHAOSPY_INSTALLED:
@@ -69,7 +71,10 @@ def create_base_draws(shape, seed, monte_carlo_sequence):
 
     `"halton"` or `"sobol"` can be used to change the sequence for two Monte Carlo
     integrations. First, the calculation of the expected value function (EMAX) in the
-    solution and the choice probabilities in the maximum likelihood estimation.
+    solution and the choice probabilities in the maximum likelihood estimation. The
+    unscrambled sequences require chaospy. `"scrambled_halton"` and `"scrambled_sobol"`
+    are generated natively by :func:`~respy.draws.create_scrambled_quasi_random_draws`
+    and randomized with the seed.
 
     For the solution and estimation it is necessary to have the same randomness in every
     iteration. Otherwise, there is chatter in the simulation, i.e. a difference in
@@ -86,8 +91,9 @@ def create_base_draws(shape, seed, monte_carlo_sequence):
         Tuple representing the shape of the resulting array.
     seed : int
         Seed to control randomness.
-    monte_carlo_sequence : {"random", "halton", "sobol"}
-        Name of the sequence.
+    monte_carlo_sequence : str
+        Name of the sequence. One of ``"random"``, ``"halton"``, ``"sobol"``,
+        ``"scrambled_halton"``, or ``"scrambled_sobol"``.
 
     Returns
     -------
@@ -125,12 +131,36 @@ def create_base_draws(shape, seed, monte_carlo_sequence):
                 "Install the package chaospy to use 'sobol' and 'halton' "
                 "in options['monte_carlo_sequence']."
             )
+    elif monte_carlo_sequence in ["scrambled_sobol", "scrambled_halton"]:
+        draws = create_scrambled_quasi_random_draws(shape, seed, monte_carlo_sequence)
     else:
         raise NotImplementedError
 
     return draws
 
 
+def create_antithetic_draws(draws):
+    """Replace the second half of the draws with the negatives of the first half.
+
+    The draws are in the second to last dimension. Antithetic pairs of draws reduce the
+    variance of Monte Carlo integrals of monotonic functions.
+
+    Examples
+    --------
+    >>> create_antithetic_draws(np.arange(6.).reshape(3, 2))
+    array([[ 0.,  1.],
+           [ 2.,  3.],
+           [-0., -1.]])
+
+    """
+    draws = np.array(draws)
+    n_draws = draws.shape[-2]
+    n_pairs = (n_draws + 1) // 2
+    draws[..., n_pairs:, :] = -draws[..., : n_draws - n_pairs, :]
+
+    return draws
+
+
 @parallelize_across_dense_dimensions
 def transform_base_draws_with_cholesky_factor(
     draws, choice_set, shocks_cholesky, optim_paras
@@ -169,6 +199,42 @@ def transform_base_draws_with_cholesky_factor(
     return draws_transformed
 
 
+def transform_base_draws_to_extreme_value_shocks(draws, scale):
+    """Transform standard normal draws to extreme value shocks with mean zero.
+
+    The draws are mapped to uniform draws with the standard normal cdf and then to
+    draws from the Gumbel distribution with the inverse of its cdf. The location is
+    chosen such that the shocks have mean zero.
+
+    Examples
+    --------
+    >>> draws = np.random.RandomState(0).standard_normal(100_000)
+    >>> shocks = transform_base_draws_to_extreme_value_shocks(draws, 2)
+    >>> round(float(shocks.mean()), 1) + 0, round(float(shocks.std()), 1)
+    (0.0, 2.6)
+
+    """
+    return scale * (-np.log(-special.log_ndtr(draws)) - np.euler_gamma)
+
+
+def create_unit_draws(n_choices, n_wages):
+    """Create draws which leave the systematic rewards unchanged.
+
+    Wages are multiplied with the draws and non-pecuniary rewards are shifted by them.
+    Thus, :func:`aggregate_keane_wolpin_utility` returns the rewards without shocks for
+    draws of one for choices with wages and zero otherwise.
+
+    Examples
+    --------
+    >>> create_unit_draws(4, 2)
+    array([1., 1., 0., 0.])
+
+    """
+    draws = np.zeros(n_choices)
+    draws[:n_wages] = 1
+    return draws
+
+
 def generate_column_dtype_dict_for_estimation(optim_paras):
     """Generate column labels for data necessary for the estimation."""
     labels = (
@@ -436,14 +502,150 @@ def create_state_space_columns(optim_paras):
     ) + create_dense_state_space_columns(optim_paras)
 
 
+@nb.njit
+def calculate_expected_maximum_of_value_functions(
+    wages,
+    nonpecs,
+    continuation_values,
+    draws,
+    weights,
+    expected_draws,
+    delta,
+    standard_error=False,
+):
+    r"""Calculate the weighted average of the maximum of value functions over draws.
+
+    If ``expected_draws`` contains the expected values of ``draws``, the value function
+    of the choice which is optimal for the expected draws is used as a control variate.
+    Its expected value is the maximum of the value functions with expected draws. The
+    coefficient of the control variate is the regression coefficient of the maximum on
+    the control variate over the draws. Otherwise, ``expected_draws`` is an empty array.
+
+    If ``standard_error`` is true, the Monte Carlo standard error of the average is
+    computed in a second pass over the draws as
+
+    .. math::
+
+        \frac{\sqrt{\sum_i w_i^2 r_i^2}}{\sum_i w_i}
+
+    where :math:`r_i` are the deviations of the maxima from their average net of the
+    control variate. The standard error treats the draws as independent and the
+    coefficient of the control variate as known. Thus, it is only an approximation for
+    antithetic draws and control variates and meaningless for quadrature rules.
+
+    Returns
+    -------
+    expected_maximum : float
+    standard_error : float
+        Monte Carlo standard error of ``expected_maximum`` or NaN if it is not
+        requested.
+
+    """
+    n_draws, n_choices = draws.shape
+    control_variate = expected_draws.shape[0] > 0
+
+    control_choice = 0
+    expected_control = 0.0
+    if control_variate:
+        for j in range(n_choices):
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[j], nonpecs[j], continuation_values[j], expected_draws[j], delta
+            )
+            if j == 0 or value_function > expected_control:
+                control_choice = j
+                expected_control = value_function
+
+    expected_maximum = 0.0
+    control = 0.0
+    control_squared = 0.0
+    cross_product = 0.0
+    for i in range(n_draws):
+        max_value_functions = 0.0
+        for j in range(n_choices):
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[j], nonpecs[j], continuation_values[j], draws[i, j], delta
+            )
+            if value_function > max_value_functions:
+                max_value_functions = value_function
+
+        expected_maximum += weights[i] * max_value_functions
+
+        # Both variables are centered by the expectation of the control variate.
+        if control_variate:
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[control_choice],
+                nonpecs[control_choice],
+                continuation_values[control_choice],
+                draws[i, control_choice],
+                delta,
+            )
+            deviation = value_function - expected_control
+            control += weights[i] * deviation
+            control_squared += weights[i] * deviation**2
+            cross_product += (
+                weights[i] * deviation * (max_value_functions - expected_control)
+            )
+
+    sum_weights = weights.sum()
+    expected_maximum /= sum_weights
+    average_maximum = expected_maximum
+
+    coefficient = 0.0
+    if control_variate:
+        control /= sum_weights
+        variance = control_squared / sum_weights - control**2
+        if variance > 0:
+            covariance = cross_product / sum_weights - control * (
+                expected_maximum - expected_control
+            )
+            coefficient = covariance / variance
+            expected_maximum -= coefficient * control
+
+    if not standard_error:
+        return expected_maximum, np.nan
+
+    sum_squared_residuals = 0.0
+    for i in range(n_draws):
+        max_value_functions = 0.0
+        for j in range(n_choices):
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[j], nonpecs[j], continuation_values[j], draws[i, j], delta
+            )
+            if value_function > max_value_functions:
+                max_value_functions = value_function
+
+        residual = max_value_functions - average_maximum
+        if control_variate:
+            value_function, _ = aggregate_keane_wolpin_utility(
+                wages[control_choice],
+                nonpecs[control_choice],
+                continuation_values[control_choice],
+                draws[i, control_choice],
+                delta,
+            )
+            residual -= coefficient * (value_function - expected_control - control)
+
+        sum_squared_residuals += weights[i] ** 2 * residual**2
+
+    return expected_maximum, np.sqrt(sum_squared_residuals) / sum_weights
+
+
 @nb.guvectorize(
-    ["f8[:], f8[:], f8[:], f8[:, :], f8, f8[:]"],
-    "(n_choices), (n_choices), (n_choices), (n_draws, n_choices), () -> ()",
+    ["f8[:], f8[:], f8[:], f8[:, :], f8[:], f8[:], f8, f8[:]"],
+    "(n_choices), (n_choices), (n_choices), (n_draws, n_choices), (n_draws), (n), () "
+    "-> ()",
     nopython=True,
     target="parallel",
 )
 def calculate_expected_value_functions(
-    wages, nonpecs, continuation_values, draws, delta, expected_value_functions
+    wages,
+    nonpecs,
+    continuation_values,
+    draws,
+    weights,
+    expected_draws,
+    delta,
+    expected_value_functions,
 ):
     r"""Calculate the expected maximum of value functions for a set of unobservables.
 
@@ -457,7 +659,10 @@ def calculate_expected_value_functions(
     <https://en.wikipedia.org/wiki/Monte_Carlo_integration>`_. The goal is to
     approximate an integral by evaluating the integrand at randomly chosen points. In
     this setting, one wants to approximate the m maximum utility of the current
-    state.
+    state. The maximum utilities are averaged with ``weights`` which allows to use the
+    nodes of a quadrature rule instead of draws (see :mod:`respy.quadrature`). With
+    ``expected_draws``, the variance of the average is reduced with a control variate
+    (see :func:`calculate_expected_maximum_of_value_functions`).
 
     Note that ``wages`` have the same length as ``nonpecs`` despite that wages are only
     available in some choices. Missing choices are filled with ones. In the case of a
@@ -479,6 +684,12 @@ def calculate_expected_value_functions(
         choice in the subsequent period.
     draws : numpy.ndarray
         Array with shape (n_draws, n_choices).
+    weights : numpy.ndarray
+        Array with shape (n_draws,) containing the weights of the draws. The weighted
+        sum is divided by the sum of the weights.
+    expected_draws : numpy.ndarray
+        Array with shape (n_choices,) containing the expected values of the draws for
+        the control variate or an empty array.
     delta : float
         The discount factor.
 
@@ -488,25 +699,225 @@ def calculate_expected_value_functions(
         Expected maximum utility of an agent.
 
     """
-    n_draws, n_choices = draws.shape
+    expected_value_functions[0], _ = calculate_expected_maximum_of_value_functions(
+        wages, nonpecs, continuation_values, draws, weights, expected_draws, delta
+    )
 
-    expected_value_functions[0] = 0
 
-    for i in range(n_draws):
+@nb.njit(parallel=True)
+def calculate_expected_value_functions_of_period(
+    wages,
+    nonpecs,
+    continuation_values,
+    base_draws,
+    weights,
+    draws_index,
+    choice_indices,
+    n_choices,
+    n_wages,
+    row_offsets,
+    element_offsets,
+    shocks_cholesky,
+    control_variate,
+    delta,
+    standard_errors=False,
+):
+    """Calculate the expected value functions of all states in a period.
 
-        max_value_functions = 0
+    The function is the counterpart of :func:`calculate_expected_value_functions` for
+    all dense keys of a period at once. Wages, non-pecuniary rewards and continuation
+    values of all dense keys are passed as one-dimensional arrays where the values of
+    each dense key are stored in row-major order.
 
-        for j in range(n_choices):
+    The standard normal draws are transformed with the Cholesky factor subsetted to the
+    choice set of each dense key and wage shocks are exponentiated once per dense key
+    as in :func:`transform_base_draws_with_cholesky_factor`. Then, the expectation is
+    computed in parallel over all states of the period.
+
+    Parameters
+    ----------
+    wages, nonpecs, continuation_values : numpy.ndarray
+        One-dimensional arrays with the values of all dense keys in a period.
+    base_draws : numpy.ndarray
+        Array with shape ``(n_sets, n_draws, n_choices)`` containing standard normal
+        draws. The draws of a dense key are ``base_draws[draws_index[key]]``.
+    weights : numpy.ndarray
+        Array with shape ``(n_sets, n_draws)`` containing the weights of the draws.
+        Padded draws have a weight of zero.
+    draws_index : numpy.ndarray
+        Array with shape ``(n_keys,)`` mapping dense keys to sets of draws.
+    choice_indices : numpy.ndarray
+        Array with shape ``(n_keys, n_choices)`` containing the codes of the admissible
+        choices of each dense key.
+    n_choices, n_wages : numpy.ndarray
+        Arrays with shape ``(n_keys,)`` containing the number of admissible choices and
+        choices with wages of each dense key.
+    row_offsets, element_offsets : numpy.ndarray
+        Arrays with shape ``(n_keys + 1,)`` containing the positions of the first state
+        and the first value of each dense key.
+    shocks_cholesky : numpy.ndarray
+        Cholesky factor of the shock variance-covariance matrix of all choices.
+    control_variate : bool
+        Whether to reduce the variance with the control variate of
+        :func:`calculate_expected_maximum_of_value_functions`.
+    delta : float
+        The discount factor.
+    standard_errors : bool, default False
+        Whether to compute the Monte Carlo standard errors of the expected value
+        functions.
+
+    Returns
+    -------
+    expected_value_functions : numpy.ndarray
+        Array with shape ``(n_states,)`` containing the expected value functions of all
+        states in the period.
+    standard_errors : numpy.ndarray
+        Array with shape ``(n_states,)`` containing the standard errors of the expected
+        value functions or an empty array if they are not requested.
+
+    """
+    n_keys = draws_index.shape[0]
+    _, n_draws, max_n_choices = base_draws.shape
+    n_states = row_offsets[-1]
+
+    draws = np.zeros((n_keys, n_draws, max_n_choices))
+    expected_draws = np.zeros((n_keys, max_n_choices if control_variate else 0))
+    state_to_key = np.empty(n_states, dtype=np.int64)
+
+    for k in nb.prange(n_keys):
+        base_draws_ = base_draws[draws_index[k]]
+        for i in range(n_draws):
+            for j in range(n_choices[k]):
+                draw = 0.0
+                for m in range(j + 1):
+                    draw += (
+                        base_draws_[i, m]
+                        * shocks_cholesky[choice_indices[k, j], choice_indices[k, m]]
+                    )
+                if j < n_wages[k]:
+                    draw = np.exp(min(max(draw, MIN_LOG_FLOAT), MAX_LOG_FLOAT))
+                draws[k, i, j] = draw
+
+        # Wage shocks are log-normally distributed and the other shocks have mean zero.
+        if control_variate:
+            for j in range(n_wages[k]):
+                variance = 0.0
+                for m in range(j + 1):
+                    variance += (
+                        shocks_cholesky[choice_indices[k, j], choice_indices[k, m]] ** 2
+                    )
+                expected_draws[k, j] = np.exp(min(variance / 2, MAX_LOG_FLOAT))
+
+        state_to_key[row_offsets[k] : row_offsets[k + 1]] = k
+
+    expected_value_functions = np.zeros(n_states)
+    standard_errors_ = np.zeros(n_states if standard_errors else 0)
+
+    for s in nb.prange(n_states):
+        k = state_to_key[s]
+        n_choices_ = n_choices[k]
+        position = element_offsets[k] + (s - row_offsets[k]) * n_choices_
+
+        (
+            expected_maximum,
+            standard_error,
+        ) = calculate_expected_maximum_of_value_functions(
+            wages[position : position + n_choices_],
+            nonpecs[position : position + n_choices_],
+            continuation_values[position : position + n_choices_],
+            draws[k, :, :n_choices_],
+            weights[draws_index[k]],
+            expected_draws[k, : n_choices_ if control_variate else 0],
+            delta,
+            standard_errors,
+        )
+        expected_value_functions[s] = expected_maximum
+        if standard_errors:
+            standard_errors_[s] = standard_error
+
+    return expected_value_functions, standard_errors_
+
+
+@nb.njit(parallel=True)
+def calculate_closed_form_expected_value_functions_of_period(
+    wages,
+    nonpecs,
+    continuation_values,
+    n_choices,
+    n_wages,
+    row_offsets,
+    element_offsets,
+    scale,
+    delta,
+):
+    r"""Calculate the expected value functions of a period with extreme value shocks.
+
+    If the shocks are i.i.d. extreme value distributed with mean zero and scale
+    :math:`\sigma`, the expected maximum of the value functions :math:`v_j` without
+    shocks has the closed form
+
+    .. math::
+
+        E\left[\max_j v_j + \epsilon_j\right] = \sigma \log \sum_j
+        \exp(v_j / \sigma).
+
+    The arguments are the same as for
+    :func:`calculate_expected_value_functions_of_period` except that no draws are
+    necessary.
+
+    Parameters
+    ----------
+    wages, nonpecs, continuation_values : numpy.ndarray
+        One-dimensional arrays with the values of all dense keys in a period.
+    n_choices, n_wages : numpy.ndarray
+        Arrays with shape ``(n_keys,)`` containing the number of admissible choices and
+        choices with wages of each dense key.
+    row_offsets, element_offsets : numpy.ndarray
+        Arrays with shape ``(n_keys + 1,)`` containing the positions of the first state
+        and the first value of each dense key.
+    scale : float
+        Scale of the extreme value shocks.
+    delta : float
+        The discount factor.
+
+    Returns
+    -------
+    expected_value_functions : numpy.ndarray
+        Array with shape ``(n_states,)`` containing the expected value functions of all
+        states in the period.
+
+    """
+    n_keys = n_choices.shape[0]
+    n_states = row_offsets[-1]
+
+    state_to_key = np.empty(n_states, dtype=np.int64)
+    for k in range(n_keys):
+        state_to_key[row_offsets[k] : row_offsets[k + 1]] = k
+
+    expected_value_functions = np.zeros(n_states)
+
+    for s in nb.prange(n_states):
+        k = state_to_key[s]
+        n_choices_ = n_choices[k]
+        position = element_offsets[k] + (s - row_offsets[k]) * n_choices_
+
+        value_functions = np.empty(n_choices_)
+        for j in range(n_choices_):
             value_function, _ = aggregate_keane_wolpin_utility(
-                wages[j], nonpecs[j], continuation_values[j], draws[i, j], delta
+                wages[position + j],
+                nonpecs[position + j],
+                continuation_values[position + j],
+                1.0 if j < n_wages[k] else 0.0,
+                delta,
             )
+            value_functions[j] = value_function / scale
 
-            if value_function > max_value_functions:
-                max_value_functions = value_function
+        max_value_functions = value_functions.max()
+        sum_exp = np.exp(value_functions - max_value_functions).sum()
 
-        expected_value_functions[0] += max_value_functions
+        expected_value_functions[s] = scale * (max_value_functions + np.log(sum_exp))
 
-    expected_value_functions[0] /= n_draws
+    return expected_value_functions
 
 
 def convert_dictionary_keys_to_dense_indices(dictionary):
@@ -621,7 +1032,50 @@ def map_observations_to_states(states, state_space, optim_paras):
     return dense_key, core_index
 
 
-@nb.njit
+def map_observations_to_states_of_types(states, state_space, optim_paras):
+    """Map observations in data to the states of every type.
+
+    Types are unobserved and only change the dense key of an observation. Thus, the core
+    index is computed once and the dense keys are computed for every type without
+    copying the data.
+
+    Returns
+    -------
+    dense_keys : numpy.ndarray
+        Array with shape (n_observations, n_types) containing the dense key of every
+        observation and type.
+    core_index : numpy.ndarray
+        Array with shape (n_observations,) containing the core index of every
+        observation.
+
+    """
+    core_columns = ["period"] + create_core_state_space_columns(optim_paras)
+    core = states.reset_index(level="period")[core_columns].to_numpy(dtype="int64")
+
+    core_key, core_index = map_states_to_core_key_and_core_index(
+        core, state_space.indexer
+    )
+
+    dense_columns = create_dense_state_space_columns(optim_paras)
+    dense = np.zeros((len(states), len(dense_columns)), dtype=np.int64)
+    for i, column in enumerate(dense_columns):
+        if column != "type":
+            dense[:, i] = states[column].to_numpy(dtype="int64")
+
+    type_position = dense_columns.index("type")
+    dense_keys = np.empty((len(states), optim_paras["n_types"]), dtype=np.int64)
+    for type_ in range(optim_paras["n_types"]):
+        dense[:, type_position] = type_
+        dense_keys[:, type_] = _map_observations_to_dense_index(
+            dense,
+            core_key,
+            state_space.dense_covariates_to_dense_index,
+            state_space.core_key_and_dense_index_to_dense_key,
+        )
+
+    return dense_keys, core_index
+
+
 def map_states_to_core_key_and_core_index(states, indexer):
     """Map states to the core key and core index.
 
@@ -629,8 +1083,8 @@ def map_states_to_core_key_and_core_index(states, indexer):
     ----------
     states : numpy.ndarray
         Multidimensional array containing only core dimensions of states.
-    indexer : numba.typed.Dict
-        A dictionary with core states as keys and the core key and core index as values.
+    indexer : respy.state_space.StateIndexer
+        Maps core states to the core key and core index.
 
     Returns
     -------
@@ -640,61 +1094,79 @@ def map_states_to_core_key_and_core_index(states, indexer):
         An array containing the core index. See :ref:`core_indices`.
 
     """
-    n_states = states.shape[0]
-    core_key = np.zeros(n_states, dtype=np.int64)
-    core_index = np.zeros(n_states, dtype=np.int64)
-
-    for i in range(n_states):
-        core_key_, core_index_ = indexer[array_to_tuple(indexer, states[i])]
-        core_key[i] = core_key_
-        core_index[i] = core_index_
+    values = indexer.get_values(states)
+    core_key = np.ascontiguousarray(values[:, 0])
+    core_index = np.ascontiguousarray(values[:, 1])
 
     return core_key, core_index
 
 
-@nb.njit
 def _map_observations_to_dense_index(
     dense,
-    core_index,
+    core_key,
     dense_covariates_to_dense_index,
     core_key_and_dense_index_to_dense_key,
 ):
-    n_observations = dense.shape[0]
-    dense_key = np.zeros(n_observations, dtype=np.int64)
-
-    for i in range(n_observations):
-        dense_index = dense_covariates_to_dense_index[
-            array_to_tuple(dense_covariates_to_dense_index, dense[i])
-        ]
-        dense_key_ = core_key_and_dense_index_to_dense_key[(core_index[i], dense_index)]
-        dense_key[i] = dense_key_
+    dense_index = dense_covariates_to_dense_index.get_values(dense)
+    dense_key = core_key_and_dense_index_to_dense_key.get_values(
+        np.column_stack((core_key, dense_index))
+    )
 
     return dense_key
 
 
 def dump_objects(objects, topic, complex_, options):
-    """Dump states."""
+    """Dump objects to the cache directory.
+
+    If ``options["cache_compression"]`` is ``None``, the DataFrame is stored as an
+    uncompressed ``.npy`` file which can be memory-mapped by :func:`load_objects`. The
+    column names are stored in a sidecar index with the same name. Otherwise, the
+    DataFrame is stored as a parquet file with the requested compression.
+
+    """
     file_name = _create_file_name_from_complex_index(topic, complex_)
-    objects.to_parquet(
-        options["cache_path"] / file_name,
-        compression=options["cache_compression"],
-    )
+    path = options["cache_path"] / file_name
+
+    if options["cache_compression"] is None:
+        dtype = np.result_type(*objects.dtypes) if objects.shape[1] else np.float64
+        np.save(path.with_suffix(".npy"), objects.to_numpy(dtype=dtype))
+        path.with_suffix(".json").write_text(
+            json.dumps({"columns": objects.columns.tolist()})
+        )
+    else:
+        objects.to_parquet(
+            path.with_suffix(".parquet"), compression=options["cache_compression"]
+        )
 
 
 def load_objects(topic, complex_, options):
-    """Load states."""
+    """Load objects from the cache directory.
+
+    Objects stored in the ``.npy`` format are memory-mapped in read-only mode such that
+    the returned DataFrame is a view on the file and data is only read when accessed.
+    Note that the index of the original DataFrame is not restored.
+
+    """
     file_name = _create_file_name_from_complex_index(topic, complex_)
-    directory = options["cache_path"]
-    return pd.read_parquet(directory / file_name)
+    path = options["cache_path"] / file_name
+
+    if options["cache_compression"] is None:
+        columns = json.loads(path.with_suffix(".json").read_text())["columns"]
+        array = np.load(path.with_suffix(".npy"), mmap_mode="r")
+        objects = pd.DataFrame(array, columns=columns, copy=False)
+    else:
+        objects = pd.read_parquet(path.with_suffix(".parquet"))
+
+    return objects
 
 
 def _create_file_name_from_complex_index(topic, complex_):
-    """Create a file name from a complex index."""
+    """Create a file name without suffix from a complex index."""
     choice = "".join(str(int(x)) for x in complex_[1])
     if len(complex_) == 3:
-        file_name = f"{topic}_{complex_[0]}_{choice}_{complex_[2]}.parquet"
+        file_name = f"{topic}_{complex_[0]}_{choice}_{complex_[2]}"
     elif len(complex_) == 2:
-        file_name = f"{topic}_{complex_[0]}_{choice}.parquet"
+        file_name = f"{topic}_{complex_[0]}_{choice}"
     else:
         raise NotImplementedError
 
@@ -7,8 +7,11 @@ import pandas as pd
 from scipy.special import softmax
 
 from respy.config import DTYPE_STATES
+from respy.draws import CounterBasedDraws
 from respy.parallelization import parallelize_across_dense_dimensions
 from respy.parallelization import split_and_combine_df
+from respy.parallelization import use_parallel_backend_from_options
+from respy.pre_processing.model_processing import ParameterPlan
 from respy.pre_processing.model_processing import process_params_and_options
 from respy.shared import apply_law_of_motion_for_core
 from respy.shared import calculate_value_functions_and_flow_utilities
@@ -16,6 +19,7 @@ from respy.shared import compute_covariates
 from respy.shared import convert_labeled_variables_to_codes
 from respy.shared import create_base_draws
 from respy.shared import create_state_space_columns
+from respy.shared import create_unit_draws
 from respy.shared import downcast_to_smallest_dtype
 from respy.shared import get_choice_set_from_complex
 from respy.shared import get_exogenous_from_dense_covariates
@@ -25,6 +29,7 @@ from respy.shared import pandas_dot
 from respy.shared import rename_labels_from_internal
 from respy.shared import rename_labels_to_internal
 from respy.shared import select_valid_choices
+from respy.shared import transform_base_draws_to_extreme_value_shocks
 from respy.shared import transform_base_draws_with_cholesky_factor
 from respy.solve import get_solve_func
 
@@ -80,6 +85,7 @@ def get_simulate_func(
     df = _process_input_df_for_simulation(df, method, options, optim_paras)
 
     solve = get_solve_func(params, options)
+    parameter_plan = ParameterPlan(params, options)
 
     # We draw shocks for all observations and for all choices although some choices
     # might not be available. Later, only the relevant shocks are selected.
@@ -90,12 +96,23 @@ def get_simulate_func(
     )
     shape = (n_observations, len(optim_paras["choices"]))
 
-    base_draws_sim = create_base_draws(
-        shape, next(options["simulation_seed_startup"]), "random"
-    )
-    base_draws_wage = create_base_draws(
-        shape, next(options["simulation_seed_startup"]), "random"
-    )
+    if options["store_draws"]:
+        base_draws_sim = create_base_draws(
+            shape, next(options["simulation_seed_startup"]), "random"
+        )
+        base_draws_wage = create_base_draws(
+            shape, next(options["simulation_seed_startup"]), "random"
+        )
+    else:
+        base_draws_sim, base_draws_wage = [
+            CounterBasedDraws(
+                next(options["simulation_seed_startup"]),
+                np.arange(n_observations),
+                None,
+                shape[1],
+            )
+            for _ in range(2)
+        ]
 
     simulate_function = functools.partial(
         simulate,
@@ -106,11 +123,13 @@ def get_simulate_func(
         n_simulation_periods=n_simulation_periods,
         solve=solve,
         options=options,
+        parameter_plan=parameter_plan,
     )
 
     return simulate_function
 
 
+@use_parallel_backend_from_options
 def simulate(
     params,
     base_draws_sim,
@@ -120,6 +139,7 @@ def simulate(
     n_simulation_periods,
     solve,
     options,
+    parameter_plan=None,
 ):
     """Perform a simulation.
 
@@ -145,10 +165,11 @@ def simulate(
     ----------
     params : pandas.DataFrame or pandas.Series
         Contains parameters.
-    base_draws_sim : numpy.ndarray
+    base_draws_sim : numpy.ndarray or respy.draws.CounterBasedDraws
         Array with shape (n_periods, n_individuals, n_choices) to provide a unique set
-        of shocks for each individual in each period.
-    base_draws_wage : numpy.ndarray
+        of shocks for each individual in each period. Counter-based draws are only
+        generated for the rows of the current period.
+    base_draws_wage : numpy.ndarray or respy.draws.CounterBasedDraws
         Array with shape (n_periods, n_individuals, n_choices) to provide a unique set
         of wage measurement errors for each individual in each period.
     df : pandas.DataFrame or None
@@ -168,6 +189,8 @@ def simulate(
         Function which creates the solution of the model with new parameters.
     options : dict
         Contains model options.
+    parameter_plan : ~respy.pre_processing.model_processing.ParameterPlan, optional
+        Processes the parameters faster if only their values change.
 
     Returns
     -------
@@ -179,14 +202,14 @@ def simulate(
     df = df.copy()
     is_n_step_ahead = method != "one_step_ahead"
 
-    optim_paras, options = process_params_and_options(params, options)
+    if parameter_plan is None:
+        optim_paras, options = process_params_and_options(params, options)
+    else:
+        optim_paras, options = parameter_plan(params)
     state_space = solve(params)
     # Prepare simulation.
     df = _extend_data_with_sampled_characteristics(df, optim_paras, options)
 
-    # Prepare shocks and store them in the pandas.DataFrame.
-    draws_wage_transformed = np.exp(base_draws_wage * optim_paras["meas_error"])
-
     data = []
     for period in range(n_simulation_periods):
         # If it is a one-step-ahead simulation, we pick rows from the panel data. For
@@ -198,9 +221,14 @@ def simulate(
         else:
             slice_ = slice(df.shape[0] * period, df.shape[0] * (period + 1))
 
+        # Prepare shocks and store them in the pandas.DataFrame.
+        shocks = np.asarray(base_draws_sim[slice_])
+        meas_errors = np.exp(
+            np.asarray(base_draws_wage[slice_]) * optim_paras["meas_error"]
+        )
         for i, choice in enumerate(optim_paras["choices"]):
-            current_df[f"shock_reward_{choice}"] = base_draws_sim[slice_, i]
-            current_df[f"meas_error_wage_{choice}"] = draws_wage_transformed[slice_, i]
+            current_df[f"shock_reward_{choice}"] = shocks[:, i]
+            current_df[f"meas_error_wage_{choice}"] = meas_errors[:, i]
 
         current_df["dense_key"], current_df["core_index"] = map_observations_to_states(
             current_df, state_space, optim_paras
@@ -410,14 +438,27 @@ def _simulate_single_period(
         ) from e
 
     draws_shock = df[[f"shock_reward_{c}" for c in valid_choices]].to_numpy()
-    draws_shock_transformed = transform_base_draws_with_cholesky_factor(
-        draws_shock, choice_set, optim_paras["shocks_cholesky"], optim_paras
-    )
+    if optim_paras["shocks_distribution"] == "extreme_value":
+        # Extreme value shocks enter the rewards of all choices additively and leave
+        # wages unchanged.
+        shocks = transform_base_draws_to_extreme_value_shocks(
+            draws_shock, optim_paras["shocks_ev_scale"]
+        )
+        draws_shock_transformed = np.tile(
+            create_unit_draws(len(valid_choices), n_wages), (len(df), 1)
+        )
+        additive_shocks = shocks
+    else:
+        draws_shock_transformed = transform_base_draws_with_cholesky_factor(
+            draws_shock, choice_set, optim_paras["shocks_cholesky"], optim_paras
+        )
+        shocks = draws_shock_transformed
+        additive_shocks = 0
 
     draws_wage = df[[f"meas_error_wage_{c}" for c in valid_choices]].to_numpy()
     value_functions, flow_utilities = calculate_value_functions_and_flow_utilities(
         wages,
-        nonpecs,
+        nonpecs + additive_shocks,
         continuation_values,
         draws_shock_transformed,
         optim_paras["beta_delta"],
@@ -447,7 +488,7 @@ def _simulate_single_period(
         df[f"flow_utility_{choice}"] = flow_utilities[:, i]
         df[f"value_function_{choice}"] = value_functions[:, i]
         df[f"continuation_value_{choice}"] = continuation_values[:, i]
-        df[f"shock_reward_{choice}"] = draws_shock_transformed[:, i]
+        df[f"shock_reward_{choice}"] = shocks[:, i]
 
     # Check if there is an exogenous process
     if optim_paras["exogenous_processes"]:
@@ -1,19 +1,30 @@
 """Everything related to the solution of a structural model."""
+import collections
 import functools
+import hashlib
+import os
+import shutil
+from pathlib import Path
 
 import numpy as np
+import pandas as pd
 
 from respy.exogenous_processes import compute_transition_probabilities
 from respy.interpolate import kw_94_interpolation
 from respy.parallelization import parallelize_across_dense_dimensions
+from respy.parallelization import use_parallel_backend_from_options
+from respy.pre_processing.model_processing import ParameterPlan
 from respy.pre_processing.model_processing import process_params_and_options
-from respy.shared import calculate_expected_value_functions
+from respy.quadrature import get_integration_weights
+from respy.shared import calculate_closed_form_expected_value_functions_of_period
+from respy.shared import calculate_expected_value_functions_of_period
 from respy.shared import dump_objects
-from respy.shared import load_objects
 from respy.shared import pandas_dot
 from respy.shared import select_valid_choices
 from respy.shared import transform_base_draws_with_cholesky_factor
+from respy.state_space import attach_state_space
 from respy.state_space import create_state_space_class
+from respy.state_space import export_state_space
 
 
 def get_solve_func(params, options):
@@ -23,6 +34,15 @@ def get_solve_func(params, options):
     along with components of the solution such as covariates, non-pecuniary rewards,
     wages, continuation values and expected value functions as attributes of the class.
 
+    If ``options["state_space_path"]`` points to a state space exported with
+    :func:`~respy.state_space.export_state_space`, the state space is attached instead
+    of being created. Thus, multiple processes can share the parameter-independent
+    parts of the state space.
+
+    If ``options["state_space_cache"]`` is a directory, the state space is loaded from a
+    subdirectory named after :func:`compute_fingerprint_of_model_structure`. If it does
+    not exist, the state space is created and exported to the cache first.
+
     Parameters
     ----------
     params : pandas.DataFrame
@@ -45,47 +65,355 @@ def get_solve_func(params, options):
     """
     optim_paras, options = process_params_and_options(params, options)
 
-    state_space = create_state_space_class(optim_paras, options)
-    solve_function = functools.partial(solve, options=options, state_space=state_space)
+    if options["state_space_path"] is not None:
+        state_space = attach_state_space(options["state_space_path"])
+    elif options["state_space_cache"] is not None:
+        state_space = _load_or_create_state_space(optim_paras, options)
+    else:
+        state_space = create_state_space_class(optim_paras, options)
+    options["cache_path"].mkdir(parents=True, exist_ok=True)
+
+    # Transition probabilities of exogenous processes are stored on disk and not in the
+    # state space. Thus, solutions of these models cannot be restored from the cache.
+    if (
+        options["solution_cache_memory_limit"]
+        and not optim_paras["exogenous_processes"]
+    ):
+        solution_cache = SolutionCache(options["solution_cache_memory_limit"])
+    else:
+        solution_cache = None
+
+    solve_function = functools.partial(
+        solve,
+        options=options,
+        state_space=state_space,
+        solution_cache=solution_cache,
+        parameter_plan=ParameterPlan(params, options),
+    )
 
     return solve_function
 
 
-def solve(params, options, state_space):
-    """Solve the model."""
-    optim_paras, options = process_params_and_options(params, options)
+@use_parallel_backend_from_options
+def solve(params, options, state_space, solution_cache=None, parameter_plan=None):
+    """Solve the model.
 
-    transit_keys = None
-    if hasattr(state_space, "dense_key_to_transit_keys"):
-        transit_keys = state_space.dense_key_to_transit_keys
-
-    wages, nonpecs = _create_param_specific_objects(
-        state_space.dense_key_to_complex,
-        state_space.dense_key_to_choice_set,
-        optim_paras,
-        options,
-        transit_keys=transit_keys,
-        bypass={
-            "dense_key_to_dense_covariates": state_space.dense_key_to_dense_covariates
-        },
-    )
+    If a :class:`SolutionCache` is passed, the solution is restored from the cache if
+    the model was already solved with the same parameters. Otherwise, the model is
+    solved and the solution is stored in the cache.
+
+    If a :class:`~respy.pre_processing.model_processing.ParameterPlan` is passed, it is
+    used to process the parameters instead of
+    :func:`~respy.pre_processing.model_processing.process_params_and_options`.
 
-    state_space.wages = wages
-    state_space.nonpecs = nonpecs
+    """
+    if parameter_plan is None:
+        optim_paras, options = process_params_and_options(params, options)
+    else:
+        optim_paras, options = parameter_plan(params)
+
+    if solution_cache is not None:
+        fingerprint = compute_fingerprint_of_optim_paras(optim_paras)
+        if solution_cache.restore(fingerprint, state_space):
+            return state_space
+
+    has_rewards = _create_choice_rewards_with_design_matrix(state_space, optim_paras)
+
+    if not has_rewards or optim_paras["exogenous_processes"]:
+        transit_keys = None
+        if hasattr(state_space, "dense_key_to_transit_keys"):
+            transit_keys = state_space.dense_key_to_transit_keys
+
+        wages, nonpecs = _create_param_specific_objects(
+            state_space.dense_key_to_complex,
+            state_space.dense_key_to_choice_set,
+            state_space.state_store,
+            optim_paras,
+            options,
+            transit_keys=transit_keys,
+            create_rewards=not has_rewards,
+            bypass={
+                "dense_key_to_dense_covariates": (
+                    state_space.dense_key_to_dense_covariates
+                )
+            },
+        )
+
+        if not has_rewards:
+            state_space.set_attribute_from_keys("wages", wages)
+            state_space.set_attribute_from_keys("nonpecs", nonpecs)
 
     state_space = _solve_with_backward_induction(state_space, optim_paras, options)
 
+    if solution_cache is not None:
+        solution_cache.store(fingerprint, state_space)
+
     return state_space
 
 
+class SolutionCache:
+    """Bounded cache of solutions of a model.
+
+    Optimizers evaluate the same parameter vector repeatedly, for example, during line
+    searches or at the optimum. The cache stores the wages, non-pecuniary rewards and
+    expected value functions of a state space for the most recently used parameters
+    and evicts the least recently used solutions if the size of all cached solutions
+    exceeds the memory limit.
+
+    Parameters
+    ----------
+    memory_limit : int
+        Maximum number of bytes of all cached solutions.
+
+    Attributes
+    ----------
+    hits : int
+        Number of solutions which were restored from the cache.
+    misses : int
+        Number of solutions which were not found in the cache.
+
+    """
+
+    attributes = [
+        "wages",
+        "nonpecs",
+        "expected_value_functions",
+        "expected_value_functions_standard_errors",
+    ]
+
+    def __init__(self, memory_limit):
+        self.memory_limit = memory_limit
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._solutions = collections.OrderedDict()
+
+    def __contains__(self, fingerprint):
+        return fingerprint in self._solutions
+
+    def __len__(self):
+        return len(self._solutions)
+
+    def restore(self, fingerprint, state_space):
+        """Restore the solution of the fingerprint in the state space.
+
+        Returns
+        -------
+        is_restored : bool
+            Indicator for whether the solution was in the cache.
+
+        """
+        if fingerprint in self._solutions:
+            self._solutions.move_to_end(fingerprint)
+            for attribute, data in zip(
+                self._get_attributes(state_space), self._solutions[fingerprint]
+            ):
+                getattr(state_space, attribute).data[:] = data
+            self.hits += 1
+            is_restored = True
+        else:
+            self.misses += 1
+            is_restored = False
+
+        return is_restored
+
+    def store(self, fingerprint, state_space):
+        """Store the solution of the state space under the fingerprint."""
+        solution = tuple(
+            getattr(state_space, attribute).data.copy()
+            for attribute in self._get_attributes(state_space)
+        )
+        n_bytes = sum(data.nbytes for data in solution)
+
+        if n_bytes <= self.memory_limit:
+            self._solutions[fingerprint] = solution
+            self.n_bytes += n_bytes
+
+            while self.n_bytes > self.memory_limit:
+                _, evicted = self._solutions.popitem(last=False)
+                self.n_bytes -= sum(data.nbytes for data in evicted)
+
+    def clear(self):
+        """Remove all solutions from the cache and reset the counters."""
+        self._solutions.clear()
+        self.n_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def _get_attributes(self, state_space):
+        """Get the cached attributes which exist in the state space.
+
+        Standard errors of the expected value functions only exist if
+        ``options["monte_carlo_standard_errors"]`` is true.
+
+        """
+        return [
+            attribute
+            for attribute in self.attributes
+            if hasattr(state_space, attribute)
+        ]
+
+
+def compute_fingerprint_of_optim_paras(optim_paras):
+    """Compute a fingerprint of the parameters which identifies the solution.
+
+    The fingerprint is a hash over all keys and values of ``optim_paras`` where numeric
+    values are hashed by their binary representation.
+
+    Parameters
+    ----------
+    optim_paras : dict
+        Parsed model parameters affected by the optimization.
+
+    Returns
+    -------
+    fingerprint : str
+
+    Examples
+    --------
+    >>> optim_paras = {"delta": 0.95, "wage_a": pd.Series([1.0], index=["constant"])}
+    >>> fingerprint = compute_fingerprint_of_optim_paras(optim_paras)
+    >>> fingerprint == compute_fingerprint_of_optim_paras({**optim_paras})
+    True
+    >>> optim_paras["delta"] = 0.9
+    >>> fingerprint == compute_fingerprint_of_optim_paras(optim_paras)
+    False
+
+    """
+    hash_ = hashlib.sha256()
+    _update_hash(hash_, optim_paras)
+
+    return hash_.hexdigest()
+
+
+def compute_fingerprint_of_model_structure(optim_paras, options):
+    """Compute a fingerprint of the inputs which determine the state space.
+
+    The state space depends only on the structure of the model and not on the values of
+    the parameters. The structure consists of the choices with their initial and
+    maximum experiences, the number of periods and lagged choices, the dense grid of
+    observables, types and exogenous processes, the filters of the core state space and
+    the choice sets, the definitions of covariates and the covariates of the rewards,
+    and the draws of the solution.
+
+    Parameters
+    ----------
+    optim_paras : dict
+        Parsed model parameters.
+    options : dict
+        Processed model options.
+
+    Returns
+    -------
+    fingerprint : str
+
+    """
+    structure = {
+        "choices": {
+            choice: (sorted(attributes["start"]), attributes["max"])
+            for choice, attributes in optim_paras["choices"].items()
+            if "max" in attributes
+        },
+        "choices_order": list(optim_paras["choices"]),
+        "choices_w_wage": optim_paras["choices_w_wage"],
+        "choices_w_exp": optim_paras["choices_w_exp"],
+        "n_periods": optim_paras["n_periods"],
+        "n_lagged_choices": optim_paras["n_lagged_choices"],
+        "n_types": optim_paras["n_types"],
+        "observables": {
+            name: list(levels) for name, levels in optim_paras["observables"].items()
+        },
+        "exogenous_processes": {
+            name: list(levels)
+            for name, levels in optim_paras["exogenous_processes"].items()
+        },
+        "reward_covariates": {
+            f"{kind}_{choice}": list(optim_paras[f"{kind}_{choice}"].index)
+            for kind in ["wage", "nonpec"]
+            for choice in optim_paras["choices"]
+            if f"{kind}_{choice}" in optim_paras
+        },
+        **{
+            key: options[key]
+            for key in [
+                "core_state_space_filters",
+                "negative_choice_set",
+                "covariates",
+                "solution_draws",
+                "solution_seed",
+                "monte_carlo_sequence",
+                "emax_integration",
+                "quadrature_level",
+                "variance_reduction",
+            ]
+        },
+    }
+
+    hash_ = hashlib.sha256()
+    _update_hash(hash_, structure)
+
+    return hash_.hexdigest()
+
+
+def _load_or_create_state_space(optim_paras, options):
+    """Load the state space from the cache or create and export it.
+
+    The state space is exported to a temporary directory which is renamed afterwards.
+    Thus, processes which create the same state space concurrently never attach to an
+    incomplete export.
+
+    """
+    fingerprint = compute_fingerprint_of_model_structure(optim_paras, options)
+    path = Path(options["state_space_cache"]) / fingerprint
+
+    if not path.exists():
+        state_space = create_state_space_class(optim_paras, options)
+        temporary_path = path.with_name(f"{fingerprint}-{os.getpid()}.tmp")
+        export_state_space(state_space, temporary_path)
+        try:
+            temporary_path.rename(path)
+        except OSError:
+            # Another process was faster.
+            shutil.rmtree(temporary_path)
+
+    return attach_state_space(path)
+
+
+def _update_hash(hash_, x):
+    """Update the hash recursively with the content of an object."""
+    hash_.update(type(x).__name__.encode())
+
+    if isinstance(x, dict):
+        for key in sorted(x, key=str):
+            _update_hash(hash_, key)
+            _update_hash(hash_, x[key])
+    elif isinstance(x, (list, tuple)):
+        for element in x:
+            _update_hash(hash_, element)
+    elif isinstance(x, (pd.Series, pd.DataFrame)):
+        _update_hash(hash_, list(x.index))
+        _update_hash(hash_, np.asarray(x))
+        if isinstance(x, pd.DataFrame):
+            _update_hash(hash_, list(x.columns))
+    elif isinstance(x, np.ndarray) and x.dtype != object:
+        hash_.update(str(x.shape).encode())
+        hash_.update(np.ascontiguousarray(x).tobytes())
+    elif isinstance(x, np.ndarray):
+        _update_hash(hash_, x.tolist())
+    else:
+        hash_.update(repr(x).encode())
+
+
 @parallelize_across_dense_dimensions
 def _create_param_specific_objects(
     complex_,
     choice_set,
+    state_store,
     optim_paras,
     options,
     dense_key_to_dense_covariates,
     transit_keys=None,
+    create_rewards=True,
 ):
     """Create param specific objects.
 
@@ -95,9 +423,15 @@ def _create_param_specific_objects(
     In the medium run we could also allow for fixed params here by saving values
     on disk directly!
     For objects that we store on disk we will just return the prefix of the location.
+    The states are retrieved from the in-memory :class:`~respy.state_space.StateStore`.
+    Rewards are only created if they cannot be computed with the design matrix, see
+    :func:`_create_choice_rewards_with_design_matrix`.
     """
-    states = load_objects("states", complex_, options)
-    wages, nonpecs = _create_choice_rewards(states, choice_set, optim_paras)
+    states = state_store[complex_]
+    if create_rewards:
+        wages, nonpecs = _create_choice_rewards(states, choice_set, optim_paras)
+    else:
+        wages, nonpecs = None, None
 
     if optim_paras["exogenous_processes"]:
         transition_probabilities = compute_transition_probabilities(
@@ -108,6 +442,65 @@ def _create_param_specific_objects(
     return wages, nonpecs
 
 
+def _create_choice_rewards_with_design_matrix(state_space, optim_paras):
+    """Create wages and non-pecuniary rewards of all states with matrix products.
+
+    The coefficients of wages and non-pecuniary rewards are collected in a matrix with
+    shape ``(n_covariates, 2 * n_choices)`` where the first half of the columns
+    contains the coefficients of log wages. Choices without wages have coefficients of
+    zero and, thus, wages of one.
+
+    The covariates are separated into core, dense and mixed covariates (see
+    :meth:`~respy.state_space.StateSpace.create_design_matrix`). Multiplying the design
+    matrix of each group with its coefficients yields the contributions of core states,
+    dense indices and mixed covariates which are summed for every state and choice.
+
+    Returns
+    -------
+    has_rewards : bool
+        Indicator for whether the rewards were created. It is false if the parameters
+        contain covariates which are not part of the design matrices.
+
+    """
+    choices = list(optim_paras["choices"])
+    covariate_to_group_and_position = {
+        covariate: (group, i)
+        for group, covariates in state_space.design_matrix_covariates.items()
+        for i, covariate in enumerate(covariates)
+    }
+
+    coefficients = {
+        group: np.zeros((len(covariates), 2 * len(choices)))
+        for group, covariates in state_space.design_matrix_covariates.items()
+    }
+    for i, kind in enumerate(["wage", "nonpec"]):
+        for j, choice in enumerate(choices):
+            if f"{kind}_{choice}" in optim_paras:
+                for covariate, beta in optim_paras[f"{kind}_{choice}"].items():
+                    if covariate not in covariate_to_group_and_position:
+                        return False
+                    group, k = covariate_to_group_and_position[covariate]
+                    coefficients[group][k, i * len(choices) + j] += beta
+
+    log_wages = np.zeros_like(state_space.wages.data)
+    nonpecs = state_space.nonpecs.data
+    nonpecs[:] = 0
+    for group, design_matrix in state_space.design_matrices.items():
+        if coefficients[group].size:
+            if isinstance(design_matrix, dict):
+                design_matrix = design_matrix.data.reshape(
+                    -1, coefficients[group].shape[0]
+                )
+            rewards = (design_matrix @ coefficients[group]).ravel()
+            positions = state_space.reward_positions[group].data
+            log_wages += rewards[positions]
+            nonpecs += rewards[positions + len(choices)]
+
+    np.exp(log_wages, out=state_space.wages.data)
+
+    return True
+
+
 def _create_choice_rewards(states, choice_set, optim_paras):
     """Create wage and non-pecuniary reward for each state and choice."""
     n_choices = sum(choice_set)
@@ -137,6 +530,14 @@ def _solve_with_backward_induction(state_space, optim_paras, options):
     1. Interpolation is requested.
     2. If there are more states in the period than interpolation points.
     3. If there are at least two interpolation points per `dense_index`.
+    4. If the shocks are normally distributed. The expected value functions with
+       extreme value shocks have a closed form.
+
+    If ``options["monte_carlo_standard_errors"]`` is true, the Monte Carlo standard
+    errors of the expected value functions are stored in
+    ``state_space.expected_value_functions_standard_errors``. They are zero if the
+    expected value functions are exact, i.e., for myopic individuals and extreme value
+    shocks, and NaN in periods which are interpolated.
 
     Parameters
     ----------
@@ -154,40 +555,45 @@ def _solve_with_backward_induction(state_space, optim_paras, options):
     """
     n_periods = options["n_periods"]
 
-    # Can we move that up to the other function? Then we have everything at one point
-    # that is params specific?
-    draws_emax_risk = transform_base_draws_with_cholesky_factor(
-        state_space.base_draws_sol,
-        state_space.dense_key_to_choice_set,
-        optim_paras["shocks_cholesky"],
-        optim_paras,
-    )
+    standard_errors = None
+    if options["monte_carlo_standard_errors"]:
+        if not hasattr(state_space, "expected_value_functions_standard_errors"):
+            state_space.expected_value_functions_standard_errors = (
+                state_space.expected_value_functions.copy()
+            )
+        standard_errors = state_space.expected_value_functions_standard_errors
+        standard_errors.data[:] = np.nan
 
     for period in reversed(range(n_periods)):
         dense_keys_in_period = state_space.get_dense_keys_from_period(period)
 
-        period_draws_emax_risk = {
-            dense_index: draws_emax_risk[dense_index]
-            for dense_index in dense_keys_in_period
-        }
-
         n_states_in_period = sum(
             len(state_space.dense_key_to_core_indices[dense_index])
             for dense_index in dense_keys_in_period
         )
 
         # See docstring for note on interpolation.
-        any_interpolated = options[
-            "interpolation_points"
-        ] < n_states_in_period and options["interpolation_points"] >= 2 * len(
-            dense_keys_in_period
+        any_interpolated = (
+            options["interpolation_points"] < n_states_in_period
+            and options["interpolation_points"] >= 2 * len(dense_keys_in_period)
+            and optim_paras["shocks_distribution"] == "normal"
         )
 
         # Handle myopic individuals. Check interpolation!
         if optim_paras["delta"] == 0:
-            period_expected_value_functions = {k: 0 for k in dense_keys_in_period}
+            state_space.expected_value_functions.get_period(period)[:] = 0
+            if standard_errors is not None:
+                standard_errors.get_period(period)[:] = 0
 
         elif any_interpolated:
+            period_draws_emax_risk = transform_base_draws_with_cholesky_factor(
+                state_space.get_attribute_from_period("base_draws_sol", period),
+                state_space.get_attribute_from_period(
+                    "dense_key_to_choice_set", period
+                ),
+                optim_paras["shocks_cholesky"],
+                optim_paras,
+            )
             period_expected_value_functions = kw_94_interpolation(
                 state_space,
                 period_draws_emax_risk,
@@ -195,39 +601,116 @@ def _solve_with_backward_induction(state_space, optim_paras, options):
                 optim_paras,
                 options,
             )
+            state_space.set_attribute_from_keys(
+                "expected_value_functions", period_expected_value_functions
+            )
 
         else:
-
-            wages = state_space.get_attribute_from_period("wages", period)
-            nonpecs = state_space.get_attribute_from_period("nonpecs", period)
             continuation_values = state_space.get_continuation_values(period)
-            period_expected_value_functions = _full_solution(
-                wages, nonpecs, continuation_values, period_draws_emax_risk, optim_paras
+            solution = _full_solution(
+                state_space, continuation_values, period, optim_paras, options
             )
-
-        state_space.set_attribute_from_keys(
-            "expected_value_functions", period_expected_value_functions
-        )
+            state_space.expected_value_functions.get_period(period)[:] = solution[0]
+            if standard_errors is not None:
+                standard_errors.get_period(period)[:] = solution[1]
 
     return state_space
 
 
-@parallelize_across_dense_dimensions
-def _full_solution(
-    wages, nonpecs, continuation_values, period_draws_emax_risk, optim_paras
-):
-    """Calculate the full solution of the model.
+def _full_solution(state_space, continuation_values, period, optim_paras, options):
+    """Calculate the full solution of the model in one period.
 
     In contrast to approximate solution, the Monte Carlo integration is done for each
-    state and not only a subset of states.
+    state and not only a subset of states. All dense keys of the period are solved with
+    one call to :func:`~respy.shared.calculate_expected_value_functions_of_period`. With
+    extreme value shocks, the closed form in
+    :func:`~respy.shared.calculate_closed_form_expected_value_functions_of_period` is
+    used instead.
+
+    Returns
+    -------
+    period_expected_value_functions : numpy.ndarray
+        Array with the expected value functions of the period ordered like the
+        expected value functions of the period in the state space.
+    period_standard_errors : numpy.ndarray
+        Array with the Monte Carlo standard errors of the expected value functions if
+        ``options["monte_carlo_standard_errors"]`` is true. Otherwise, it is empty.
 
     """
-    period_expected_value_functions = calculate_expected_value_functions(
-        wages,
-        nonpecs,
+    wages = state_space.wages
+    dense_keys = np.sort(state_space.period_to_dense_keys[period])
+
+    n_wages_raw = len(optim_paras["choices_w_wage"])
+    choice_sets = [state_space.dense_key_to_choice_set[key] for key in dense_keys]
+    n_choices = np.array([sum(choice_set) for choice_set in choice_sets])
+    n_wages = np.array([sum(choice_set[:n_wages_raw]) for choice_set in choice_sets])
+    choice_indices = np.zeros((len(dense_keys), len(optim_paras["choices"])), np.int64)
+    for i, choice_set in enumerate(choice_sets):
+        valid_choices = np.flatnonzero(choice_set)
+        choice_indices[i, : len(valid_choices)] = valid_choices
+
+    row_offsets = (
+        np.append(wages.row_starts[dense_keys], wages.row_stops[dense_keys[-1]])
+        - wages.period_row_starts[period]
+    )
+    element_offsets = (
+        np.append(wages.starts[dense_keys], wages.stops[dense_keys[-1]])
+        - wages.period_starts[period]
+    )
+    continuation_values = np.concatenate(
+        [continuation_values[key].ravel() for key in dense_keys]
+    )
+
+    if optim_paras["shocks_distribution"] == "extreme_value":
+        period_expected_value_functions = (
+            calculate_closed_form_expected_value_functions_of_period(
+                wages.get_period(period),
+                state_space.nonpecs.get_period(period),
+                continuation_values,
+                n_choices,
+                n_wages,
+                row_offsets,
+                element_offsets,
+                optim_paras["shocks_ev_scale"],
+                optim_paras["delta"],
+            )
+        )
+        period_standard_errors = np.zeros(
+            len(period_expected_value_functions)
+            if options["monte_carlo_standard_errors"]
+            else 0
+        )
+        return period_expected_value_functions, period_standard_errors
+
+    # Draws are shared by all dense keys with the same number of choices. The number of
+    # nodes of quadrature rules depends on the number of choices and shorter sets are
+    # padded with zero weights.
+    unique_n_choices, draws_index = np.unique(n_choices, return_inverse=True)
+    draws = [
+        state_space.base_draws_sol[dense_keys[np.argmax(n_choices == n)]]
+        for n in unique_n_choices
+    ]
+    n_draws = max(draws_.shape[0] for draws_ in draws)
+    base_draws = np.zeros((len(draws), n_draws, choice_indices.shape[1]))
+    weights = np.zeros((len(draws), n_draws))
+    for i, draws_ in enumerate(draws):
+        base_draws[i, : draws_.shape[0], : draws_.shape[1]] = draws_
+        weights[i, : draws_.shape[0]] = get_integration_weights(*draws_.shape, options)
+
+    return calculate_expected_value_functions_of_period(
+        wages.get_period(period),
+        state_space.nonpecs.get_period(period),
         continuation_values,
-        period_draws_emax_risk,
+        base_draws,
+        weights,
+        draws_index,
+        choice_indices,
+        n_choices,
+        n_wages,
+        row_offsets,
+        element_offsets,
+        optim_paras["shocks_cholesky"],
+        options["variance_reduction"] == "control_variate",
         optim_paras["delta"],
+        options["monte_carlo_standard_errors"],
     )
-
-    return period_expected_value_functions
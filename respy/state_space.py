@@ -1,19 +1,25 @@
 """Everything related to the state space of a structural model."""
+import collections.abc
 import itertools
+import pickle
+import shutil
+from pathlib import Path
 
 import numba as nb
 import numpy as np
 import pandas as pd
-from numba.typed import Dict
 
-from respy._numba import sum_over_numba_boolean_unituple
+from respy.config import COVARIATES_DOT_PRODUCT_DTYPE
 from respy.exogenous_processes import create_transit_choice_set
 from respy.exogenous_processes import create_transition_objects
 from respy.exogenous_processes import weight_continuation_values
 from respy.parallelization import parallelize_across_dense_dimensions
+from respy.parallelization import use_parallel_backend_from_options
+from respy.quadrature import create_integration_nodes_and_weights
 from respy.shared import apply_law_of_motion_for_core
 from respy.shared import compute_covariates
 from respy.shared import convert_dictionary_keys_to_dense_indices
+from respy.shared import create_antithetic_draws
 from respy.shared import create_base_draws
 from respy.shared import create_core_state_space_columns
 from respy.shared import create_dense_state_space_columns
@@ -25,6 +31,7 @@ from respy.shared import prepare_cache_directory
 from respy.shared import return_core_dense_key
 
 
+@use_parallel_backend_from_options
 def create_state_space_class(optim_paras, options):
     """Create the state space of the model."""
     prepare_cache_directory(options)
@@ -45,8 +52,15 @@ def create_state_space_class(optim_paras, options):
 
     indexer = _create_indexer(core, core_key_to_core_indices, optim_paras)
 
+    state_store = StateStore(core, options)
     dense_period_choice = _create_dense_period_choice(
-        core, dense, core_key_to_core_indices, core_key_to_complex, optim_paras, options
+        core,
+        dense,
+        core_key_to_core_indices,
+        core_key_to_complex,
+        state_store,
+        optim_paras,
+        options,
     )
 
     state_space = StateSpace(
@@ -56,6 +70,7 @@ def create_state_space_class(optim_paras, options):
         dense_period_choice,
         core_key_to_complex,
         core_key_to_core_indices,
+        state_store,
         optim_paras,
         options,
     )
@@ -63,6 +78,117 @@ def create_state_space_class(optim_paras, options):
     return state_space
 
 
+PARAMETER_DEPENDENT_ATTRIBUTES = ["wages", "nonpecs", "expected_value_functions"]
+"""list : Attributes of the state space which are changed by the solution."""
+
+_MIN_NBYTES_OF_EXPORTED_ARRAYS = 2**12
+
+
+def export_state_space(state_space, path):
+    """Export the state space to a directory which can be shared by processes.
+
+    The state space is pickled to ``path / "state_space.pickle"``, but all NumPy arrays
+    with more than a few kilobytes are stored as separate ``.npy`` files. Thus,
+    :func:`attach_state_space` can map the arrays into memory without reading them. If
+    ``path`` is on a memory-backed file system like ``/dev/shm``, all processes which
+    attach the state space share the same physical memory.
+
+    If states were spilled to the cache directory by the :class:`StateStore`, the cache
+    directory is copied as well such that the export does not depend on it.
+
+    Parameters
+    ----------
+    state_space : StateSpace
+        The state space of a model.
+    path : str or pathlib.Path
+        Directory to which the state space is exported. It is created if it does not
+        exist.
+
+    """
+    path = Path(path)
+    (path / "arrays").mkdir(parents=True, exist_ok=True)
+
+    with open(path / "state_space.pickle", "wb") as file:
+        _ArrayExportingPickler(file, path / "arrays").dump(state_space)
+
+    state_store = state_space.state_store
+    if any(not state_store.is_in_memory(complex_) for complex_ in state_store):
+        shutil.copytree(
+            state_store.options["cache_path"], path / "cache", dirs_exist_ok=True
+        )
+
+
+def attach_state_space(path):
+    """Attach to a state space exported with :func:`export_state_space`.
+
+    The arrays of the state space are read-only views on memory-mapped files. Only the
+    arrays in :data:`PARAMETER_DEPENDENT_ATTRIBUTES` which are changed by the solution
+    of the model are copied into memory owned by the process.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Directory to which the state space was exported.
+
+    Returns
+    -------
+    state_space : StateSpace
+        The state space of a model.
+
+    """
+    path = Path(path)
+
+    with open(path / "state_space.pickle", "rb") as file:
+        state_space = _ArrayAttachingUnpickler(file, path / "arrays").load()
+
+    if (path / "cache").exists():
+        state_store = state_space.state_store
+        state_store.options = {**state_store.options, "cache_path": path / "cache"}
+
+    for attribute in PARAMETER_DEPENDENT_ATTRIBUTES:
+        setattr(state_space, attribute, getattr(state_space, attribute).copy())
+
+    return state_space
+
+
+class _ArrayExportingPickler(pickle.Pickler):
+    """Pickler which stores large arrays as ``.npy`` files instead of pickling them."""
+
+    def __init__(self, file, directory):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.names = {}
+        # Keep references to the arrays such that ids are not reused while pickling.
+        self.arrays = []
+
+    def persistent_id(self, obj):
+        if (
+            type(obj) is not np.ndarray
+            or obj.dtype.hasobject
+            or obj.nbytes < _MIN_NBYTES_OF_EXPORTED_ARRAYS
+        ):
+            return None
+
+        if id(obj) not in self.names:
+            name = f"{len(self.names)}.npy"
+            np.save(self.directory / name, obj, allow_pickle=False)
+            self.names[id(obj)] = name
+            self.arrays.append(obj)
+
+        return self.names[id(obj)]
+
+
+class _ArrayAttachingUnpickler(pickle.Unpickler):
+    """Unpickler which maps arrays stored as ``.npy`` files into memory."""
+
+    def __init__(self, file, directory):
+        super().__init__(file)
+        self.directory = directory
+
+    def persistent_load(self, pid):
+        return np.load(self.directory / pid, mmap_mode="r").view(np.ndarray)
+
+
 class StateSpace:
     """The state space of a structural model.
 
@@ -75,6 +201,8 @@ class StateSpace:
         experiences, lagged choices and periods.
     dense_key_to_core_indices : Dict[int, Array[int]]
         A mapping from dense keys to ``.loc`` locations in the ``core``.
+    state_store : StateStore
+        Holds the states and covariates of each dense period choice core.
 
     """
 
@@ -86,6 +214,7 @@ class StateSpace:
         dense_period_cores,
         core_key_to_complex,
         core_key_to_core_indices,
+        state_store,
         optim_paras,
         options,
     ):
@@ -98,7 +227,7 @@ class StateSpace:
         ----------
         core : pandas.DataFrame
             DataFrame containing one core state per row.
-        indexer : numba.typed.Dict
+        indexer : StateIndexer
             Maps states (rows of core) into tuples containing core key and
             core index. i : state -> (core_key, core_index)
         dense : dict
@@ -110,6 +239,8 @@ class StateSpace:
             Maps period and choice_set into core_key
         core_key_to_core_indices : dict
             Maps core_keys into core_indices.
+        state_store : StateStore
+            Contains the states of each dense period choice core.
 
         """
         self.core = core
@@ -118,16 +249,19 @@ class StateSpace:
         self.dense = dense
         self.core_key_to_complex = core_key_to_complex
         self.core_key_to_core_indices = core_key_to_core_indices
+        self.state_store = state_store
         self.optim_paras = optim_paras
         self.options = options
         self.n_periods = options["n_periods"]
         self._create_conversion_dictionaries()
         self.base_draws_sol = self.create_draws(options)
+        self.create_arrays_for_choice_rewards()
         self.create_arrays_for_expected_value_functions()
 
         if len(self.optim_paras["exogenous_processes"]) > 0:
             self.create_objects_for_exogenous_processes()
         self.child_indices = self.collect_child_indices()
+        self.child_positions = self.collect_child_positions()
 
     def _create_conversion_dictionaries(self):
         """Create mappings between state space location indices and properties.
@@ -139,6 +273,13 @@ class StateSpace:
             i: k for i, k in enumerate(self.dense_period_cores)
         }
 
+        self.dense_key_to_period = {
+            i: complex_[0] for i, complex_ in self.dense_key_to_complex.items()
+        }
+        self.period_to_dense_keys = {period: [] for period in range(self.n_periods)}
+        for i, period in self.dense_key_to_period.items():
+            self.period_to_dense_keys[period].append(i)
+
         self.dense_key_to_core_key = {
             i: self.dense_period_cores[self.dense_key_to_complex[i]]
             for i in self.dense_key_to_complex
@@ -153,18 +294,15 @@ class StateSpace:
             for i in self.dense_key_to_complex
         }
 
-        self.core_key_and_dense_index_to_dense_key = Dict.empty(
-            key_type=nb.types.UniTuple(nb.types.int64, 2),
-            value_type=nb.types.int64,
-        )
-
-        for i in self.dense_key_to_complex:
-            self.core_key_and_dense_index_to_dense_key[
+        self.core_key_and_dense_index_to_dense_key = StateIndexer(
+            [
                 return_core_dense_key(
-                    self.dense_key_to_core_key[i],
-                    *self.dense_key_to_complex[i][2:],
+                    self.dense_key_to_core_key[i], *self.dense_key_to_complex[i][2:]
                 )
-            ] = i
+                for i in self.dense_key_to_complex
+            ],
+            np.array(list(self.dense_key_to_complex), dtype=np.int64),
+        )
 
         if self.dense is False:
             self.dense_covariates_to_dense_index = {}
@@ -173,13 +311,9 @@ class StateSpace:
             }
 
         else:
-            n_dense = len(create_dense_state_space_columns(self.optim_paras))
-            self.dense_covariates_to_dense_index = Dict.empty(
-                key_type=nb.types.UniTuple(nb.types.int64, n_dense),
-                value_type=nb.types.int64,
+            self.dense_covariates_to_dense_index = StateIndexer(
+                list(self.dense), np.arange(len(self.dense))
             )
-            for i, k in enumerate(self.dense):
-                self.dense_covariates_to_dense_index[k] = i
 
             self.dense_key_to_dense_covariates = {
                 i: list(self.dense.keys())[self.dense_key_to_complex[i][2]]
@@ -188,11 +322,154 @@ class StateSpace:
 
     def create_arrays_for_expected_value_functions(self):
         """Create a container for expected value functions."""
-        self.expected_value_functions = Dict.empty(
-            key_type=nb.types.int64, value_type=nb.types.float64[:]
+        self.expected_value_functions = DenseKeyArrays(
+            {
+                key: (len(indices),)
+                for key, indices in self.dense_key_to_core_indices.items()
+            },
+            self.dense_key_to_period,
+        )
+
+    def create_arrays_for_choice_rewards(self):
+        """Create containers for wages and non-pecuniary rewards."""
+        shapes = {
+            key: (len(indices), sum(self.dense_key_to_choice_set[key]))
+            for key, indices in self.dense_key_to_core_indices.items()
+        }
+        self.wages = DenseKeyArrays(shapes, self.dense_key_to_period, fill_value=1)
+        self.nonpecs = DenseKeyArrays(shapes, self.dense_key_to_period)
+        self.create_design_matrix()
+
+    def create_design_matrix(self):
+        """Create the design matrices of the choice rewards.
+
+        The covariates of the rewards are separated into three groups.
+
+        1. Covariates of the core state space are the same for all dense indices. Their
+           design matrix has one row per state in the core state space.
+        2. Covariates which only depend on dense information like types and
+           observables are constant within a dense key. Their design matrix has one row
+           per dense index.
+        3. Mixed covariates depend on core and dense information. Their design matrix
+           has one row per state of the state space.
+
+        Multiplying each design matrix with a matrix of coefficients with one column per
+        choice for wages and non-pecuniary rewards yields the contributions of each
+        group to the rewards. The contributions are computed once per core state and
+        dense index and then broadcast to the states of the state space.
+
+        :attr:`reward_positions` maps each element of :attr:`wages` and
+        :attr:`nonpecs` to the position of the contribution to the log wage in the
+        flattened matrix product of each group. Non-pecuniary rewards are located
+        ``n_choices`` elements after log wages.
+
+        """
+        choices = list(self.optim_paras["choices"])
+        n_columns = 2 * len(choices)
+        covariates = sorted(
+            {
+                covariate
+                for kind in ["wage", "nonpec"]
+                for choice in choices
+                if f"{kind}_{choice}" in self.optim_paras
+                for covariate in self.optim_paras[f"{kind}_{choice}"].index
+            }
         )
-        for index, indices in self.dense_key_to_core_indices.items():
-            self.expected_value_functions[index] = np.zeros(len(indices))
+        dense_keys = list(self.dense_key_to_complex)
+        dense_indices = {
+            key: self.dense_key_to_complex[key][2]
+            if len(self.dense_key_to_complex[key]) == 3
+            else 0
+            for key in dense_keys
+        }
+
+        core_covariates = [
+            cov
+            for cov in covariates
+            if all(
+                cov in self.state_store.get_core_columns(self.dense_key_to_complex[key])
+                for key in dense_keys
+            )
+        ]
+
+        dense_candidates = (
+            set(self.options["covariates_dense"])
+            | {
+                column
+                for dense_vec in (self.dense or {}).values()
+                for column in dense_vec
+            }
+        ) - set(core_covariates)
+        dense_values = {}
+        for key in dense_keys:
+            constants = self.state_store.get_constants(self.dense_key_to_complex[key])
+            values = dense_values.setdefault(dense_indices[key], {})
+            for cov in [c for c in covariates if c in dense_candidates]:
+                if cov not in constants or values.setdefault(cov, constants[cov]) != (
+                    constants[cov]
+                ):
+                    dense_candidates.remove(cov)
+        dense_covariates = [cov for cov in covariates if cov in dense_candidates]
+
+        mixed_covariates = [
+            cov
+            for cov in covariates
+            if cov not in core_covariates and cov not in dense_covariates
+        ]
+        n_dense_indices = max(dense_indices.values()) + 1
+
+        self.design_matrix_covariates = {
+            "core": core_covariates,
+            "dense": dense_covariates,
+            "mixed": mixed_covariates,
+        }
+        self.design_matrices = {
+            "core": self.core[core_covariates].to_numpy(
+                dtype=COVARIATES_DOT_PRODUCT_DTYPE
+            ),
+            "dense": np.array(
+                [
+                    [dense_values[idx][cov] for cov in dense_covariates]
+                    for idx in range(n_dense_indices)
+                ],
+                dtype=COVARIATES_DOT_PRODUCT_DTYPE,
+            ).reshape(n_dense_indices, len(dense_covariates)),
+        }
+        if mixed_covariates:
+            shapes = {
+                key: (len(indices), len(mixed_covariates))
+                for key, indices in self.dense_key_to_core_indices.items()
+            }
+            self.design_matrices["mixed"] = DenseKeyArrays(
+                shapes, self.dense_key_to_period
+            )
+
+        reward_positions = {group: {} for group in self.design_matrices}
+        for key, complex_ in self.dense_key_to_complex.items():
+            valid_choices = np.flatnonzero(self.dense_key_to_choice_set[key])
+            n_states = len(self.dense_key_to_core_indices[key])
+
+            reward_positions["core"][key] = (
+                self.state_store.get_core_positions(complex_).reshape(-1, 1) * n_columns
+                + valid_choices
+            )
+            reward_positions["dense"][key] = np.broadcast_to(
+                dense_indices[key] * n_columns + valid_choices,
+                (n_states, len(valid_choices)),
+            )
+
+            if mixed_covariates:
+                mixed = self.design_matrices["mixed"]
+                mixed[key] = self.state_store.get_array(complex_, mixed_covariates)
+                rows = np.arange(mixed.row_starts[key], mixed.row_stops[key])
+                reward_positions["mixed"][key] = (
+                    rows.reshape(-1, 1) * n_columns + valid_choices
+                )
+
+        self.reward_positions = {
+            group: DenseKeyArrays.from_dict(positions, self.dense_key_to_period)
+            for group, positions in reward_positions.items()
+        }
 
     def create_objects_for_exogenous_processes(self):
         """Create mappings for the implementation of the exogenous processes."""
@@ -223,23 +500,21 @@ class StateSpace:
         """Get continuation values.
 
         The function takes the expected value functions from the previous periods and
-        then uses the indices of child states to put these expected value functions in
-        the correct format. If period is equal to self.n_periods - 1 the function
-        returns arrays of zeros since we are in terminal states. Otherwise we retrieve
-        expected value functions for next period and call
-        :func:`_get_continuation_values` to assign continuation values to all choices
-        within a period. (The object `subset_expected_value_functions` is required
-        because we need a Numba typed dict but the function
-        :meth:`StateSpace.get_attribute_from_period` just returns a normal dict)
+        then uses the positions of child states to put these expected value functions
+        in the correct format. If period is equal to self.n_periods - 1 the function
+        returns arrays of zeros since we are in terminal states. Otherwise, the
+        positions of the child states in the expected value functions which are
+        computed once in :meth:`collect_child_positions` are used to gather the
+        continuation values of all dense keys in the period with a single take.
 
         Returns
         -------
-        continuation_values : numba.typed.Dict
+        continuation_values : dict
             The continuation values for each dense key in a :class:`numpy.ndarray`.
 
         See also
         --------
-        _get_continuation_values
+        collect_child_positions
             A more theoretical explanation can be found here: See :ref:`get continuation
             values <get_continuation_values>`.
 
@@ -252,32 +527,22 @@ class StateSpace:
                 for key in shapes
             }
         else:
-            child_indices = self.get_attribute_from_period("child_indices", period)
-            expected_value_functions = self.get_attribute_from_period(
-                "expected_value_functions", period + 1
-            )
-            subset_expected_value_functions = Dict.empty(
-                key_type=nb.types.int64, value_type=nb.types.float64[:]
-            )
-            for key, value in expected_value_functions.items():
-                subset_expected_value_functions[key] = value
-
-            transit_choice_sets = (
-                "transit_key_to_choice_set"
-                if hasattr(self, "transit_key_to_choice_set")
-                else "dense_key_to_choice_set"
-            )
-
-            continuation_values = _get_continuation_values(
-                self.get_attribute_from_period("dense_key_to_complex", period),
-                self.get_attribute_from_period(transit_choice_sets, period),
-                self.get_attribute_from_period("dense_key_to_core_indices", period),
-                child_indices,
-                self.core_key_and_dense_index_to_dense_key,
-                bypass={"expected_value_functions": subset_expected_value_functions},
-            )
+            positions = self.child_positions
+            values = self.expected_value_functions.data[positions.get_period(period)]
+            offset = positions.period_starts[period]
+            continuation_values = {
+                key: values[
+                    positions.starts[key] - offset : positions.stops[key] - offset
+                ].reshape(positions.shapes[key])
+                for key in self.period_to_dense_keys[period]
+            }
 
             if len(self.optim_paras["exogenous_processes"]) > 0:
+                transit_choice_sets = (
+                    "transit_key_to_choice_set"
+                    if hasattr(self, "transit_key_to_choice_set")
+                    else "dense_key_to_choice_set"
+                )
                 continuation_values = weight_continuation_values(
                     self.get_attribute_from_period("dense_key_to_complex", period),
                     self.options,
@@ -291,6 +556,47 @@ class StateSpace:
 
         return continuation_values
 
+    def collect_child_positions(self):
+        """Collect the positions of child states in the expected value functions.
+
+        The child indices of a state contain the core key and core index of each child
+        state. Together with the dense index of the state, they are resolved into the
+        position of the expected value function of the child state in the flat array
+        :attr:`DenseKeyArrays.data` of :attr:`expected_value_functions`. This is done
+        once when the state space is created so that the continuation values of a
+        period can be retrieved with a single vectorized take.
+
+        Returns
+        -------
+        child_positions : DenseKeyArrays or None
+            Contains for each dense key an array with shape ``(n_states, n_choices)``
+            with the positions of the child states.
+
+        """
+        if self.child_indices is None:
+            child_positions = None
+
+        else:
+            indexer = self.core_key_and_dense_index_to_dense_key
+            starts = self.expected_value_functions.starts
+            child_positions = {}
+            for dense_key, indices in self.child_indices.items():
+                complex_ = self.dense_key_to_complex[dense_key]
+                dense_index = complex_[2] if len(complex_) == 3 else 0
+                core_key_and_dense_index = np.stack(
+                    (indices[..., 0], np.full(indices.shape[:-1], dense_index)), axis=-1
+                )
+                child_dense_keys = indexer.get_values(
+                    core_key_and_dense_index.reshape(-1, 2)
+                ).reshape(indices.shape[:-1])
+                child_positions[dense_key] = starts[child_dense_keys] + indices[..., 1]
+
+            child_positions = DenseKeyArrays.from_dict(
+                child_positions, self.dense_key_to_period
+            )
+
+        return child_positions
+
     def collect_child_indices(self):
         """Collect for each state the indices of its child states.
 
@@ -329,24 +635,40 @@ class StateSpace:
             child_indices = _collect_child_indices(
                 dense_key_to_complex_except_last_period,
                 dense_key_to_choice_set_except_last_period,
+                self.state_store,
                 self.indexer,
                 self.optim_paras,
-                self.options,
+            )
+            child_indices = DenseKeyArrays.from_dict(
+                child_indices, self.dense_key_to_period
             )
 
         return child_indices
 
     def create_draws(self, options):
-        """Get draws."""
+        """Get draws.
+
+        If the expected value functions are integrated with a quadrature rule, the
+        nodes of the rule replace the draws in every period. If
+        ``options["variance_reduction"]`` is ``"antithetic"``, the second half of the
+        draws are the negatives of the first half.
+
+        """
         n_choices_in_sets = list(set(map(sum, self.dense_key_to_choice_set.values())))
         shocks_sets = []
 
         for n_choices in n_choices_in_sets:
-            draws = create_base_draws(
-                (options["n_periods"], options["solution_draws"], n_choices),
-                next(options["solution_seed_startup"]),
-                options["monte_carlo_sequence"],
-            )
+            if options["emax_integration"] == "monte_carlo":
+                draws = create_base_draws(
+                    (options["n_periods"], options["solution_draws"], n_choices),
+                    next(options["solution_seed_startup"]),
+                    options["monte_carlo_sequence"],
+                )
+                if options["variance_reduction"] == "antithetic":
+                    draws = create_antithetic_draws(draws)
+            else:
+                nodes, _ = create_integration_nodes_and_weights(n_choices, options)
+                draws = np.broadcast_to(nodes, (options["n_periods"], *nodes.shape))
             shocks_sets.append(draws)
         draws = {}
         for dense_idx, complex_ix in self.dense_key_to_complex.items():
@@ -359,11 +681,7 @@ class StateSpace:
 
     def get_dense_keys_from_period(self, period):
         """Get dense indices from one period."""
-        return [
-            dense_index
-            for dense_index, complex_ in self.dense_key_to_complex.items()
-            if complex_[0] == period
-        ]
+        return list(self.period_to_dense_keys[period])
 
     def get_attribute_from_period(self, attribute, period):
         """Get an attribute of the state space sliced to a given period.
@@ -376,11 +694,11 @@ class StateSpace:
             Attribute is retrieved from this period.
 
         """
-        dense_indices_in_period = self.get_dense_keys_from_period(period)
+        attr = getattr(self, attribute)
         return {
-            dense_index: attr
-            for dense_index, attr in getattr(self, attribute).items()
-            if dense_index in dense_indices_in_period
+            dense_index: attr[dense_index]
+            for dense_index in self.period_to_dense_keys[period]
+            if dense_index in attr
         }
 
     def set_attribute_from_keys(self, attribute, value):
@@ -405,6 +723,560 @@ class StateSpace:
             getattr(self, attribute)[key][:] = value[key]
 
 
+class DenseKeyArrays(dict):
+    """Arrays of all dense keys stored in one contiguous array.
+
+    The container behaves like a dictionary which maps dense keys to arrays, but the
+    arrays are views on a single one-dimensional array, :attr:`data`. The arrays are
+    stored by period and, within periods, by dense key so that all values of one period
+    are a contiguous slice of :attr:`data`. The offset tables allow to locate the values
+    of a dense key or a period without looping over the dictionary.
+
+    Values can be changed in-place or by assigning to a dense key which copies the new
+    values into the existing storage. New dense keys cannot be added.
+
+    Parameters
+    ----------
+    shapes : dict
+        Maps dense keys to the shapes of their arrays. The first dimension is the number
+        of states.
+    dense_key_to_period : dict
+        Maps dense keys to periods.
+    dtype : numpy.dtype, default numpy.float64
+        Data type of the arrays.
+    fill_value : scalar, default 0
+        Initial value of the arrays.
+    data : numpy.ndarray, optional
+        One-dimensional array which is used as storage instead of allocating a new
+        array. ``dtype`` and ``fill_value`` are ignored.
+
+    Attributes
+    ----------
+    data : numpy.ndarray
+        One-dimensional array which holds the values of all dense keys.
+    starts, stops : numpy.ndarray
+        Arrays indexed by dense key with the positions of the values in :attr:`data`.
+    row_starts, row_stops : numpy.ndarray
+        Arrays indexed by dense key with the positions of the first dimension in the
+        concatenation of all arrays along the first dimension.
+    period_starts, period_stops : numpy.ndarray
+        Arrays indexed by period with the positions of the values of each period in
+        :attr:`data`.
+    period_row_starts, period_row_stops : numpy.ndarray
+        Arrays indexed by period with the positions of the states of each period in the
+        concatenation of all arrays along the first dimension.
+
+    """
+
+    def __init__(
+        self, shapes, dense_key_to_period, dtype=np.float64, fill_value=0, data=None
+    ):
+        super().__init__()
+        self.shapes = {key: tuple(shape) for key, shape in shapes.items()}
+        self.dense_key_to_period = {key: dense_key_to_period[key] for key in shapes}
+        self.dense_keys = np.array(
+            sorted(shapes, key=lambda key: (self.dense_key_to_period[key], key)),
+            dtype=np.int64,
+        )
+
+        periods = np.array(
+            [self.dense_key_to_period[key] for key in self.dense_keys], dtype=np.int64
+        )
+        n_elements = [int(np.prod(self.shapes[key])) for key in self.dense_keys]
+        n_rows = [self.shapes[key][0] for key in self.dense_keys]
+        offsets = np.concatenate(([0], np.cumsum(n_elements, dtype=np.int64)))
+        row_offsets = np.concatenate(([0], np.cumsum(n_rows, dtype=np.int64)))
+
+        n_keys = int(self.dense_keys.max()) + 1 if len(self.dense_keys) else 0
+        self.starts = np.zeros(n_keys, dtype=np.int64)
+        self.stops = np.zeros(n_keys, dtype=np.int64)
+        self.row_starts = np.zeros(n_keys, dtype=np.int64)
+        self.row_stops = np.zeros(n_keys, dtype=np.int64)
+        self.starts[self.dense_keys] = offsets[:-1]
+        self.stops[self.dense_keys] = offsets[1:]
+        self.row_starts[self.dense_keys] = row_offsets[:-1]
+        self.row_stops[self.dense_keys] = row_offsets[1:]
+
+        n_periods = periods.max() + 1 if len(periods) else 0
+        first = np.searchsorted(periods, np.arange(n_periods), side="left")
+        last = np.searchsorted(periods, np.arange(n_periods), side="right")
+        self.period_starts = offsets[first]
+        self.period_stops = offsets[last]
+        self.period_row_starts = row_offsets[first]
+        self.period_row_stops = row_offsets[last]
+
+        if data is None:
+            self.data = np.full(offsets[-1], fill_value, dtype=dtype)
+        elif data.shape == (offsets[-1],):
+            self.data = data
+        else:
+            raise ValueError(
+                f"data must have shape {(offsets[-1],)}, but has shape {data.shape}."
+            )
+        for key in self.dense_keys:
+            super().__setitem__(
+                int(key),
+                self.data[self.starts[key] : self.stops[key]].reshape(self.shapes[key]),
+            )
+
+    @classmethod
+    def from_dict(cls, arrays, dense_key_to_period):
+        """Copy a dictionary of arrays into a new container."""
+        shapes = {key: array.shape for key, array in arrays.items()}
+        dtype = np.result_type(*arrays.values()) if arrays else np.float64
+        out = cls(shapes, dense_key_to_period, dtype=dtype)
+        for key, array in arrays.items():
+            out[key] = array
+
+        return out
+
+    def __setitem__(self, key, value):
+        if key not in self:
+            raise KeyError(f"Dense key {key} is not part of the container.")
+        super().__getitem__(key)[...] = value
+
+    def __reduce__(self):
+        return (
+            _rebuild_dense_key_arrays,
+            (self.shapes, self.dense_key_to_period, self.data),
+        )
+
+    def copy(self):
+        """Copy the container and its values."""
+        return DenseKeyArrays(
+            self.shapes, self.dense_key_to_period, data=self.data.copy()
+        )
+
+    def get_period(self, period):
+        """Get the values of all dense keys in a period as a contiguous array."""
+        return self.data[self.period_starts[period] : self.period_stops[period]]
+
+
+def _rebuild_dense_key_arrays(shapes, dense_key_to_period, data):
+    return DenseKeyArrays(shapes, dense_key_to_period, data=data)
+
+
+class StateIndexer(collections.abc.Mapping):
+    """Array-backed index which maps states to integer values.
+
+    The index behaves like a read-only dictionary which maps tuples of integers, the
+    states, to values. Internally, every state is encoded into a single integer by
+    using the state variables as digits of a mixed radix number. The radix of each
+    variable is the range of its observed values. If the number of possible codes is
+    small compared to the number of states, the position of each state is stored in a
+    dense lookup table indexed by the code. Otherwise, the codes and positions are
+    stored in a hash table with open addressing.
+
+    Thus, mapping many states is vectorized arithmetic followed by a gather and the
+    index needs only a few integers per state.
+
+    Parameters
+    ----------
+    states : numpy.ndarray
+        Array with shape ``(n_states, n_variables)`` containing unique states.
+    values : numpy.ndarray
+        Array with shape ``(n_states,)`` or ``(n_states, n_values)`` containing the
+        values of the states. If the array has two dimensions, values are returned as
+        tuples.
+
+    Attributes
+    ----------
+    lower : numpy.ndarray
+        Minimum value of each state variable.
+    radices : numpy.ndarray
+        Number of possible values of each state variable.
+    multipliers : numpy.ndarray
+        Place value of each state variable in the code.
+
+    """
+
+    table_size_factor = 16
+    """int : Maximum ratio between the number of codes and states for a dense table."""
+
+    def __init__(self, states, values):
+        values = np.asarray(values)
+        states = np.asarray(states, dtype=np.int64).reshape(len(values), -1)
+        n_states, n_variables = states.shape
+
+        if n_states:
+            self.lower = states.min(axis=0)
+            self.radices = states.max(axis=0) - self.lower + 1
+        else:
+            self.lower = np.zeros(n_variables, dtype=np.int64)
+            self.radices = np.ones(n_variables, dtype=np.int64)
+
+        n_codes = int(np.prod(self.radices.astype(object)))
+        if n_codes > np.iinfo(np.int64).max:
+            raise ValueError(
+                "The states cannot be encoded as 64-bit integers as the product of the "
+                f"ranges of the state variables, {n_codes}, is too large."
+            )
+
+        self.multipliers = np.ones(n_variables, dtype=np.int64)
+        self.multipliers[:-1] = np.cumprod(self.radices[:0:-1])[::-1]
+        self.values = values
+
+        codes = _encode_states(states, self.lower, self.multipliers)
+        position_dtype = np.int32 if n_states < np.iinfo(np.int32).max else np.int64
+        if n_codes <= max(self.table_size_factor * n_states, 2**16):
+            self._codes = None
+            self._positions = np.full(n_codes, -1, dtype=position_dtype)
+            self._positions[codes] = np.arange(n_states)
+        else:
+            self._codes, self._positions = _create_hash_table(codes, position_dtype)
+
+    def __getitem__(self, state):
+        try:
+            position = self.get_positions(np.array(state, dtype=np.int64))[0]
+        except ValueError:
+            position = -1
+        if position == -1:
+            raise KeyError(state)
+
+        value = self.values[position]
+
+        return tuple(value.tolist()) if self.values.ndim == 2 else value.item()
+
+    def __iter__(self):
+        is_valid = self._positions != -1
+        codes = np.empty(len(self), dtype=np.int64)
+        codes[self._positions[is_valid]] = (
+            np.flatnonzero(is_valid) if self._codes is None else self._codes[is_valid]
+        )
+
+        states = codes.reshape(-1, 1) // self.multipliers % self.radices + self.lower
+
+        return map(tuple, states.tolist())
+
+    def __len__(self):
+        return len(self.values)
+
+    def get_positions(self, states):
+        """Get the positions of states in :attr:`values` or -1 for unknown states.
+
+        Parameters
+        ----------
+        states : numpy.ndarray
+            Array with shape ``(n_states, n_variables)`` or ``(n_variables,)``.
+
+        Returns
+        -------
+        positions : numpy.ndarray
+            Array with shape ``(n_states,)``.
+
+        """
+        states = np.asarray(states, dtype=np.int64).reshape(-1, len(self.radices))
+
+        if self._codes is None:
+            positions = _get_positions_from_table(
+                states, self.lower, self.radices, self.multipliers, self._positions
+            )
+        else:
+            positions = _get_positions_from_hash_table(
+                states,
+                self.lower,
+                self.radices,
+                self.multipliers,
+                self._codes,
+                self._positions,
+            )
+
+        return positions
+
+    def get_values(self, states):
+        """Get the values of many states at once.
+
+        Parameters
+        ----------
+        states : numpy.ndarray
+            Array with shape ``(n_states, n_variables)``.
+
+        Returns
+        -------
+        values : numpy.ndarray
+            Array with the values of the states.
+
+        Raises
+        ------
+        KeyError
+            If a state is not part of the index.
+
+        """
+        positions = self.get_positions(states)
+        is_unknown = positions == -1
+        if is_unknown.any():
+            state = np.asarray(states).reshape(len(positions), -1)[is_unknown.argmax()]
+            raise KeyError(tuple(state.tolist()))
+
+        return self.values[positions]
+
+
+@nb.njit
+def _encode_states(states, lower, multipliers):
+    """Encode states as mixed radix numbers."""
+    codes = np.zeros(states.shape[0], dtype=np.int64)
+    for i in range(states.shape[0]):
+        for j in range(states.shape[1]):
+            codes[i] += (states[i, j] - lower[j]) * multipliers[j]
+
+    return codes
+
+
+@nb.njit
+def _encode_state(state, lower, radices, multipliers):
+    """Encode a state as mixed radix number or return -1 if it is out of range."""
+    code = 0
+    for j in range(state.shape[0]):
+        digit = state[j] - lower[j]
+        if digit < 0 or digit >= radices[j]:
+            return -1
+        code += digit * multipliers[j]
+
+    return code
+
+
+@nb.njit(nogil=True)
+def _get_positions_from_table(states, lower, radices, multipliers, table):
+    positions = np.full(states.shape[0], -1, dtype=np.int64)
+    for i in range(states.shape[0]):
+        code = _encode_state(states[i], lower, radices, multipliers)
+        if code != -1:
+            positions[i] = table[code]
+
+    return positions
+
+
+@nb.njit
+def _hash_code(code, shift):
+    """Compute the slot of a code in a hash table with Fibonacci hashing."""
+    product = np.uint64(code) * np.uint64(11400714819323198485)
+    return np.int64(product >> np.uint64(shift))
+
+
+def _create_hash_table(codes, position_dtype):
+    """Create a hash table with linear probing from unique codes.
+
+    The capacity of the table is the smallest power of two which is at least twice the
+    number of codes. Empty slots are marked with -1.
+
+    """
+    n_bits = max(int(np.ceil(np.log2(max(2 * len(codes), 2)))), 1)
+    table_codes = np.full(2**n_bits, -1, dtype=np.int64)
+    table_positions = np.full(2**n_bits, -1, dtype=position_dtype)
+    _fill_hash_table(codes, 64 - n_bits, table_codes, table_positions)
+
+    return table_codes, table_positions
+
+
+@nb.njit
+def _fill_hash_table(codes, shift, table_codes, table_positions):
+    mask = table_codes.shape[0] - 1
+    for i in range(codes.shape[0]):
+        slot = _hash_code(codes[i], shift)
+        while table_codes[slot] != -1:
+            slot = (slot + 1) & mask
+        table_codes[slot] = codes[i]
+        table_positions[slot] = i
+
+
+@nb.njit(nogil=True)
+def _get_positions_from_hash_table(
+    states, lower, radices, multipliers, table_codes, table_positions
+):
+    mask = table_codes.shape[0] - 1
+    shift = 64 - int(np.log2(table_codes.shape[0]))
+    positions = np.full(states.shape[0], -1, dtype=np.int64)
+    for i in range(states.shape[0]):
+        code = _encode_state(states[i], lower, radices, multipliers)
+        if code != -1:
+            slot = _hash_code(code, shift)
+            while table_codes[slot] != -1:
+                if table_codes[slot] == code:
+                    positions[i] = table_positions[slot]
+                    break
+                slot = (slot + 1) & mask
+
+    return positions
+
+
+class StateStore:
+    """In-memory storage for the states of dense period choice cores.
+
+    The states of each dense period choice core are needed in every solution of the
+    model to compute rewards and transition probabilities. Instead of reading them from
+    the cache directory every time, the store keeps the states in memory.
+
+    The states of a dense period choice core are the states of a core key combined with
+    the information of a dense index. To avoid storing a copy of the core state space
+    for every dense index, the states are factorized into three parts.
+
+    1. Columns which are equal to the columns of the core state space are taken from
+       the core state space on access. Only the positions of the states in the core
+       state space are stored.
+    2. Columns which are constant like dense state variables or covariates which only
+       depend on them are stored as scalars.
+    3. The remaining columns, mixed covariates which depend on core and dense
+       information, are stored as contiguous arrays with the dtype used for dot
+       products.
+
+    If the size of the stored arrays exceeds ``options["cache_memory_limit"]`` bytes,
+    additional arrays are spilled to the cache directory and read from disk on access.
+    Since all dense period choice cores are visited in the same order in every
+    solution, keeping the first entries resident is preferable to a least-recently-used
+    policy which would evict every entry before it is accessed again.
+
+    Parameters
+    ----------
+    core : pandas.DataFrame
+        The core state space.
+    options : dict
+        Contains model options.
+
+    """
+
+    def __init__(self, core, options):
+        self.core = core
+        self.options = options
+        self.memory_limit = options["cache_memory_limit"]
+        self.n_bytes = 0
+        self._arrays = {}
+        self._columns = {}
+        self._core_columns = {}
+        self._core_positions = {}
+        self._constants = {}
+        self._mixed_columns = {}
+
+    def __setitem__(self, complex_, states):
+        core_positions = self.core.index.get_indexer(states.index)
+        if (core_positions == -1).any():
+            raise KeyError("States must be part of the core state space.")
+
+        core_columns = [
+            column
+            for column in states.columns
+            if column in self.core.columns
+            and np.array_equal(
+                states[column].to_numpy(), self.core[column].to_numpy()[core_positions]
+            )
+        ]
+        other_columns = [c for c in states.columns if c not in core_columns]
+        values = states[other_columns].to_numpy(dtype=COVARIATES_DOT_PRODUCT_DTYPE)
+        is_constant = (values == values[:1]).all(axis=0)
+
+        self._columns[complex_] = states.columns.tolist()
+        self._core_columns[complex_] = set(core_columns)
+        self._core_positions[complex_] = core_positions
+        self._constants[complex_] = {
+            column: values[0, i]
+            for i, column in enumerate(other_columns)
+            if is_constant[i]
+        }
+        self._mixed_columns[complex_] = [
+            column for i, column in enumerate(other_columns) if not is_constant[i]
+        ]
+
+        array = np.ascontiguousarray(values[:, ~is_constant])
+        if self.n_bytes + array.nbytes <= self.memory_limit or array.size == 0:
+            self._arrays[complex_] = array
+            self.n_bytes += array.nbytes
+        else:
+            dump_objects(
+                pd.DataFrame(array, columns=self._mixed_columns[complex_], copy=False),
+                "states",
+                complex_,
+                self.options,
+            )
+
+    def __getitem__(self, complex_):
+        """Get the states of a dense period choice core as a DataFrame."""
+        return pd.DataFrame(
+            self.get_array(complex_), columns=self._columns[complex_], copy=False
+        )
+
+    def __contains__(self, complex_):
+        return complex_ in self._columns
+
+    def __len__(self):
+        return len(self._columns)
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def is_in_memory(self, complex_):
+        """Indicate whether the mixed states of a complex index are held in memory."""
+        return complex_ in self._arrays
+
+    def get_columns(self, complex_):
+        """Get the names of the state variables and covariates."""
+        return self._columns[complex_]
+
+    def get_core_columns(self, complex_):
+        """Get the names of the columns which are taken from the core state space."""
+        return self._core_columns[complex_]
+
+    def get_core_positions(self, complex_):
+        """Get the positions of the states in the core state space."""
+        return self._core_positions[complex_]
+
+    def get_mixed_columns(self, complex_):
+        """Get the names of the columns which are stored as arrays."""
+        return self._mixed_columns[complex_]
+
+    def get_constants(self, complex_):
+        """Get the values of columns which are constant for all states."""
+        return self._constants[complex_]
+
+    def get_array(self, complex_, columns=None):
+        """Get the states of a dense period choice core as a contiguous array.
+
+        Parameters
+        ----------
+        complex_ : tuple
+            See :ref:`complex`.
+        columns : list of str, optional
+            Subset of columns to return. The order of the list is kept.
+
+        Returns
+        -------
+        array : numpy.ndarray
+            Array with shape ``(n_states, n_columns)``.
+
+        """
+        columns = self._columns[complex_] if columns is None else columns
+        core_positions = self._core_positions[complex_]
+        constants = self._constants[complex_]
+        mixed_columns = self._mixed_columns[complex_]
+
+        if any(column in mixed_columns for column in columns):
+            mixed = self._get_mixed_array(complex_)
+
+        array = np.empty(
+            (len(core_positions), len(columns)), dtype=COVARIATES_DOT_PRODUCT_DTYPE
+        )
+        for i, column in enumerate(columns):
+            if column in constants:
+                array[:, i] = constants[column]
+            elif column in mixed_columns:
+                array[:, i] = mixed[:, mixed_columns.index(column)]
+            elif column in self._core_columns[complex_]:
+                array[:, i] = self.core[column].to_numpy()[core_positions]
+            else:
+                raise KeyError(f"Column {column} is not part of the states.")
+
+        return array
+
+    def _get_mixed_array(self, complex_):
+        """Get the array of mixed states from memory or the cache directory."""
+        if complex_ in self._arrays:
+            array = self._arrays[complex_]
+        else:
+            array = load_objects("states", complex_, self.options).to_numpy(
+                dtype=COVARIATES_DOT_PRODUCT_DTYPE
+            )
+
+        return array
+
+
 def _create_core_state_space(optim_paras, options):
     """Create the core state space.
 
@@ -453,8 +1325,8 @@ def _create_core_state_space(optim_paras, options):
       function is useless if the model requires additional or less choices. For each
       number of choices with and without experience, a new function had to be
       programmed. The following approach uses the same loops over choices with
-      experiences, but they are dynamically created by the recursive function
-      :func:`_create_core_state_space_per_period`.
+      experiences, but they are dynamically created by the compiled function
+      :func:`_enumerate_core_states` which traverses the loops with an explicit stack.
 
     - There are characteristics of the state space which are independent from all other
       state space attributes like types (and almost lagged choices). These attributes
@@ -464,187 +1336,260 @@ def _create_core_state_space(optim_paras, options):
     See also
     --------
     _create_core_from_choice_experiences
-    _create_core_state_space_per_period
-    _filter_core_state_space
+    _enumerate_core_states
     _add_initial_experiences_to_core_state_space
     _create_indexer
 
     """
-    core = _create_core_from_choice_experiences(optim_paras)
-
-    core = _add_lagged_choice_to_core_state_space(core, optim_paras)
+    states = _create_core_from_choice_experiences(optim_paras, options)
 
-    core = _filter_core_state_space(core, options)
+    states = _add_initial_experiences_to_core_state_space(states, optim_paras)
 
-    core = _add_initial_experiences_to_core_state_space(core, optim_paras)
+    core = _convert_core_states_to_dataframe(states, optim_paras)
 
     core = core.sort_values("period").reset_index(drop=True)
 
     return core
 
 
-def _create_core_from_choice_experiences(optim_paras):
-    """Create the core state space from choice experiences.
+def _create_core_from_choice_experiences(optim_paras, options):
+    """Create the core state space from choice experiences and lagged choices.
 
     The core state space abstracts from initial experiences and uses the maximum range
     between initial experiences and maximum experiences to cover the whole range. The
     combinations of initial experiences are applied later in
     :func:`_add_initial_experiences_to_core_state_space`.
 
+    The states are enumerated by the compiled function :func:`_enumerate_core_states`.
+    Afterwards, ``options["core_state_space_filters"]`` are applied to all states at
+    once.
+
+    Returns
+    -------
+    states : numpy.ndarray
+        Array with shape ``(n_states, 1 + n_choices_w_exp + n_lagged_choices)`` which
+        contains the period, experiences and lagged choices of all states.
+
     See also
     --------
-    _create_core_state_space_per_period
+    _enumerate_core_states
 
     """
     choices_w_exp = list(optim_paras["choices_w_exp"])
     minimal_initial_experience = np.array(
         [min(optim_paras["choices"][choice]["start"]) for choice in choices_w_exp],
-        dtype=np.uint8,
+        dtype=np.int64,
     )
     maximum_exp = np.array(
         [optim_paras["choices"][choice]["max"] for choice in choices_w_exp],
-        dtype=np.uint8,
+        dtype=np.int64,
     )
-
     additional_exp = maximum_exp - minimal_initial_experience
 
-    exp_cols = [f"exp_{choice}" for choice in choices_w_exp]
-
-    container = []
-    for period in np.arange(optim_paras["n_periods"], dtype=np.uint8):
-        data = _create_core_state_space_per_period(
-            period,
-            additional_exp,
-            optim_paras,
-            np.zeros(len(choices_w_exp), dtype=np.uint8),
+    combinations_of_lagged_choices = list(
+        itertools.product(
+            range(len(optim_paras["choices"])), repeat=optim_paras["n_lagged_choices"]
         )
-        df_ = pd.DataFrame.from_records(data, columns=exp_cols)
-        df_.insert(0, "period", period)
-        container.append(df_)
+    )
+    lagged_choices = np.array(combinations_of_lagged_choices, dtype=np.int64).reshape(
+        len(combinations_of_lagged_choices), optim_paras["n_lagged_choices"]
+    )
 
-    df = pd.concat(container, axis="rows", sort=False)
+    states = _enumerate_core_states(
+        optim_paras["n_periods"], additional_exp, lagged_choices
+    )
 
-    return df
+    if options["core_state_space_filters"]:
+        df = _convert_core_states_to_dataframe(states, optim_paras, np.uint8)
+        is_excluded = np.zeros(len(df), dtype=np.bool_)
+        for definition in options["core_state_space_filters"]:
+            is_excluded |= df.eval(definition).to_numpy(dtype=np.bool_)
+        states = states[~is_excluded]
 
+    return states
 
-def _create_core_state_space_per_period(
-    period, additional_exp, optim_paras, experiences, pos=0
-):
-    """Create core state space per period.
 
-    First, this function returns a state combined with all possible lagged choices and
-    types.
+@nb.njit
+def _enumerate_core_states(n_periods, additional_exp, lagged_choices):
+    """Enumerate the states of the core state space without initial experiences.
 
-    Secondly, if there exists a choice with experience in ``additional_exp[pos]``, loop
-    over all admissible experiences, update the state and pass it to the same function,
-    but moving to the next choice which accumulates experience.
+    For each combination of lagged choices and each period, the experiences are
+    enumerated in depth-first order. Starting with zero experience in every choice, the
+    experience of the first choice is incremented as long as the remaining time and the
+    maximum additional experience of the choice allow it. For every level, the same is
+    done for the next choice with experience. Thus, experiences are bounded during the
+    enumeration and every state is created once.
 
     Parameters
     ----------
-    period : int
-        Number of period.
+    n_periods : int
+        Number of periods.
     additional_exp : numpy.ndarray
-        Array with shape (n_choices_w_exp,) containing integers representing the
-        additional experience per choice which is admissible. This is the difference
-        between the maximum experience and minimum of initial experience per choice.
-    experiences : None or numpy.ndarray, default None
-        Array with shape (n_choices_w_exp,) which contains current experience of state.
-    pos : int, default 0
-        Index for current choice with experience. If index is valid for array
-        ``experiences``, then loop over all admissible experience levels of this choice.
-        Otherwise, ``experiences[pos]`` would lead to an :exc:`IndexError`.
+        Array with shape (n_choices_w_exp,) containing the additional experience per
+        choice which is admissible. This is the difference between the maximum
+        experience and minimum of initial experience per choice.
+    lagged_choices : numpy.ndarray
+        Array with shape (n_combinations, n_lagged_choices) containing all combinations
+        of lagged choices.
 
-    """
-    # Return experiences combined with lagged choices and types.
-    yield experiences
-
-    # Check if there is an additional choice left to start another loop.
-    if pos < experiences.shape[0]:
-        # Upper bound of additional experience is given by the remaining time or the
-        # maximum experience which can be accumulated in experience[pos].
-        remaining_time = period - experiences.sum()
-        max_experience = additional_exp[pos]
-
-        # +1 is necessary so that the remaining time or max_experience is exhausted.
-        for i in np.arange(min(remaining_time, max_experience) + 1, dtype=np.uint8):
-            # Update experiences and call the same function with the next choice.
-            updated_experiences = experiences.copy()
-            updated_experiences[pos] += i
-            yield from _create_core_state_space_per_period(
-                period, additional_exp, optim_paras, updated_experiences, pos + 1
-            )
-
-
-def _add_lagged_choice_to_core_state_space(df, optim_paras):
-    container = []
-    for lag in range(1, optim_paras["n_lagged_choices"] + 1):
-        for choice_code in range(len(optim_paras["choices"])):
-            df_ = df.copy()
-            df_[f"lagged_choice_{lag}"] = choice_code
-            container.append(df_)
-
-    df = pd.concat(container, axis="rows", sort=False) if container else df
-
-    return df
-
-
-def _filter_core_state_space(df, options):
-    """Apply filters to the core state space.
-
-    Sometimes, we want to apply filters to a group of choices. Thus, use the following
-    shortcuts.
-
-    - ``i`` is replaced with every choice with experience.
-    - ``j`` is replaced with every choice without experience.
-    - ``k`` is replaced with every choice with a wage.
-
-    Parameters
-    ----------
-    df : pandas.DataFrame
-    options : dict
+    Returns
+    -------
+    states : numpy.ndarray
+        Array with shape ``(n_states, 1 + n_choices_w_exp + n_lagged_choices)``. The
+        array has a small integer type to keep the memory footprint of large state
+        spaces low.
 
     """
-    for definition in options["core_state_space_filters"]:
-        df = df.loc[~df.eval(definition)]
-
-    return df
-
-
-def _add_initial_experiences_to_core_state_space(df, optim_paras):
+    n_exp = additional_exp.shape[0]
+    n_lags = lagged_choices.shape[1]
+    n_columns = 1 + n_exp + n_lags
+
+    states = np.empty((1024, n_columns), dtype=np.int16)
+    n_states = 0
+
+    # Each entry of the stack contains the experiences, the position of the next choice
+    # whose experience is incremented and whether the entry is a new state.
+    stack = np.zeros((1 + n_exp * (n_periods + 1), n_exp + 2), dtype=np.int64)
+
+    for lc in range(lagged_choices.shape[0]):
+        for period in range(n_periods):
+            stack[0] = 0
+            stack[0, n_exp + 1] = 1
+            n_stack = 1
+
+            while n_stack > 0:
+                n_stack -= 1
+                experiences = stack[n_stack, :n_exp].copy()
+                pos = stack[n_stack, n_exp]
+
+                if stack[n_stack, n_exp + 1]:
+                    if n_states == states.shape[0]:
+                        states = np.concatenate((states, np.empty_like(states)))
+                    states[n_states, 0] = period
+                    states[n_states, 1 : n_exp + 1] = experiences
+                    states[n_states, n_exp + 1 :] = lagged_choices[lc]
+                    n_states += 1
+
+                if pos < n_exp:
+                    upper = min(period - experiences.sum(), additional_exp[pos])
+                    # Push in reverse order such that lower experiences come first.
+                    for i in range(upper, -1, -1):
+                        stack[n_stack, :n_exp] = experiences
+                        stack[n_stack, pos] += i
+                        stack[n_stack, n_exp] = pos + 1
+                        stack[n_stack, n_exp + 1] = i > 0
+                        n_stack += 1
+
+    return states[:n_states]
+
+
+def _add_initial_experiences_to_core_state_space(states, optim_paras):
     """Add initial experiences to core state space.
 
     As the core state space abstracts from differences in initial experiences, this
     function loops through all combinations from initial experiences and adds them to
     existing experiences. After that, we need to check whether the maximum in
-    experiences is still binding.
+    experiences is still binding. Duplicate states are removed while the first
+    occurrence of each state is kept.
+
+    Instead of stacking copies of the core state space for every combination, the
+    function only keeps a boolean mask per combination. Duplicates can only occur
+    within the same period which is why they are detected period by period.
 
     """
     choices = optim_paras["choices"]
-    # Create combinations of starting values
-    initial_experiences_combinations = itertools.product(
-        *(choices[choice]["start"] for choice in optim_paras["choices_w_exp"])
-    )
+    choices_w_exp = list(optim_paras["choices_w_exp"])
+    n_exp = len(choices_w_exp)
+
+    initial_experiences = np.array(
+        list(
+            itertools.product(*(choices[choice]["start"] for choice in choices_w_exp))
+        ),
+        dtype=np.int64,
+    ).reshape(-1, n_exp)
+    maximum_exp = np.array([choices[choice]["max"] for choice in choices_w_exp])
+
+    experiences = states[:, 1 : n_exp + 1]
+    is_kept = np.empty((len(initial_experiences), len(states)), dtype=np.bool_)
+    for i, initial_exp in enumerate(initial_experiences):
+        is_kept[i] = (experiences <= maximum_exp - initial_exp).all(axis=1)
+
+    if len(initial_experiences) > 1:
+        _keep_first_occurrences_per_period(
+            states, initial_experiences, is_kept, maximum_exp, optim_paras
+        )
 
-    maximum_exp = np.array(
-        [choices[choice]["max"] for choice in optim_paras["choices_w_exp"]]
-    )
+    container = []
+    for initial_exp, is_kept_ in zip(initial_experiences, is_kept):
+        states_ = states[is_kept_].astype(np.int64)
+        states_[:, 1 : n_exp + 1] += initial_exp
+        container.append(states_)
 
-    exp_cols = df.filter(like="exp_").columns.tolist()
+    return np.concatenate(container)
 
-    container = []
 
-    for initial_exp in initial_experiences_combinations:
-        df_ = df.copy()
+def _keep_first_occurrences_per_period(
+    states, initial_experiences, is_kept, maximum_exp, optim_paras
+):
+    """Restrict the mask of kept states to the first occurrence of every state.
+
+    The states are ordered by the combination of initial experiences and, then, by their
+    position in the core state space. Every state is encoded as a single integer using
+    experiences and lagged choices as digits of a mixed radix number. If the number does
+    not fit into a 64-bit integer, the rows are compared directly.
+
+    The mask, ``is_kept``, is modified in-place.
 
-        # Add initial experiences.
-        df_[exp_cols] += initial_exp
+    """
+    n_exp = len(optim_paras["choices_w_exp"])
+    n_lags = optim_paras["n_lagged_choices"]
+    radices = [int(max_) + 1 for max_ in maximum_exp] + [
+        len(optim_paras["choices"])
+    ] * n_lags
+    use_codes = np.prod(radices, dtype=object) < np.iinfo(np.int64).max
+
+    if use_codes:
+        multipliers = np.cumprod([1] + radices[:0:-1])[::-1].astype(np.int64)
+        codes = states[:, 1:].astype(np.int64) @ multipliers
+        offsets = initial_experiences @ multipliers[:n_exp]
+
+    periods = states[:, 0]
+    order = np.argsort(periods, kind="stable")
+    bounds = np.searchsorted(periods[order], np.arange(periods.max() + 2))
+
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        indices = order[start:stop]
+        is_kept_ = is_kept[:, indices].ravel()
+        positions = np.flatnonzero(is_kept_)
+
+        if use_codes:
+            candidates = (codes[indices] + offsets.reshape(-1, 1)).ravel()[positions]
+            _, first_occurrences = np.unique(candidates, return_index=True)
+        else:
+            candidates = (
+                states[indices, 1:].astype(np.int64)
+                + np.pad(initial_experiences, ((0, 0), (0, n_lags)))[:, None]
+            ).reshape(-1, states.shape[1] - 1)[positions]
+            _, first_occurrences = np.unique(candidates, axis=0, return_index=True)
 
-        # Check that max_experience is still fulfilled.
-        df_ = df_.loc[df_[exp_cols].le(maximum_exp).all(axis="columns")].copy()
+        is_kept_[:] = False
+        is_kept_[positions[first_occurrences]] = True
+        is_kept[:, indices] = is_kept_.reshape(len(initial_experiences), -1)
 
-        container.append(df_)
 
-    df = pd.concat(container, axis="rows", sort=False).drop_duplicates()
+def _convert_core_states_to_dataframe(states, optim_paras, exp_dtype=np.int64):
+    """Convert the array of core states to a DataFrame."""
+    df = pd.DataFrame(
+        states, columns=["period"] + create_core_state_space_columns(optim_paras)
+    )
+    n_exp = len(optim_paras["choices_w_exp"])
+    df = df.astype(
+        {
+            "period": np.uint8,
+            **{column: exp_dtype for column in df.columns[1 : n_exp + 1]},
+            **{column: np.int64 for column in df.columns[n_exp + 1 :]},
+        }
+    )
 
     return df
 
@@ -716,24 +1661,29 @@ def _create_indexer(core, core_key_to_core_indices, optim_paras):
 
     Returns
     -------
-    indexer :  numba.typed.Dict
+    indexer : StateIndexer
         Maps a row of the core state space into its position within the
         period_choice_cores. c: core_state -> (core_key,core_index)
 
     """
     core_columns = ["period"] + create_core_state_space_columns(optim_paras)
-    n_core_state_variables = len(core_columns)
 
-    indexer = Dict.empty(
-        key_type=nb.types.UniTuple(nb.types.int64, n_core_state_variables),
-        value_type=nb.types.UniTuple(nb.types.int64, 2),
-    )
+    if core_key_to_core_indices:
+        indices = np.concatenate(list(core_key_to_core_indices.values()))
+        core_keys = np.repeat(
+            np.array(list(core_key_to_core_indices), dtype=np.int64),
+            [len(i) for i in core_key_to_core_indices.values()],
+        )
+        core_indices = np.concatenate(
+            [np.arange(len(i)) for i in core_key_to_core_indices.values()]
+        )
+    else:
+        indices = core_keys = core_indices = np.zeros(0, dtype=np.int64)
 
-    for core_idx, indices in core_key_to_core_indices.items():
-        states = core.loc[indices, core_columns].to_numpy()
-        for i, state in enumerate(states):
-            indexer[tuple(state)] = (core_idx, i)
-    return indexer
+    states = core.loc[indices, core_columns].to_numpy(dtype=np.int64)
+    values = np.column_stack((core_keys, core_indices)).astype(np.int64)
+
+    return StateIndexer(states, values)
 
 
 def _create_core_period_choice(core, optim_paras, options):
@@ -757,7 +1707,13 @@ def _create_core_period_choice(core, optim_paras, options):
 
 
 def _create_dense_period_choice(
-    core, dense, core_key_to_core_indices, core_key_to_complex, optim_paras, options
+    core,
+    dense,
+    core_key_to_core_indices,
+    core_key_to_complex,
+    state_store,
+    optim_paras,
+    options,
 ):
     """Create dense period choice parts of the state space.
 
@@ -769,6 +1725,8 @@ def _create_dense_period_choice(
     dense covariates. In order to do so we would have to rewrite this function and
     return explicit state space position instead of core indices!
 
+    The states of each dense period choice core are stored in ``state_store``.
+
     Returns
     -------
     dense_period_choice : dict
@@ -777,9 +1735,7 @@ def _create_dense_period_choice(
     """
     if not dense:
         for key, complex_ in core_key_to_complex.items():
-            dump_objects(
-                core.loc[core_key_to_core_indices[key]], "states", complex_, options
-            )
+            state_store[complex_] = core.loc[core_key_to_core_indices[key]]
         dense_period_choice = {k: i for i, k in core_key_to_complex.items()}
     else:
         choices = [f"_{choice}" for choice in optim_paras["choices"]]
@@ -807,64 +1763,13 @@ def _create_dense_period_choice(
 
                 dense_period_choice = {**dense_period_choice, **period_choice}
                 idx = list(grouper.keys())[0]
-                dump_objects(
-                    df,
-                    "states",
-                    (core_key_to_complex[core_idx][0], idx, dense_idx),
-                    options,
-                )
+                state_store[(core_key_to_complex[core_idx][0], idx, dense_idx)] = df
 
     return dense_period_choice
 
 
 @parallelize_across_dense_dimensions
-def _get_continuation_values(
-    dense_complex_index,
-    choice_set,
-    core_indices,
-    child_indices,
-    core_index_and_dense_vector_to_dense_index,
-    expected_value_functions,
-):
-    """Get continuation values from child states.
-
-    The continuation values are the discounted expected value functions from child
-    states. This method allows to retrieve continuation values that were obtained in the
-    model solution. In particular the function assigns continuation values to state
-    choice combinations by using the child indices created in
-    :func:`_collect_child_indices`.
-
-    Returns
-    -------
-    continuation_values : numpy.ndarray
-        Array with shape ``(n_states, n_choices)``. Maps core_key and choice into
-        continuation value.
-
-    """
-    if len(dense_complex_index) == 3:
-        period, _, dense_idx = dense_complex_index
-    elif len(dense_complex_index) == 2:
-        period, _ = dense_complex_index
-        dense_idx = 0
-
-    n_choices = sum_over_numba_boolean_unituple(choice_set)
-
-    n_states = core_indices.shape[0]
-
-    continuation_values = np.zeros((len(core_indices), n_choices))
-    for i in range(n_states):
-        for j in range(n_choices):
-            core_idx, row_idx = child_indices[i, j]
-            idx = (core_idx, dense_idx)
-            dense_choice = core_index_and_dense_vector_to_dense_index[idx]
-
-            continuation_values[i, j] = expected_value_functions[dense_choice][row_idx]
-
-    return continuation_values
-
-
-@parallelize_across_dense_dimensions
-def _collect_child_indices(complex_, choice_set, indexer, optim_paras, options):
+def _collect_child_indices(complex_, choice_set, state_store, indexer, optim_paras):
     """Collect child indices for states.
 
     The function takes the states of one dense key, applies the law of motion for each
@@ -876,12 +1781,12 @@ def _collect_child_indices(complex_, choice_set, indexer, optim_paras, options):
         See :ref:`complex`.
     choice_set : tuple
         Tuple representing admissible choices
-    indexer : numba.typed.Dict
-        A dictionary with core states as keys and the core key and core index as values.
+    state_store : StateStore
+        Contains the states of each dense period choice core.
+    indexer : StateIndexer
+        Maps core states to the core key and core index.
     optim_paras : dict
         Contains model parameters.
-    options : dict
-        Contains model options.
 
     Returns
     -------
@@ -891,7 +1796,10 @@ def _collect_child_indices(complex_, choice_set, indexer, optim_paras, options):
 
     """
     core_columns = create_core_state_space_columns(optim_paras)
-    states = load_objects("states", complex_, options)
+    columns = ["period"] + core_columns
+    states = pd.DataFrame(
+        state_store.get_array(complex_, columns).astype(np.int64), columns=columns
+    )
 
     n_choices = sum(choice_set)
     indices = np.full((states.shape[0], n_choices, 2), -1, dtype=np.int64)
@@ -903,7 +1811,7 @@ def _collect_child_indices(complex_, choice_set, indexer, optim_paras, options):
         states_["choice"] = choice
         states_ = apply_law_of_motion_for_core(states_, optim_paras)
 
-        states_ = states_[["period"] + core_columns]
+        states_ = states_[columns]
 
         indices[:, i, 0], indices[:, i, 1] = map_states_to_core_key_and_core_index(
             states_.to_numpy(), indexer
@@ -1,8 +1,19 @@
+import itertools
+
 import numpy as np
+import pandas as pd
+from numba import guvectorize
 from numba import njit
+from numba import prange
 
+from respy.conditional_draws import transform_base_draw
+from respy.conditional_draws import update_shocks_and_log_prob_wages
 from respy.config import INDEXER_DTYPE
 from respy.config import INDEXER_INVALID_INDEX
+from respy.config import MAX_LOG_FLOAT
+from respy.draws import CounterBasedDraws
+from respy.draws import fill_antithetic_standard_normal_draws
+from respy.draws import fill_standard_normal_draws
 
 
 @njit
@@ -488,3 +499,378 @@ def _create_state_space_kw97_extended(n_periods, n_types, edu_starts, edu_max):
     states = np.array(data)
 
     return states, indexer
+
+
+def _create_core_state_space_with_pandas(optim_paras, options):
+    """Create the core state space with the former implementation based on pandas.
+
+    The states are created with a recursive generator, lagged choices and initial
+    experiences are added by copying and concatenating DataFrames and duplicates are
+    removed with :meth:`pandas.DataFrame.drop_duplicates`.
+
+    """
+    core = _create_core_from_choice_experiences(optim_paras)
+
+    core = _add_lagged_choice_to_core_state_space(core, optim_paras)
+
+    core = _filter_core_state_space(core, options)
+
+    core = _add_initial_experiences_to_core_state_space(core, optim_paras)
+
+    core = core.sort_values("period").reset_index(drop=True)
+
+    return core
+
+
+def _create_core_from_choice_experiences(optim_paras):
+    """Create the core state space from choice experiences.
+
+    The core state space abstracts from initial experiences and uses the maximum range
+    between initial experiences and maximum experiences to cover the whole range. The
+    combinations of initial experiences are applied later in
+    :func:`_add_initial_experiences_to_core_state_space`.
+
+    See also
+    --------
+    _create_core_state_space_per_period
+
+    """
+    choices_w_exp = list(optim_paras["choices_w_exp"])
+    minimal_initial_experience = np.array(
+        [min(optim_paras["choices"][choice]["start"]) for choice in choices_w_exp],
+        dtype=np.uint8,
+    )
+    maximum_exp = np.array(
+        [optim_paras["choices"][choice]["max"] for choice in choices_w_exp],
+        dtype=np.uint8,
+    )
+
+    additional_exp = maximum_exp - minimal_initial_experience
+
+    exp_cols = [f"exp_{choice}" for choice in choices_w_exp]
+
+    container = []
+    for period in np.arange(optim_paras["n_periods"], dtype=np.uint8):
+        data = _create_core_state_space_per_period(
+            period,
+            additional_exp,
+            optim_paras,
+            np.zeros(len(choices_w_exp), dtype=np.uint8),
+        )
+        df_ = pd.DataFrame.from_records(data, columns=exp_cols)
+        df_.insert(0, "period", period)
+        container.append(df_)
+
+    df = pd.concat(container, axis="rows", sort=False)
+
+    return df
+
+
+def _create_core_state_space_per_period(
+    period, additional_exp, optim_paras, experiences, pos=0
+):
+    """Create core state space per period.
+
+    First, this function returns a state combined with all possible lagged choices and
+    types.
+
+    Secondly, if there exists a choice with experience in ``additional_exp[pos]``, loop
+    over all admissible experiences, update the state and pass it to the same function,
+    but moving to the next choice which accumulates experience.
+
+    Parameters
+    ----------
+    period : int
+        Number of period.
+    additional_exp : numpy.ndarray
+        Array with shape (n_choices_w_exp,) containing integers representing the
+        additional experience per choice which is admissible. This is the difference
+        between the maximum experience and minimum of initial experience per choice.
+    experiences : None or numpy.ndarray, default None
+        Array with shape (n_choices_w_exp,) which contains current experience of state.
+    pos : int, default 0
+        Index for current choice with experience. If index is valid for array
+        ``experiences``, then loop over all admissible experience levels of this choice.
+        Otherwise, ``experiences[pos]`` would lead to an :exc:`IndexError`.
+
+    """
+    # Return experiences combined with lagged choices and types.
+    yield experiences
+
+    # Check if there is an additional choice left to start another loop.
+    if pos < experiences.shape[0]:
+        # Upper bound of additional experience is given by the remaining time or the
+        # maximum experience which can be accumulated in experience[pos].
+        remaining_time = period - experiences.sum()
+        max_experience = additional_exp[pos]
+
+        # +1 is necessary so that the remaining time or max_experience is exhausted.
+        for i in np.arange(min(remaining_time, max_experience) + 1, dtype=np.uint8):
+            # Update experiences and call the same function with the next choice.
+            updated_experiences = experiences.copy()
+            updated_experiences[pos] += i
+            yield from _create_core_state_space_per_period(
+                period, additional_exp, optim_paras, updated_experiences, pos + 1
+            )
+
+
+def _add_lagged_choice_to_core_state_space(df, optim_paras):
+    container = []
+    for lag in range(1, optim_paras["n_lagged_choices"] + 1):
+        for choice_code in range(len(optim_paras["choices"])):
+            df_ = df.copy()
+            df_[f"lagged_choice_{lag}"] = choice_code
+            container.append(df_)
+
+    df = pd.concat(container, axis="rows", sort=False) if container else df
+
+    return df
+
+
+def _filter_core_state_space(df, options):
+    """Apply filters to the core state space.
+
+    Sometimes, we want to apply filters to a group of choices. Thus, use the following
+    shortcuts.
+
+    - ``i`` is replaced with every choice with experience.
+    - ``j`` is replaced with every choice without experience.
+    - ``k`` is replaced with every choice with a wage.
+
+    Parameters
+    ----------
+    df : pandas.DataFrame
+    options : dict
+
+    """
+    for definition in options["core_state_space_filters"]:
+        df = df.loc[~df.eval(definition)]
+
+    return df
+
+
+def _add_initial_experiences_to_core_state_space(df, optim_paras):
+    """Add initial experiences to core state space.
+
+    As the core state space abstracts from differences in initial experiences, this
+    function loops through all combinations from initial experiences and adds them to
+    existing experiences. After that, we need to check whether the maximum in
+    experiences is still binding.
+
+    """
+    choices = optim_paras["choices"]
+    # Create combinations of starting values
+    initial_experiences_combinations = itertools.product(
+        *(choices[choice]["start"] for choice in optim_paras["choices_w_exp"])
+    )
+
+    maximum_exp = np.array(
+        [choices[choice]["max"] for choice in optim_paras["choices_w_exp"]]
+    )
+
+    exp_cols = df.filter(like="exp_").columns.tolist()
+
+    container = []
+
+    for initial_exp in initial_experiences_combinations:
+        df_ = df.copy()
+
+        # Add initial experiences.
+        df_[exp_cols] += initial_exp
+
+        # Check that max_experience is still fulfilled.
+        df_ = df_.loc[df_[exp_cols].le(maximum_exp).all(axis="columns")].copy()
+
+        container.append(df_)
+
+    df = pd.concat(container, axis="rows", sort=False).drop_duplicates()
+
+    return df
+
+
+def create_draws_and_log_prob_wages(
+    log_wage_observed,
+    wages_systematic,
+    base_draws,
+    choices,
+    shocks_cholesky,
+    n_wages,
+    meas_sds,
+    has_meas_error,
+):
+    """Evaluate likelihood of observed wages and create conditional draws.
+
+    This was the implementation before the conditional draws were computed inside the
+    kernel which simulates the choice probabilities, see
+    :func:`respy.likelihood._simulate_log_probabilities_of_observed_choices`. It
+    allocates all conditional draws and is kept as a reference.
+
+    Let n_obs be the number of period-individual combinations, i.e. the number of rows
+    of the empirical dataset.
+
+    Parameters
+    ----------
+    log_wage_observed : numpy.ndarray
+        Array with shape (n_obs,) containing observed log wages.
+    wages_systematic : numpy.ndarray
+        Array with shape (n_obs, n_choices) containing systematic wages. Can
+        contain numpy.nan or any number for non-wage choices. The non-wage choices only
+        have to be there to not raise index errors.
+    base_draws : numpy.ndarray or respy.draws.CounterBasedDraws
+        Array with shape (n_obs, n_draws, n_choices) with standard normal
+        random variables. If the draws are counter-based, they are generated inside the
+        kernel which computes the conditional draws and are never stored.
+    choices : numpy.ndarray
+        Array with shape (n_obs,) containing observed choices. Is used to
+        select columns of systematic wages. Therefore it has to be coded starting at
+        zero.
+    shocks_cholesky : numpy.ndarray
+        Array with shape (n_choices, n_choices) with the lower triangular Cholesky
+        factor of the covariance matrix of the shocks.
+    n_wages : int
+        Number of wage sectors
+    meas_sds : numpy.ndarray
+        Array with shape (n_choices,) containing standard deviations of the measurement
+        errors of observed reward components. It is 0 for choices where no reward
+        component is observed.
+    has_meas_error : bool
+
+    Returns
+    -------
+    draws : numpy.ndarray
+        Array with shape (n_obs, n_draws, n_choices) containing shocks drawn
+        from a multivariate normal distribution conditional on the observed wages.
+    log_prob_wages : numpy.ndarray
+        Array with shape (n_obs,) containing the unconditional log likelihood
+        of the observed wages, correcting for measurement error if necessary.
+    updated_means : numpy.ndarray
+        Array with shape (n_obs, n_choices) containing the means of the shocks
+        conditional on the observed wages before wage shocks are exponentiated.
+
+    """
+    (
+        updated_means,
+        log_prob_wages,
+        updated_chols,
+        chol_indices,
+    ) = update_shocks_and_log_prob_wages(
+        log_wage_observed,
+        wages_systematic,
+        choices,
+        shocks_cholesky,
+        n_wages,
+        meas_sds,
+        has_meas_error,
+    )
+
+    if isinstance(base_draws, CounterBasedDraws):
+        draws = calculate_conditional_draws_from_counter(
+            base_draws.seed,
+            base_draws.rows,
+            base_draws.n_draws,
+            base_draws.antithetic,
+            updated_means,
+            updated_chols,
+            chol_indices,
+            MAX_LOG_FLOAT,
+        )
+    else:
+        draws = calculate_conditional_draws(
+            base_draws, updated_means, updated_chols, chol_indices, MAX_LOG_FLOAT
+        )
+
+    return draws, log_prob_wages, updated_means
+
+
+@guvectorize(
+    ["f8[:, :], f8[:], f8[:, :, :], u2, f8, f8[:, :]"],
+    "(n_draws, n_choices), (n_choices), (n_wages_plus_one, n_choices, n_choices), (), "
+    "() -> (n_draws, n_choices)",
+    nopython=True,
+)
+def calculate_conditional_draws(
+    base_draws, updated_mean, updated_chols, chol_index, max_log_float, conditional_draw
+):
+    """Calculate the conditional draws from base draws, updated means and updated chols.
+
+    We need to pass ``max_log_float`` to the function, because the global variables
+    ``MAX_LOG_FLOAT`` cannot be used directly within the guvectorize.
+
+    Parameters
+    ----------
+    base_draws : np.ndarray
+        iid standard normal draws
+    updated_mean : np.ndarray
+        conditional mean, given the observed shock. Contains the observed shock in the
+        corresponding position.
+    updated_chols : np.ndarray
+        cholesky factor of conditional covariance, given the observed shock. If there is
+        no measurement error, it contains a zero column and row at the position of the
+        observed shock.
+    chol_index : float
+        index of the relevant updated cholesky factor
+    max_log_float : float
+        Value at which numbers soon to be exponentiated are clipped.
+
+    Returns
+    -------
+    conditional draws : np.ndarray
+        draws from the conditional distribution of the shocks.
+
+    """
+    n_draws = base_draws.shape[0]
+    n_wages = len(updated_chols) - 1
+
+    for d in range(n_draws):
+        transform_base_draw(
+            base_draws[d],
+            updated_mean,
+            updated_chols[chol_index],
+            n_wages,
+            max_log_float,
+            conditional_draw[d],
+        )
+
+
+@njit(parallel=True)
+def calculate_conditional_draws_from_counter(
+    seed,
+    rows,
+    n_draws,
+    antithetic,
+    updated_means,
+    updated_chols,
+    chol_indices,
+    max_log_float,
+):
+    """Calculate the conditional draws from counter-based base draws.
+
+    This is the counterpart of :func:`calculate_conditional_draws` for
+    :class:`~respy.draws.CounterBasedDraws`. The base draws of each observation are
+    generated right before they are transformed such that the array of base draws
+    with shape (n_obs, n_draws, n_choices) is never allocated.
+
+    """
+    n_obs, n_choices = updated_means.shape
+    n_wages = len(updated_chols) - 1
+    conditional_draws = np.empty((n_obs, n_draws, n_choices))
+
+    for i in prange(n_obs):
+        base_draw = np.empty(n_choices)
+        for d in range(n_draws):
+            if antithetic:
+                fill_antithetic_standard_normal_draws(
+                    seed, rows[i], d, n_draws, base_draw
+                )
+            else:
+                fill_standard_normal_draws(seed, rows[i], d, base_draw)
+            transform_base_draw(
+                base_draw,
+                updated_means[i],
+                updated_chols[chol_indices[i]],
+                n_wages,
+                max_log_float,
+                conditional_draws[i, d],
+            )
+
+    return conditional_draws
@@ -4,12 +4,15 @@ import numpy as np
 import pytest
 from numpy.testing import assert_array_almost_equal as aaae
 
-from respy.conditional_draws import calculate_conditional_draws
 from respy.conditional_draws import update_cholcov
 from respy.conditional_draws import update_cholcov_with_measurement_error
 from respy.conditional_draws import update_mean_and_evaluate_likelihood
 from respy.config import MAX_LOG_FLOAT
 from respy.config import TEST_RESOURCES_DIR
+from respy.draws import CounterBasedDraws
+from respy.shared import create_antithetic_draws
+from respy.tests._former_code import calculate_conditional_draws
+from respy.tests._former_code import create_draws_and_log_prob_wages
 
 
 @pytest.fixture()
@@ -82,3 +85,67 @@ def test_calculate_conditional_draws():
     expected = np.array([1.64872127, 0.36787944, 5])
 
     aaae(calculated, expected)
+
+
+@pytest.mark.unit
+def test_counter_based_draws_are_standard_normal_and_independent_of_subsets():
+    draws = CounterBasedDraws(seed=5, rows=np.arange(10_000), n_draws=20, n_choices=3)
+    materialized = np.asarray(draws)
+
+    assert materialized.shape == (10_000, 20, 3)
+    aaae(materialized.mean(axis=(0, 1)), np.zeros(3), decimal=2)
+    aaae(materialized.std(axis=(0, 1)), np.ones(3), decimal=2)
+    aaae(np.corrcoef(materialized.reshape(-1, 3).T), np.eye(3), decimal=2)
+
+    rows = np.array([17, 3, 9_999])
+    np.testing.assert_array_equal(np.asarray(draws[rows]), materialized[rows])
+    np.testing.assert_array_equal(
+        np.asarray(CounterBasedDraws(5, rows, 20, 3)), materialized[rows]
+    )
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("has_meas_error", [False, True])
+def test_conditional_draws_from_counter_equal_draws_from_stored_base_draws(
+    has_meas_error,
+):
+    n_obs, n_choices, n_wages = 50, 4, 2
+    state = np.random.RandomState(0)
+    wages_systematic = np.exp(state.normal(size=(n_obs, n_choices)))
+    choices = state.choice(n_choices, size=n_obs)
+    log_wage_observed = np.where(
+        choices < n_wages, state.normal(size=n_obs) + 0.5, np.nan
+    )
+    chol = np.linalg.cholesky(np.eye(n_choices) * 0.5 + 0.5)
+    meas_sds = np.full(n_wages, 0.1 if has_meas_error else 0.0)
+    base_draws = CounterBasedDraws(3, np.arange(100, 100 + n_obs), 30, n_choices)
+
+    results = [
+        create_draws_and_log_prob_wages(
+            log_wage_observed,
+            wages_systematic,
+            draws,
+            choices,
+            chol,
+            n_wages,
+            meas_sds,
+            has_meas_error,
+        )
+        for draws in [base_draws, np.asarray(base_draws)]
+    ]
+
+    for counter_based, stored in zip(*results):
+        aaae(counter_based, stored, decimal=12)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("n_draws", [6, 7])
+def test_antithetic_counter_based_draws_equal_antithetic_stored_draws(n_draws):
+    rows = np.arange(10, 20)
+    draws = CounterBasedDraws(5, rows, n_draws, 3, antithetic=True)
+    expected = create_antithetic_draws(
+        np.asarray(CounterBasedDraws(5, rows, n_draws, 3))
+    )
+
+    aaae(np.asarray(draws), expected, decimal=15)
+    aaae(np.asarray(draws[2:5]), expected[2:5], decimal=15)
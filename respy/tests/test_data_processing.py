@@ -0,0 +1,65 @@
+from collections import Counter
+
+import pandas as pd
+import pytest
+
+from respy.pre_processing.data_processing import collapse_identical_histories
+from respy.tests.random_model import simulate_truncated_data
+from respy.tests.utils import process_model_or_seed
+
+
+def _count_histories(df, weights=None):
+    """Count the histories of individuals with optional frequency weights."""
+    counter = Counter()
+    for _, history in df.groupby("Identifier"):
+        columns = history.drop(columns=weights) if weights else history
+        key = tuple(columns.reset_index(level="Period").astype(str).itertuples(False))
+        counter[key] += history[weights].iloc[0] if weights else 1
+    return counter
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("model", ["robinson_crusoe_basic", "kw_94_one"])
+def test_collapsed_histories_reproduce_the_data(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = 3
+    options["simulation_agents"] = 500
+    df = simulate_truncated_data(params, options)
+
+    collapsed = collapse_identical_histories(df)
+    identifiers = collapsed.index.get_level_values("Identifier").unique()
+
+    assert identifiers.tolist() == list(range(len(identifiers)))
+    assert _count_histories(collapsed, "Weight") == _count_histories(df)
+    assert len(_count_histories(collapsed)) == len(identifiers)
+
+
+@pytest.mark.unit
+def test_collapse_data_with_weights():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["n_periods"] = 3
+    df = simulate_truncated_data(params, options)
+    collapsed = collapse_identical_histories(df)
+
+    # Concatenate the collapsed data with itself to double the weights.
+    n_individuals = collapsed.index.get_level_values("Identifier").nunique()
+    copy = collapsed.copy()
+    copy.index = copy.index.set_levels(
+        copy.index.levels[0] + n_individuals, level="Identifier"
+    )
+    recollapsed = collapse_identical_histories(
+        pd.concat([collapsed, copy]), weights="Weight"
+    )
+
+    expected = collapsed.assign(Weight=collapsed["Weight"] * 2)
+    pd.testing.assert_frame_equal(recollapsed, expected, check_index_type=False)
+
+
+@pytest.mark.unit
+def test_collapsing_data_with_unused_weight_column_raises_error():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["n_periods"] = 3
+    collapsed = collapse_identical_histories(simulate_truncated_data(params, options))
+
+    with pytest.raises(ValueError, match="already contains a column 'Weight'"):
+        collapse_identical_histories(collapsed)
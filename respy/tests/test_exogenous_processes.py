@@ -121,3 +121,17 @@ def test_weight_continuation_values_with_inadmissible_choices(model_with_two_exo
         assert np.allclose(continuation_values[period + 5], 1.4)
         assert np.allclose(continuation_values[period + 10], 1.4)
         assert np.allclose(continuation_values[period + 15], 1.4)
+
+
+def test_invariance_of_simulated_data_to_cache_format(model_with_two_exog_proc):
+    params, options = model_with_two_exog_proc
+    options["n_periods"] = 3
+
+    simulate = get_simulate_func(params, options)
+    df = simulate(params)
+
+    options["cache_compression"] = None
+    simulate = get_simulate_func(params, options)
+    df_ = simulate(params)
+
+    pd.testing.assert_frame_equal(df, df_)
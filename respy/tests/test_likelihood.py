@@ -3,12 +3,20 @@ import numpy as np
 import pandas as pd
 import pytest
 from hypothesis import given
+from hypothesis import settings
 from hypothesis.extra.numpy import arrays
 from scipy import special
 
+from respy.conditional_draws import update_shocks_and_log_prob_wages
+from respy.draws import CounterBasedDraws
 from respy.likelihood import _logsumexp
+from respy.likelihood import _simulate_log_probabilities_of_observed_choices
+from respy.likelihood import _weighted_logsumexp
 from respy.likelihood import get_log_like_func
+from respy.pre_processing.data_processing import collapse_identical_histories
 from respy.simulate import get_simulate_func
+from respy.tests._former_code import create_draws_and_log_prob_wages
+from respy.tests.random_model import simulate_truncated_data
 from respy.tests.utils import process_model_or_seed
 
 
@@ -63,3 +71,368 @@ def test_logsumexp(array):
     result = _logsumexp(array)
 
     np.testing.assert_allclose(result, expected)
+
+
+@pytest.mark.unit
+@pytest.mark.precise
+@given(
+    arrays(
+        dtype=np.float64,
+        shape=st.integers(2, 10),
+        elements=st.floats(-1e3, 1e3),
+    ),
+    st.floats(0.01, 100),
+)
+@settings(deadline=None)
+def test_weighted_logsumexp(array, weight):
+    weights = np.full(len(array), weight)
+    weights[0] /= 2
+
+    expected = special.logsumexp(array, b=weights)
+    result = _weighted_logsumexp(array, weights)
+
+    np.testing.assert_allclose(result, expected)
+
+
+@pytest.mark.integration
+def test_likelihood_with_gauss_hermite_quadrature_is_close_to_monte_carlo():
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 10
+    df = simulate_truncated_data(params, options)
+
+    options_mc = {**options, "solution_draws": 5_000, "estimation_draws": 5_000}
+    log_like_mc = get_log_like_func(params, options_mc, df)
+
+    options_gh = {**options, "emax_integration": "gauss_hermite"}
+    log_like_gh = get_log_like_func(params, options_gh, df)
+
+    assert log_like_gh(params) == pytest.approx(log_like_mc(params), rel=0.02)
+
+
+@pytest.mark.integration
+def test_likelihood_with_smolyak_quadrature_is_close_to_monte_carlo():
+    params, options = process_model_or_seed("kw_97_basic")
+    options["n_periods"] = 4
+    options["simulation_agents"] = 200
+    df = simulate_truncated_data(params, options)
+
+    options_mc = {**options, "solution_draws": 3_000, "estimation_draws": 3_000}
+    log_like_mc = get_log_like_func(params, options_mc, df)
+
+    # The negative weights of the sparse grid would bias the smoothed choice
+    # probabilities. Thus, they are simulated with the estimation draws.
+    options_sm = {**options, "emax_integration": "smolyak", "quadrature_level": 3}
+    log_like_sm = get_log_like_func(params, options_sm, df, return_scalar=False)
+    outputs = log_like_sm(params)
+
+    assert outputs["value"] == pytest.approx(log_like_mc(params), rel=0.03)
+    choice_loglikes = outputs["comparison_plot_data"].query("kind == 'choice'")
+    assert (choice_loglikes["value"] > -50).mean() > 0.99
+
+
+def _replace_normal_with_extreme_value_shocks(params, scale):
+    params = params.drop(index="shocks_sdcorr", level="category")
+    index = pd.MultiIndex.from_tuples(
+        [("shocks_ev", "scale"), ("meas_error", "sd_fishing")],
+        names=["category", "name"],
+    )
+    return pd.concat([params, pd.DataFrame({"value": [scale, 0.1]}, index=index)])
+
+
+@pytest.mark.integration
+def test_choice_probabilities_with_extreme_value_shocks_match_simulated_shares():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    params = _replace_normal_with_extreme_value_shocks(params, 1.5)
+    options = {**options, "n_periods": 3, "simulation_agents": 20_000}
+
+    simulate = get_simulate_func(params, options)
+    df = simulate(params)
+
+    log_like = get_log_like_func(params, options, df, return_scalar=False)
+    data = log_like(params)["comparison_plot_data"]
+    data = data.query("period == 0 and kind == 'choice'")
+    probabilities = np.exp(data.groupby("choice", observed=True)["value"].first())
+    shares = df.query("Period == 0")["Choice"].value_counts(normalize=True)
+
+    assert probabilities.sum() == pytest.approx(1)
+    np.testing.assert_allclose(probabilities, shares[probabilities.index], atol=0.01)
+
+
+@pytest.mark.integration
+def test_extreme_value_shocks_require_measurement_errors_for_wages():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    params = _replace_normal_with_extreme_value_shocks(params, 1.5)
+    options = {**options, "n_periods": 3}
+    df = get_simulate_func(params, options)(params)
+
+    params = params.drop(index="meas_error", level="category")
+    with pytest.raises(ValueError, match="measurement errors"):
+        get_log_like_func(params, options, df)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("variance_reduction", ["antithetic", "control_variate"])
+def test_likelihood_with_variance_reduction_is_close_to_monte_carlo(
+    variance_reduction,
+):
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 10
+    df = simulate_truncated_data(params, options)
+
+    options_mc = {**options, "solution_draws": 5_000, "estimation_draws": 5_000}
+    log_like_mc = get_log_like_func(params, options_mc, df)
+
+    options_vr = {
+        **options,
+        "solution_draws": 100,
+        "estimation_draws": 100,
+        "variance_reduction": variance_reduction,
+    }
+    log_like_vr = get_log_like_func(params, options_vr, df)
+
+    assert log_like_vr(params) == pytest.approx(log_like_mc(params), rel=0.01)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("variance_reduction", [None, "control_variate"])
+def test_standard_errors_match_variation_of_choice_probabilities_over_seeds(
+    variance_reduction,
+):
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["estimation_draws"] = 50
+    options["estimation_tau"] = 0.1
+    options["variance_reduction"] = variance_reduction
+    options["monte_carlo_standard_errors"] = True
+    df = simulate_truncated_data(params, options)
+
+    probabilities, standard_errors = [], []
+    for seed in range(20):
+        log_like = get_log_like_func(
+            params, {**options, "estimation_seed": seed}, df, return_scalar=False
+        )
+        outputs = log_like(params)
+        data = outputs["comparison_plot_data"].query("kind == 'choice'")
+        probabilities.append(np.exp(data["value"].to_numpy()))
+        standard_errors.append(outputs["choice_probability_standard_errors"].to_numpy())
+
+    std = np.std(probabilities, axis=0)
+    ratio = np.mean(standard_errors, axis=0)[std > 0] / std[std > 0]
+
+    assert 0.8 < np.median(ratio) < 1.2
+
+
+@pytest.mark.integration
+def test_data_is_not_duplicated_for_types():
+    params, options = process_model_or_seed("kw_97_basic")
+    options["n_periods"] = 3
+    options["simulation_agents"] = 100
+    df = simulate_truncated_data(params, options)
+
+    log_like = get_log_like_func(params, options, df, return_scalar=False)
+    n_types = log_like.keywords["dense_keys"].shape[1]
+    outputs = log_like(params)
+
+    assert n_types == 4
+    assert len(log_like.keywords["df"]) == len(df)
+    assert outputs["contributions"].shape == (df.index.get_level_values(0).nunique(),)
+    assert outputs["value"] == pytest.approx(outputs["contributions"].mean())
+
+    data = outputs["comparison_plot_data"].dropna(subset=["kind"])
+    assert len(data.query("kind == 'choice'")) == n_types * len(df)
+
+
+@pytest.mark.integration
+def test_counter_based_draws_are_shared_by_types():
+    params, options = process_model_or_seed("kw_97_basic")
+    options["n_periods"] = 3
+    options["simulation_agents"] = 100
+    options["store_draws"] = False
+    df = simulate_truncated_data(params, options)
+
+    log_like = get_log_like_func(params, options, df)
+    dense_keys = log_like.keywords["dense_keys"]
+    base_draws_est = log_like.keywords["base_draws_est"]
+
+    n_choices = max(draws.shape[2] for draws in base_draws_est.values())
+    draws_of_types = []
+    for type_ in range(dense_keys.shape[1]):
+        draws = np.zeros((len(df), options["estimation_draws"], n_choices))
+        for dense_key in np.unique(dense_keys[:, type_]):
+            rows = np.flatnonzero(dense_keys[:, type_] == dense_key)
+            draws_ = np.asarray(base_draws_est[dense_key])
+            draws[rows, :, : draws_.shape[2]] = draws_
+        draws_of_types.append(draws)
+
+    for draws in draws_of_types[1:]:
+        np.testing.assert_array_equal(draws, draws_of_types[0])
+    assert np.isfinite(log_like(params))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "draws_source", ["stored", "shared", "counter", "counter_antithetic"]
+)
+def test_fused_kernel_matches_choice_probabilities_of_conditional_draws(draws_source):
+    n_obs, n_draws, n_choices, n_wages = 30, 20, 4, 2
+    delta, tau = 0.95, 0.5
+    state = np.random.RandomState(0)
+    wages = np.exp(state.normal(size=(n_obs, n_choices)))
+    nonpecs = state.normal(size=(n_obs, n_choices))
+    continuation_values = state.normal(size=(n_obs, n_choices))
+    choices = state.choice(n_choices, size=n_obs)
+    log_wages = np.where(choices < n_wages, state.normal(size=n_obs), np.nan)
+    chol = np.linalg.cholesky(np.eye(n_choices) * 0.5 + 0.5)
+    meas_sds = np.zeros(n_wages)
+
+    if draws_source == "stored":
+        base_draws = state.normal(size=(n_obs, n_draws, n_choices))
+        kernel_draws = (base_draws, 0, np.empty(0, dtype=np.int64), False)
+    elif draws_source == "shared":
+        base_draws = state.normal(size=(n_draws, n_choices))
+        kernel_draws = (base_draws[None], 0, np.empty(0, dtype=np.int64), False)
+        base_draws = np.broadcast_to(base_draws, (n_obs, n_draws, n_choices))
+    else:
+        antithetic = draws_source == "counter_antithetic"
+        base_draws = CounterBasedDraws(
+            2, np.arange(n_obs) * 3, n_draws, n_choices, antithetic
+        )
+        kernel_draws = (
+            np.empty((0, n_draws, n_choices)),
+            base_draws.seed,
+            base_draws.rows,
+            antithetic,
+        )
+
+    conditional_draws, _, _ = create_draws_and_log_prob_wages(
+        log_wages, wages, base_draws, choices, chol, n_wages, meas_sds, False
+    )
+    value_functions = (
+        wages[:, None] * conditional_draws
+        + nonpecs[:, None]
+        + delta * continuation_values[:, None]
+    ) / tau
+    probabilities = special.softmax(value_functions, axis=2)[
+        np.arange(n_obs), :, choices
+    ]
+
+    updated_means, _, updated_chols, chol_indices = update_shocks_and_log_prob_wages(
+        log_wages, wages, choices, chol, n_wages, meas_sds, False
+    )
+    (
+        log_probabilities,
+        standard_errors,
+    ) = _simulate_log_probabilities_of_observed_choices(
+        wages,
+        nonpecs,
+        continuation_values,
+        choices,
+        *kernel_draws,
+        updated_means,
+        updated_chols,
+        chol_indices,
+        np.ones(n_draws),
+        n_wages,
+        delta,
+        tau,
+        False,
+        True,
+    )
+
+    np.testing.assert_array_almost_equal(
+        np.exp(log_probabilities), probabilities.mean(axis=1)
+    )
+    np.testing.assert_array_almost_equal(
+        standard_errors, probabilities.std(axis=1) / np.sqrt(n_draws)
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["kw_94_one", "kw_97_basic"])
+def test_deduplicated_likelihood_equals_likelihood_with_shared_nodes(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = 3
+    options["emax_integration"] = "gauss_hermite"
+    df = simulate_truncated_data(params, options)
+
+    log_like = get_log_like_func(params, options, df, return_scalar=False)
+    log_like_dedup = get_log_like_func(
+        params,
+        {**options, "estimation_deduplicate_observations": True},
+        df,
+        return_scalar=False,
+    )
+
+    processed_df = log_like_dedup.keywords["df"]
+    assert processed_df["is_representative"].sum() < len(df)
+
+    outputs = log_like(params)
+    outputs_dedup = log_like_dedup(params)
+    assert outputs_dedup["value"] == pytest.approx(outputs["value"])
+    np.testing.assert_array_almost_equal(
+        outputs_dedup["contributions"], outputs["contributions"]
+    )
+
+
+@pytest.mark.integration
+def test_draws_are_created_once_per_cell_of_identical_observations():
+    params, options = process_model_or_seed("kw_97_basic")
+    options["n_periods"] = 3
+    options["estimation_deduplicate_observations"] = True
+    df = simulate_truncated_data(params, options)
+
+    log_like = get_log_like_func(params, options, df)
+    processed_df = log_like.keywords["df"]
+    n_types = log_like.keywords["dense_keys"].shape[1]
+    n_rows_of_draws = sum(
+        len(draws) for draws in log_like.keywords["base_draws_est"].values()
+    )
+
+    assert n_rows_of_draws == n_types * processed_df["is_representative"].sum()
+    assert processed_df.loc[processed_df["log_wage"].notna(), "is_representative"].all()
+    assert np.isfinite(log_like(params))
+
+
+@pytest.mark.integration
+def test_weighted_likelihood_of_collapsed_data_equals_likelihood_of_data():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["n_periods"] = 3
+    options["emax_integration"] = "gauss_hermite"
+    df = simulate_truncated_data(params, options)
+    collapsed = collapse_identical_histories(df)
+
+    outputs = get_log_like_func(params, options, df, return_scalar=False)(params)
+    outputs_collapsed = get_log_like_func(
+        params, options, collapsed, return_scalar=False, weights="Weight"
+    )(params)
+
+    contribs = outputs_collapsed["contributions"]
+    weights = outputs_collapsed["weights"]
+    n_individuals = collapsed.index.get_level_values("Identifier").nunique()
+    assert contribs.shape == weights.shape == (n_individuals,)
+    assert n_individuals < outputs["contributions"].shape[0]
+    np.testing.assert_array_equal(
+        weights, collapsed.groupby("Identifier")["Weight"].first()
+    )
+
+    # The contributions are unweighted and repeating them with the weights yields the
+    # contributions of the uncollapsed data.
+    np.testing.assert_allclose(
+        np.sort(np.repeat(contribs, weights.astype(int))),
+        np.sort(outputs["contributions"]),
+    )
+    assert outputs_collapsed["value"] == pytest.approx(outputs["value"])
+    assert outputs_collapsed["value"] == pytest.approx(
+        np.average(contribs, weights=weights)
+    )
+    assert weights @ contribs == pytest.approx(outputs["contributions"].sum())
+
+
+@pytest.mark.unit
+def test_weights_must_be_constant_within_individuals():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["n_periods"] = 3
+    df = simulate_truncated_data(params, options)
+    df["Weight"] = np.arange(len(df))
+
+    with pytest.raises(ValueError, match="constant within individuals"):
+        get_log_like_func(params, options, df, weights="Weight")
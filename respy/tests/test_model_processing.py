@@ -1,5 +1,6 @@
 """Test model generation."""
 import io
+import itertools
 import textwrap
 
 import numpy as np
@@ -16,6 +17,7 @@ from respy.pre_processing.model_processing import _parse_initial_and_max_experie
 from respy.pre_processing.model_processing import _parse_measurement_errors
 from respy.pre_processing.model_processing import _parse_observables
 from respy.pre_processing.model_processing import _parse_shocks
+from respy.pre_processing.model_processing import ParameterPlan
 from respy.pre_processing.model_processing import process_params_and_options
 from respy.tests.random_model import generate_random_model
 from respy.tests.random_model import simulate_truncated_data
@@ -259,3 +261,69 @@ def test_add_default_is_inadmissible(optim_paras, expected):
     options = {"negative_choice_set": {}}
     result = _add_default_is_inadmissible(options, optim_paras)
     assert result == expected
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model_or_seed", EXAMPLE_MODELS)
+def test_parameter_plan_is_equal_to_processing_params_and_options(model_or_seed):
+    params, options = process_model_or_seed(model_or_seed)
+    _, options = process_params_and_options(params, options)
+
+    plan = ParameterPlan(params, options)
+
+    params_ = params.copy()
+    is_numeric = np.ones(len(params), dtype=bool)
+    is_numeric[plan.structural_positions] = False
+    params_.loc[is_numeric, "value"] *= 0.99
+
+    _assert_equal_nested_objects(
+        plan(params_), process_params_and_options(params_, options), path=()
+    )
+
+    # Changes to the structure of the parameters are detected.
+    values = params_["value"]
+    assert plan._get_values_with_same_structure(values) is not None
+    assert plan._get_values_with_same_structure(values.iloc[::-1]) is None
+    if len(plan.structural_positions):
+        values = values.copy()
+        values.iloc[plan.structural_positions[0]] += 1
+        assert plan._get_values_with_same_structure(values) is None
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("scale", [0, -1, np.nan])
+def test_scale_of_extreme_value_shocks_must_be_positive(scale):
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    params = params.drop(index="shocks_sdcorr", level="category")
+    index = pd.MultiIndex.from_tuples(
+        [("shocks_ev", "scale")], names=["category", "name"]
+    )
+    params = pd.concat([params, pd.DataFrame({"value": [1.5]}, index=index)])
+    plan = ParameterPlan(params, options)
+
+    params.loc[("shocks_ev", "scale"), "value"] = scale
+    assert plan._get_values_with_same_structure(params["value"]) is not None
+    with pytest.raises(ValueError, match="must be positive"):
+        plan(params)
+    with pytest.raises(ValueError, match="must be positive"):
+        process_params_and_options(params, options)
+
+
+def _assert_equal_nested_objects(x, y, path):
+    assert type(x) is type(y), path
+    if isinstance(x, dict):
+        assert list(x) == list(y), path
+        for key in x:
+            _assert_equal_nested_objects(x[key], y[key], path + (key,))
+    elif isinstance(x, (list, tuple)):
+        assert len(x) == len(y), path
+        for i, (x_, y_) in enumerate(zip(x, y)):
+            _assert_equal_nested_objects(x_, y_, path + (i,))
+    elif isinstance(x, pd.Series):
+        pd.testing.assert_series_equal(x, y, check_exact=True)
+    elif isinstance(x, np.ndarray):
+        np.testing.assert_array_equal(x, y)
+    elif isinstance(x, itertools.count):
+        assert next(x) == next(y), path
+    else:
+        assert x == y, path
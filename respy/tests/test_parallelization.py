@@ -1,10 +1,19 @@
+import threading
+
 import numba as nb
+import numpy as np
 import pytest
 from numba.typed import Dict
 
 from respy.parallelization import _infer_dense_keys_from_arguments
 from respy.parallelization import _is_dense_dictionary_argument
 from respy.parallelization import _is_dictionary_with_integer_keys
+from respy.parallelization import get_active_backend
+from respy.parallelization import parallel_backend
+from respy.parallelization import parallelize_across_dense_dimensions
+from respy.solve import get_solve_func
+from respy.tests.utils import apply_to_attributes_of_two_state_spaces
+from respy.tests.utils import process_model_or_seed
 
 
 def _typeddict_wo_integer_keys():
@@ -58,3 +67,79 @@ def test_infer_dense_keys_from_arguments(args, kwargs, expected):
 def test_is_dense_dictionary_argument(arg, dense_keys, expected):
     result = _is_dense_dictionary_argument(arg, dense_keys)
     assert result is expected
+
+
+@parallelize_across_dense_dimensions
+def _multiply_and_count(x, factor, offset):
+    return x * factor + offset, len(x)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("backend", ["serial", "threads", "processes"])
+def test_parallel_backends_return_the_same_results(backend):
+    x = {i: np.arange(i + 1) for i in range(5)}
+
+    with parallel_backend(backend, n_jobs=2):
+        assert get_active_backend() == (backend, 1 if backend == "serial" else 2)
+        result, length = _multiply_and_count(x, 2, bypass={"offset": 1})
+
+    assert get_active_backend() == ("serial", 1)
+    for key in x:
+        np.testing.assert_array_equal(result[key], x[key] * 2 + 1)
+        assert length[key] == key + 1
+
+
+@pytest.mark.unit
+def test_parallel_backend_is_local_to_threads():
+    barrier = threading.Barrier(2)
+    observed = {}
+
+    def use_backend(backend, n_jobs):
+        with parallel_backend(backend, n_jobs=n_jobs):
+            barrier.wait()
+            # The other thread has entered its backend, but not yet exited it.
+            observed[backend, "inside"] = get_active_backend()
+            barrier.wait()
+        observed[backend, "after"] = get_active_backend()
+
+    threads = [
+        threading.Thread(target=use_backend, args=args)
+        for args in [("threads", 2), ("processes", 3)]
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert observed["threads", "inside"] == ("threads", 2)
+    assert observed["processes", "inside"] == ("processes", 3)
+    assert observed["threads", "after"] == ("serial", 1)
+    assert observed["processes", "after"] == ("serial", 1)
+    assert get_active_backend() == ("serial", 1)
+
+
+@pytest.mark.unit
+def test_unknown_parallel_backend_raises_error():
+    with pytest.raises(ValueError, match="unknown"):
+        with parallel_backend("gpu"):
+            pass
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("backend", ["threads", "processes"])
+def test_solution_is_invariant_to_parallel_backend(backend):
+    params, options = process_model_or_seed("kw_97_extended")
+    options["n_periods"] = 4
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+
+    options = {**options, "parallel_backend": backend, "n_jobs": 2}
+    solve_parallel = get_solve_func(params, options)
+    state_space_parallel = solve_parallel(params)
+
+    apply_to_attributes_of_two_state_spaces(
+        state_space.expected_value_functions,
+        state_space_parallel.expected_value_functions,
+        np.testing.assert_array_equal,
+    )
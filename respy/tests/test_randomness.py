@@ -1,7 +1,11 @@
 """This module includes test to specifically test that randomness is held constant."""
 import numpy as np
+import pandas as pd
 import pytest
+from scipy import special
 
+from respy.draws import _inverse_standard_normal_cdf
+from respy.draws import create_scrambled_quasi_random_draws
 from respy.likelihood import get_log_like_func
 from respy.simulate import get_simulate_func
 from respy.solve import get_solve_func
@@ -51,3 +55,89 @@ def test_invariance_of_model_solution_in_solve_and_criterion_functions(model):
             state_space_.base_draws_sol,
             np.testing.assert_array_equal,
         )
+
+
+@pytest.mark.end_to_end
+@pytest.mark.parametrize("model", ["kw_94_one", "robinson_crusoe_extended"])
+def test_counter_based_draws_are_reproducible(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = 5
+    options["simulation_agents"] = 200
+    options["store_draws"] = False
+
+    simulate = get_simulate_func(params, options)
+    df = simulate(params)
+    df_ = get_simulate_func(params, options)(params)
+    pd.testing.assert_frame_equal(df, df_)
+
+    log_like = get_log_like_func(params, options, df)
+    log_like_ = get_log_like_func(params, options, df)
+    value = log_like(params)
+
+    assert np.isfinite(value)
+    assert value == log_like_(params)
+
+
+@pytest.mark.end_to_end
+def test_likelihood_with_counter_based_draws_is_close_to_stored_draws():
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 5
+    options["simulation_agents"] = 200
+    df = get_simulate_func(params, options)(params)
+
+    values = []
+    for store_draws in [True, False]:
+        options["store_draws"] = store_draws
+        values.append(get_log_like_func(params, options, df)(params))
+
+    # The draws come from different generators, but the estimates must be similar.
+    assert values[0] != values[1]
+    assert values[0] == pytest.approx(values[1], rel=0.01)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("sequence", ["scrambled_sobol", "scrambled_halton"])
+def test_scrambled_sequences_are_stratified_and_depend_on_seed(sequence):
+    if sequence == "scrambled_sobol":
+        n_points, all_n_strata = 2**10, [2**10] * 4
+    else:
+        n_points, all_n_strata = 2**3 * 3**2 * 5 * 7, [2**3, 3**2, 5, 7]
+    draws = create_scrambled_quasi_random_draws((n_points, 4), 7, sequence)
+    uniforms = special.ndtr(draws)
+
+    # Every one-dimensional projection puts the same number of points in each stratum.
+    for dim, n_strata in enumerate(all_n_strata):
+        strata = np.floor(uniforms[:, dim] * n_strata)
+        counts = np.bincount(strata.astype(int), minlength=n_strata)
+        assert counts.min() == counts.max()
+
+    np.testing.assert_array_equal(
+        draws, create_scrambled_quasi_random_draws((n_points, 4), 7, sequence)
+    )
+    assert not np.allclose(
+        draws, create_scrambled_quasi_random_draws((n_points, 4), 8, sequence)
+    )
+
+
+@pytest.mark.unit
+def test_inverse_standard_normal_cdf_is_equal_to_scipy():
+    p = np.concatenate(
+        [np.logspace(-300, -1, 1_000), np.linspace(0.01, 0.99, 1_000), [1 - 1e-12]]
+    )
+    np.testing.assert_allclose(_inverse_standard_normal_cdf(p), special.ndtri(p))
+
+
+@pytest.mark.end_to_end
+@pytest.mark.parametrize("sequence", ["scrambled_sobol", "scrambled_halton"])
+def test_likelihood_with_scrambled_sequences_is_reproducible(sequence):
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 5
+    options["simulation_agents"] = 200
+    df = get_simulate_func(params, options)(params)
+
+    options["monte_carlo_sequence"] = sequence
+    log_like = get_log_like_func(params, options, df)
+    value = log_like(params)
+
+    assert np.isfinite(value)
+    assert value == get_log_like_func(params, options, df)(params)
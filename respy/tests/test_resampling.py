@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+import respy as rp
+from respy.likelihood import get_log_like_func
+from respy.pre_processing.data_processing import collapse_identical_histories
+from respy.resampling import create_bootstrap_weights
+from respy.resampling import create_jackknife_weights
+from respy.resampling import get_replicate_log_like_func
+from respy.tests.random_model import simulate_truncated_data
+from respy.tests.utils import process_model_or_seed
+
+
+def _resample_individuals(df, counts):
+    """Repeat every individual as often as its count and renumber the identifiers."""
+    identifiers = np.sort(df.index.get_level_values("Identifier").unique())
+    resampled = [
+        df.loc[[identifier]].rename(
+            index={identifier: new_identifier}, level="Identifier"
+        )
+        for new_identifier, identifier in enumerate(np.repeat(identifiers, counts))
+    ]
+    return pd.concat(resampled)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["robinson_crusoe_basic", "kw_94_one"])
+def test_bootstrap_replicates_equal_likelihood_of_resampled_data(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = 3
+    options["simulation_agents"] = 50
+    options["emax_integration"] = "gauss_hermite"
+    df = simulate_truncated_data(params, options)
+
+    n_individuals = df.index.get_level_values("Identifier").nunique()
+    replicate_weights = create_bootstrap_weights(3, n_individuals, seed=0)
+    values = get_replicate_log_like_func(params, options, df, replicate_weights)(params)
+
+    for counts, value in zip(replicate_weights, values):
+        resampled = _resample_individuals(df, counts)
+        expected = get_log_like_func(params, options, resampled)(params)
+        assert value == pytest.approx(expected)
+
+
+@pytest.mark.integration
+def test_jackknife_replicates_of_collapsed_data_equal_leave_one_out_likelihood():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["n_periods"] = 3
+    options["emax_integration"] = "gauss_hermite"
+    df = simulate_truncated_data(params, options)
+    collapsed = collapse_identical_histories(df)
+    weights = collapsed.groupby("Identifier")["Weight"].first().to_numpy()
+
+    replicate_weights = create_jackknife_weights(weights)
+    values = get_replicate_log_like_func(params, options, collapsed, replicate_weights)(
+        params
+    )
+
+    original_identifiers = np.sort(df.index.get_level_values("Identifier").unique())
+    for i in [0, len(weights) - 1]:
+        counts = np.ones(len(original_identifiers), dtype=int)
+        history = collapsed.loc[i].drop(columns="Weight")
+        for position, identifier in enumerate(original_identifiers):
+            if df.loc[identifier].equals(history):
+                counts[position] = 0
+                break
+        assert counts.sum() == len(original_identifiers) - 1
+
+        expected = get_log_like_func(
+            params, options, _resample_individuals(df, counts)
+        )(params)
+        assert values[i] == pytest.approx(expected)
+
+
+@pytest.mark.integration
+def test_sparse_replicate_weights_equal_dense_replicate_weights():
+    params, options, df = rp.get_example_model("robinson_crusoe_basic")
+    n_individuals = df.index.get_level_values("Identifier").nunique()
+    replicate_weights = create_jackknife_weights(n_individuals)
+
+    values = get_replicate_log_like_func(params, options, df, replicate_weights)(params)
+    values_sparse = get_replicate_log_like_func(
+        params, options, df, sparse.csr_matrix(replicate_weights)
+    )(params)
+
+    contribs = get_log_like_func(params, options, df, return_scalar=False)(params)[
+        "contributions"
+    ]
+    expected = (contribs.sum() - contribs) / (n_individuals - 1)
+
+    np.testing.assert_allclose(values, expected)
+    np.testing.assert_allclose(values_sparse, expected)
+
+
+@pytest.mark.unit
+def test_bootstrap_weights_of_collapsed_data_draw_individuals_proportional_to_weights():
+    weights = np.array([5, 1, 4])
+
+    replicate_weights = create_bootstrap_weights(10_000, weights, seed=0)
+
+    assert replicate_weights.shape == (10_000, 3)
+    assert (replicate_weights.sum(axis=1) == weights.sum()).all()
+    np.testing.assert_allclose(replicate_weights.mean(axis=0), weights, rtol=0.05)
+
+
+@pytest.mark.unit
+def test_replicate_weights_must_match_the_number_of_individuals():
+    params, options, df = rp.get_example_model("robinson_crusoe_basic")
+
+    with pytest.raises(ValueError, match="must have shape"):
+        get_replicate_log_like_func(params, options, df, np.ones((2, 3)))
@@ -1,4 +1,8 @@
+import pickle
+import shutil
+
 import numpy as np
+import pandas as pd
 import pytest
 
 from respy.config import CHAOSPY_INSTALLED
@@ -6,18 +10,33 @@ from respy.config import EXAMPLE_MODELS
 from respy.config import INDEXER_INVALID_INDEX
 from respy.config import KEANE_WOLPIN_1994_MODELS
 from respy.config import KEANE_WOLPIN_1997_MODELS
+from respy.likelihood import get_log_like_func
 from respy.pre_processing.model_checking import check_model_solution
 from respy.pre_processing.model_processing import process_params_and_options
+from respy.quadrature import create_integration_nodes_and_weights
+from respy.shared import calculate_closed_form_expected_value_functions_of_period
+from respy.shared import calculate_expected_value_functions
 from respy.shared import create_core_state_space_columns
+from respy.shared import transform_base_draws_to_extreme_value_shocks
+from respy.shared import transform_base_draws_with_cholesky_factor
+from respy.solve import _create_choice_rewards
+from respy.solve import compute_fingerprint_of_model_structure
 from respy.solve import get_solve_func
 from respy.state_space import _create_core_period_choice
 from respy.state_space import _create_core_state_space
 from respy.state_space import _create_indexer
+from respy.state_space import DenseKeyArrays
+from respy.state_space import StateIndexer
+from respy.state_space import StateStore
+from respy.state_space import PARAMETER_DEPENDENT_ATTRIBUTES
 from respy.state_space import create_state_space_class
+from respy.state_space import export_state_space
+from respy.tests._former_code import _create_core_state_space_with_pandas
 from respy.tests._former_code import _create_state_space_kw94
 from respy.tests._former_code import _create_state_space_kw97_base
 from respy.tests._former_code import _create_state_space_kw97_extended
 from respy.tests.random_model import generate_random_model
+from respy.tests.random_model import simulate_truncated_data
 from respy.tests.utils import apply_to_attributes_of_two_state_spaces
 from respy.tests.utils import process_model_or_seed
 
@@ -432,3 +451,482 @@ def test_wage_nonpecs():
             getattr(state_space_, attribute),
             np.testing.assert_array_almost_equal,
         )
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["robinson_crusoe_extended", "kw_2000", 0])
+@pytest.mark.parametrize("cache_compression", [None, "snappy"])
+def test_invariance_of_solution_to_spilled_states(model, cache_compression):
+    """States spilled to the cache directory produce the same solution."""
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = min(options["n_periods"], 4)
+    options["cache_compression"] = cache_compression
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+    assert all(
+        map(state_space.state_store.is_in_memory, state_space.dense_period_cores)
+    )
+
+    options["cache_memory_limit"] = 0
+    solve = get_solve_func(params, options)
+    state_space_ = solve(params)
+    state_store = state_space_.state_store
+    assert state_store.n_bytes == 0
+    assert not any(
+        state_store.is_in_memory(complex_)
+        for complex_ in state_space_.dense_period_cores
+        if state_store.get_mixed_columns(complex_)
+    )
+
+    for attribute in ["wages", "nonpecs", "expected_value_functions"]:
+        apply_to_attributes_of_two_state_spaces(
+            getattr(state_space, attribute),
+            getattr(state_space_, attribute),
+            np.testing.assert_array_equal,
+        )
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["robinson_crusoe_with_observed_characteristics", 0])
+def test_dense_key_arrays_are_sliced_by_period(model):
+    """Values of a period are contiguous and views of the dictionary values."""
+    params, options = process_model_or_seed(model)
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+
+    for attribute in ["wages", "nonpecs", "expected_value_functions"]:
+        container = getattr(state_space, attribute)
+        assert isinstance(container, DenseKeyArrays)
+
+        for period in range(options["n_periods"]):
+            dense_keys = np.sort(state_space.get_dense_keys_from_period(period))
+            expected = np.concatenate([container[key].ravel() for key in dense_keys])
+            np.testing.assert_array_equal(container.get_period(period), expected)
+
+            n_states = sum(container[key].shape[0] for key in dense_keys)
+            assert (
+                container.period_row_stops[period] - container.period_row_starts[period]
+                == n_states
+            )
+
+        container.get_period(0)[:] = -1
+        assert all((container[key] == -1).all() for key in container.dense_keys[:1])
+
+        copied = pickle.loads(pickle.dumps(container))
+        apply_to_attributes_of_two_state_spaces(
+            container, copied, np.testing.assert_array_equal
+        )
+        np.testing.assert_array_equal(copied.data, container.data)
+
+
+@pytest.mark.integration
+def test_full_solution_of_period_matches_solution_per_dense_key():
+    """The fused kernel reproduces the solution computed for each dense key."""
+    point_constr = {"n_periods": 4, "observables": [2], "n_lagged_choices": 1}
+    params, options = generate_random_model(point_constr=point_constr)
+    options["negative_choice_set"] = {"a": ["period == 2"]}
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+    optim_paras, _ = process_params_and_options(params, options)
+
+    draws = transform_base_draws_with_cholesky_factor(
+        state_space.base_draws_sol,
+        state_space.dense_key_to_choice_set,
+        optim_paras["shocks_cholesky"],
+        optim_paras,
+    )
+    for period in range(options["n_periods"]):
+        continuation_values = state_space.get_continuation_values(period)
+        for key in state_space.get_dense_keys_from_period(period):
+            expected = calculate_expected_value_functions(
+                state_space.wages[key],
+                state_space.nonpecs[key],
+                continuation_values[key],
+                draws[key],
+                np.ones(len(draws[key])),
+                np.empty(0),
+                optim_paras["delta"],
+            )
+            np.testing.assert_allclose(
+                state_space.expected_value_functions[key], expected, rtol=1e-12
+            )
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["robinson_crusoe_extended", "kw_94_one", 0])
+def test_continuation_values_are_gathered_from_child_states(model):
+    """Continuation values are the expected value functions of the child states."""
+    params, options = process_model_or_seed(model)
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+
+    for period in range(options["n_periods"] - 1):
+        continuation_values = state_space.get_continuation_values(period)
+
+        for dense_key in state_space.get_dense_keys_from_period(period):
+            complex_ = state_space.dense_key_to_complex[dense_key]
+            dense_index = complex_[2] if len(complex_) == 3 else 0
+            child_indices = state_space.child_indices[dense_key]
+
+            expected = np.zeros(child_indices.shape[:2])
+            for i, j in np.ndindex(*expected.shape):
+                core_key, core_index = child_indices[i, j]
+                child_dense_key = state_space.core_key_and_dense_index_to_dense_key[
+                    (core_key, dense_index)
+                ]
+                expected[i, j] = state_space.expected_value_functions[child_dense_key][
+                    core_index
+                ]
+
+            np.testing.assert_array_equal(continuation_values[dense_key], expected)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["robinson_crusoe_extended", "kw_94_one"])
+def test_solution_cache_restores_solutions(model):
+    """Solutions restored from the cache equal solutions from backward induction."""
+    params, options = process_model_or_seed(model)
+    attributes = ["wages", "nonpecs", "expected_value_functions"]
+
+    solve = get_solve_func(params, options)
+    expected = {attr: getattr(solve(params), attr).data.copy() for attr in attributes}
+    params_ = params.copy()
+    params_.loc["delta", "value"] = 0.5
+    expected_ = {attr: getattr(solve(params_), attr).data.copy() for attr in attributes}
+
+    options["solution_cache_memory_limit"] = 1_000_000_000
+    solve = get_solve_func(params, options)
+    solution_cache = solve.keywords["solution_cache"]
+
+    for p, solution, hits in [
+        (params, expected, 0),
+        (params_, expected_, 0),
+        (params, expected, 1),
+        (params_, expected_, 2),
+    ]:
+        state_space = solve(p.copy())
+        for attr in attributes:
+            np.testing.assert_array_equal(
+                getattr(state_space, attr).data, solution[attr]
+            )
+        assert solution_cache.hits == hits
+
+    assert solution_cache.misses == 2
+    assert len(solution_cache) == 2
+
+    # Only the most recently used solution fits into the cache.
+    solution_cache.memory_limit = solution_cache.n_bytes // 2
+    solve(params.assign(value=params["value"] * 1.01))
+    assert len(solution_cache) == 1
+    assert solution_cache.n_bytes <= solution_cache.memory_limit
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["kw_97_extended", "robinson_crusoe_extended", 0])
+def test_rewards_from_design_matrix_are_equal_to_rewards_per_dense_key(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = min(options["n_periods"], 4)
+
+    solve = get_solve_func(params, options)
+    state_space = solve(params)
+    optim_paras, _ = process_params_and_options(params, options)
+
+    for dense_key, complex_ in state_space.dense_key_to_complex.items():
+        wages, nonpecs = _create_choice_rewards(
+            state_space.state_store[complex_],
+            state_space.dense_key_to_choice_set[dense_key],
+            optim_paras,
+        )
+        np.testing.assert_allclose(state_space.wages[dense_key], wages, rtol=1e-12)
+        np.testing.assert_allclose(
+            state_space.nonpecs[dense_key], nonpecs, rtol=1e-12, atol=1e-10
+        )
+
+
+@pytest.mark.unit
+def test_state_store_factorizes_states_into_core_constant_and_mixed_columns():
+    core = pd.DataFrame({"period": [0, 1, 1, 2], "exp_a": [0, 0, 1, 2]})
+    states = core.loc[[1, 3]].assign(
+        type=2, exp_a_x_type=lambda x: x.exp_a * 2, is_two=lambda x: x.type == 2
+    )
+    options = {"cache_memory_limit": 1_000_000_000}
+
+    state_store = StateStore(core, options)
+    state_store[(1, (True,), 0)] = states
+
+    assert state_store.get_core_columns((1, (True,), 0)) == {"period", "exp_a"}
+    assert state_store.get_constants((1, (True,), 0)) == {"type": 2, "is_two": 1}
+    assert state_store.get_mixed_columns((1, (True,), 0)) == ["exp_a_x_type"]
+    assert state_store.n_bytes == 16
+
+    np.testing.assert_array_equal(state_store.get_array((1, (True,), 0)), states)
+    np.testing.assert_array_equal(
+        state_store.get_array((1, (True,), 0), ["exp_a_x_type", "period"]),
+        states[["exp_a_x_type", "period"]],
+    )
+    pd.testing.assert_frame_equal(
+        state_store[(1, (True,), 0)],
+        states.astype(float).reset_index(drop=True),
+    )
+
+
+@pytest.mark.integration
+@pytest.mark.precise
+@pytest.mark.parametrize("model", ["kw_94_one", "kw_97_extended", "kw_2000", 0, 1])
+def test_compiled_core_state_space_is_equal_to_former_implementation(model):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = min(options["n_periods"], 10)
+    optim_paras, options = process_params_and_options(params, options)
+
+    core = _create_core_state_space(optim_paras, options)
+    expected = _create_core_state_space_with_pandas(optim_paras, options)
+
+    pd.testing.assert_frame_equal(core, expected)
+
+    core_period_choice = _create_core_period_choice(core, optim_paras, options)
+    core_key_to_core_indices = dict(enumerate(core_period_choice.values()))
+    indexer = _create_indexer(core, core_key_to_core_indices, optim_paras)
+
+    core_columns = ["period"] + create_core_state_space_columns(optim_paras)
+    assert len(indexer) == len(core)
+    for core_key, indices in core_key_to_core_indices.items():
+        for core_index, state in enumerate(core.loc[indices, core_columns].to_numpy()):
+            assert indexer[tuple(state)] == (core_key, core_index)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("upper", [10, 1_000_000])
+def test_state_indexer_behaves_like_a_dictionary(upper):
+    states = np.array([[0, 2, upper], [3, 1, 0], [1, 2, 5], [0, 0, 0]])
+    values = np.array([[5, 0], [5, 1], [7, 0], [8, 0]])
+    expected = {tuple(s): tuple(v) for s, v in zip(states.tolist(), values.tolist())}
+
+    indexer = StateIndexer(states, values)
+
+    assert dict(indexer) == expected
+    assert (3, 1, 0) in indexer
+    assert (3, 1, 1) not in indexer
+    assert (4, 1, 0) not in indexer
+    assert indexer[np.int64(1), 2, 5] == (7, 0)
+    with pytest.raises(KeyError):
+        indexer[(0, 0, -1)]
+
+    np.testing.assert_array_equal(indexer.get_values(states[::-1]), values[::-1])
+    np.testing.assert_array_equal(
+        indexer.get_positions([[1, 2, 5], [0, 1, 0], [9, 9, 9]]), [2, -1, -1]
+    )
+    with pytest.raises(KeyError, match=r"\(0, 1, 0\)"):
+        indexer.get_values([[1, 2, 5], [0, 1, 0]])
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("model", ["kw_97_extended", "kw_94_one"])
+def test_attached_state_space_gives_the_same_likelihood(model, tmp_path):
+    params, options = process_model_or_seed(model)
+    options["n_periods"] = 10
+    df = simulate_truncated_data(params, options)
+
+    log_like = get_log_like_func(params, options, df)
+    state_space = log_like.keywords["solve"].keywords["state_space"]
+    export_state_space(state_space, tmp_path)
+
+    options = {**options, "state_space_path": tmp_path}
+    log_like_attached = get_log_like_func(params, options, df)
+    attached = log_like_attached.keywords["solve"].keywords["state_space"]
+
+    assert log_like_attached(params) == log_like(params)
+    assert not attached.child_positions.data.flags.writeable
+    assert not attached.base_draws_sol[0].flags.writeable
+    for attribute in PARAMETER_DEPENDENT_ATTRIBUTES:
+        assert getattr(attached, attribute).data.flags.writeable
+
+
+@pytest.mark.unit
+def test_fingerprint_of_model_structure_ignores_values_of_parameters():
+    params, options = process_model_or_seed("kw_97_extended")
+    optim_paras, options_ = process_params_and_options(params, options)
+    fingerprint = compute_fingerprint_of_model_structure(optim_paras, options_)
+
+    is_reward = params.index.get_level_values("category").str.match("wage|nonpec")
+    params_ = params.copy()
+    params_.loc[is_reward, "value"] += 0.1
+    optim_paras, options_ = process_params_and_options(params_, options)
+    assert compute_fingerprint_of_model_structure(optim_paras, options_) == fingerprint
+
+    optim_paras, options_ = process_params_and_options(
+        params, {**options, "n_periods": options["n_periods"] - 1}
+    )
+    assert compute_fingerprint_of_model_structure(optim_paras, options_) != fingerprint
+
+
+@pytest.mark.integration
+def test_state_space_is_loaded_from_state_space_cache(tmp_path, monkeypatch):
+    params, options = process_model_or_seed("kw_2000")
+    options = {
+        **options,
+        "n_periods": 4,
+        "cache_memory_limit": 0,
+        "cache_path": tmp_path / "cache",
+        "state_space_cache": tmp_path / "state_spaces",
+    }
+
+    solve = get_solve_func(params, options)
+    expected = solve(params).expected_value_functions.data.copy()
+    (path,) = (tmp_path / "state_spaces").iterdir()
+    assert (path / "cache").exists()
+
+    def _raise_error(*args, **kwargs):  # noqa: U100
+        raise AssertionError("The state space should be loaded from the cache.")
+
+    monkeypatch.setattr("respy.solve.create_state_space_class", _raise_error)
+    shutil.rmtree(tmp_path / "cache")
+
+    solve = get_solve_func(params, options)
+    np.testing.assert_array_equal(solve(params).expected_value_functions.data, expected)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("rule", ["gauss_hermite", "smolyak"])
+@pytest.mark.parametrize("n_dims", [1, 3, 4])
+def test_quadrature_rules_integrate_moments_of_standard_normal(rule, n_dims):
+    options = {"emax_integration": rule, "quadrature_level": 3}
+    nodes, weights = create_integration_nodes_and_weights(n_dims, options)
+
+    assert weights.sum() == pytest.approx(1)
+    np.testing.assert_allclose(weights @ nodes, 0, atol=1e-12)
+    np.testing.assert_allclose(
+        weights @ (nodes[:, :, None] * nodes[:, None, :]).reshape(len(nodes), -1),
+        np.eye(n_dims).ravel(),
+        atol=1e-12,
+    )
+    np.testing.assert_allclose(weights @ nodes**4, 3)
+
+
+@pytest.mark.integration
+@pytest.mark.parametrize("rule, rel", [("gauss_hermite", 0.02), ("smolyak", 0.1)])
+def test_solution_with_quadrature_is_close_to_monte_carlo(rule, rel):
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 10
+
+    solve = get_solve_func(params, {**options, "solution_draws": 10_000})
+    expected = solve(params).expected_value_functions.data.copy()
+
+    options = {**options, "emax_integration": rule, "quadrature_level": 5}
+    solve = get_solve_func(params, options)
+    result = solve(params).expected_value_functions.data
+
+    np.testing.assert_allclose(result, expected, rtol=rel)
+
+
+@pytest.mark.unit
+def test_closed_form_expected_value_functions_equal_monte_carlo_integration():
+    n_states, n_choices, scale, delta = 5, 3, 2.0, 0.95
+    rng = np.random.RandomState(0)
+    wages = np.ones((n_states, n_choices))
+    nonpecs = rng.normal(size=(n_states, n_choices)) + 30
+    continuation_values = rng.normal(size=(n_states, n_choices))
+
+    result = calculate_closed_form_expected_value_functions_of_period(
+        wages.ravel(),
+        nonpecs.ravel(),
+        continuation_values.ravel(),
+        np.array([n_choices]),
+        np.array([0]),
+        np.array([0, n_states]),
+        np.array([0, n_states * n_choices]),
+        scale,
+        delta,
+    )
+
+    draws = transform_base_draws_to_extreme_value_shocks(
+        rng.standard_normal((1_000_000, n_choices)), scale
+    )
+    expected = calculate_expected_value_functions(
+        wages,
+        nonpecs,
+        continuation_values,
+        draws,
+        np.ones(len(draws)),
+        np.empty(0),
+        delta,
+    )
+
+    np.testing.assert_allclose(result, expected, atol=0.02)
+
+
+@pytest.mark.unit
+def test_control_variate_reduces_variance_of_expected_value_functions():
+    n_choices, delta = 3, 0.95
+    rng = np.random.RandomState(0)
+    wages = np.array([10.0, 8.0, 1.0])
+    nonpecs = np.array([0.0, 1.0, 9.0])
+    continuation_values = rng.normal(size=n_choices) + 20
+    cholesky = np.diag([0.3, 0.4, 2.0])
+    expected_draws = np.array([np.exp(0.3**2 / 2), np.exp(0.4**2 / 2), 0])
+
+    results = []
+    for expected_draws_ in [np.empty(0), expected_draws]:
+        draws = rng.standard_normal((2_000, 50, n_choices)) @ cholesky.T
+        draws[:, :, :2] = np.exp(draws[:, :, :2])
+        results.append(
+            calculate_expected_value_functions(
+                wages,
+                nonpecs,
+                continuation_values,
+                draws,
+                np.ones(50),
+                expected_draws_,
+                delta,
+            )
+        )
+    plain, controlled = results
+
+    assert controlled.mean() == pytest.approx(plain.mean(), rel=1e-3)
+    assert controlled.std() < 0.8 * plain.std()
+
+
+@pytest.mark.integration
+def test_standard_errors_match_variation_of_expected_value_functions_over_seeds():
+    params, options = process_model_or_seed("robinson_crusoe_extended")
+    options["solution_draws"] = 50
+    options["monte_carlo_standard_errors"] = True
+
+    # Only the last period has no Monte Carlo error in the continuation values.
+    last_period = options["n_periods"] - 1
+    expected_value_functions, standard_errors = [], []
+    for seed in range(30):
+        state_space = get_solve_func(params, {**options, "solution_seed": seed})(params)
+        expected_value_functions.append(
+            state_space.expected_value_functions.get_period(last_period).copy()
+        )
+        standard_errors.append(
+            state_space.expected_value_functions_standard_errors.get_period(
+                last_period
+            ).copy()
+        )
+
+    ratio = np.mean(standard_errors, axis=0) / np.std(expected_value_functions, axis=0)
+
+    assert 0.7 < np.median(ratio) < 1.3
+    assert not np.isnan(state_space.expected_value_functions_standard_errors.data).any()
+
+
+@pytest.mark.integration
+def test_standard_errors_are_nan_for_interpolated_states_and_zero_for_myopic_agents():
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 5
+    options["interpolation_points"] = 40
+    options["monte_carlo_standard_errors"] = True
+    state_space = get_solve_func(params, options)(params)
+
+    standard_errors = state_space.expected_value_functions_standard_errors
+    assert np.isnan(standard_errors.get_period(4)).all()
+    assert (standard_errors.get_period(0) > 0).all()
+
+    params.loc[("delta", "delta"), "value"] = 0
+    state_space = get_solve_func(params, options)(params)
+    assert (state_space.expected_value_functions_standard_errors.data == 0).all()
@@ -0,0 +1,86 @@
+"""Test the tuning of the number of draws and interpolation points."""
+import numpy as np
+import pytest
+
+from respy.solve import get_solve_func
+from respy.tests.random_model import simulate_truncated_data
+from respy.tests.utils import process_model_or_seed
+from respy.tuning import _compute_relative_deviations
+from respy.tuning import tune_monte_carlo_options
+
+
+@pytest.mark.integration
+def test_tuned_solution_draws_meet_tolerance():
+    params, options = process_model_or_seed("robinson_crusoe_extended")
+    options["solution_draws"] = 50
+
+    tuned_options, info = tune_monte_carlo_options(params, options, emax_tolerance=0.02)
+
+    assert tuned_options["solution_draws"] > options["solution_draws"]
+    assert tuned_options["estimation_draws"] == options["estimation_draws"]
+    assert "monte_carlo_standard_errors" not in tuned_options
+
+    state_space = get_solve_func(
+        params, {**tuned_options, "monte_carlo_standard_errors": True}
+    )(params)
+    relative_standard_errors = _compute_relative_deviations(
+        state_space.expected_value_functions_standard_errors.data,
+        state_space.expected_value_functions.data,
+    )
+
+    # The standard errors of the pilot are estimates themselves.
+    assert relative_standard_errors.max() < 0.02 * 1.2
+
+
+@pytest.mark.integration
+def test_tuned_estimation_draws_meet_tolerance():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["estimation_tau"] = 0.1
+    df = simulate_truncated_data(params, options)
+
+    tuned_options, info = tune_monte_carlo_options(
+        params, options, df, emax_tolerance=0.1, probability_tolerance=0.02
+    )
+
+    expected = np.ceil(
+        options["estimation_draws"] * (info["probability_standard_error"] / 0.02) ** 2
+    )
+    assert tuned_options["estimation_draws"] == expected
+
+
+@pytest.mark.integration
+def test_tuned_interpolation_points_meet_tolerance():
+    params, options = process_model_or_seed("kw_94_one")
+    options["n_periods"] = 10
+    options["solution_draws"] = 100
+
+    tuned_options, info = tune_monte_carlo_options(
+        params, options, emax_tolerance=0.02, interpolation_tolerance=0.05
+    )
+
+    points = tuned_options["interpolation_points"]
+    assert points > 0
+    assert all(
+        error > 0.05 for n, error in info["interpolation_errors"].items() if n < points
+    )
+
+    solutions = [
+        get_solve_func(params, {**tuned_options, "interpolation_points": n})(params)
+        for n in [-1, points]
+    ]
+    errors = _compute_relative_deviations(
+        solutions[1].expected_value_functions.data
+        - solutions[0].expected_value_functions.data,
+        solutions[0].expected_value_functions.data,
+    )
+    assert errors.max() == pytest.approx(info["interpolation_errors"][points])
+    assert errors.max() <= 0.05
+
+
+@pytest.mark.unit
+def test_tuning_raises_error_for_quadrature():
+    params, options = process_model_or_seed("robinson_crusoe_basic")
+    options["emax_integration"] = "gauss_hermite"
+
+    with pytest.raises(ValueError, match="Monte Carlo"):
+        tune_monte_carlo_options(params, options)
@@ -0,0 +1,270 @@
+r"""Tune the accuracy of the numerical integration and the interpolation.
+
+The expected value functions and the choice probabilities are simulated with
+``options["solution_draws"]`` and ``options["estimation_draws"]`` draws. The Monte
+Carlo standard error of a simulated average decreases with the square root of the
+number of draws. Thus, the standard errors of a pilot solution with ``n`` draws predict
+the number of draws which is necessary to reach a tolerance as
+
+.. math::
+
+    n^* = \left\lceil n \left(\frac{\hat{\sigma}}{\text{tol}}\right)^2
+          \right\rceil
+
+where :math:`\hat{\sigma}` is the largest standard error over all states or
+observations in the pilot.
+
+The error of the interpolation is measured against the full solution with the same
+draws such that it does not contain the Monte Carlo error.
+
+"""
+import math
+import tempfile
+
+import numpy as np
+
+from respy.config import DEFAULT_OPTIONS
+from respy.likelihood import get_log_like_func
+from respy.pre_processing.model_processing import process_params_and_options
+from respy.solve import get_solve_func
+
+
+def tune_monte_carlo_options(
+    params,
+    options,
+    df=None,
+    emax_tolerance=1e-3,
+    probability_tolerance=1e-2,
+    interpolation_tolerance=None,
+    interpolation_points_grid=None,
+):
+    """Find the smallest number of draws and interpolation points for a tolerance.
+
+    The function performs the following steps.
+
+    1. Solve the model with ``options["solution_draws"]`` and compute the Monte Carlo
+       standard errors of the expected value functions relative to their absolute
+       values. The number of solution draws is scaled such that the largest relative
+       standard error meets ``emax_tolerance``.
+
+    2. If ``df`` is given, evaluate the likelihood with ``options["estimation_draws"]``
+       and compute the standard errors of the simulated choice probabilities. The
+       number of estimation draws is scaled such that the largest standard error meets
+       ``probability_tolerance``.
+
+    3. If ``interpolation_tolerance`` is given, solve the model with the tuned number
+       of solution draws and with each number of interpolation points in
+       ``interpolation_points_grid``. The smallest number of points is chosen for which
+       the largest deviation of the expected value functions from the full solution
+       relative to their absolute values meets the tolerance. If no number of points is
+       sufficient, the model is solved without interpolation.
+
+    The standard errors treat the draws as independent and the coefficients of control
+    variates as known. Thus, they are only approximations with variance reduction.
+
+    Parameters
+    ----------
+    params : pandas.DataFrame
+        DataFrame containing model parameters.
+    options : dict
+        Dictionary containing model options.
+    df : pandas.DataFrame, default None
+        Data for the estimation. If None, the estimation draws are not tuned.
+    emax_tolerance : float, default 1e-3
+        Tolerance for the relative standard error of the expected value functions.
+    probability_tolerance : float, default 1e-2
+        Tolerance for the standard error of the simulated choice probabilities.
+    interpolation_tolerance : float, default None
+        Tolerance for the relative error of the interpolated expected value functions.
+        If None, the interpolation points are not tuned.
+    interpolation_points_grid : list of int, default None
+        Candidates for the number of interpolation points. By default, ten numbers are
+        spaced evenly on a log scale between the smallest number with which any period
+        is interpolated and the largest number of states in a period.
+
+    Returns
+    -------
+    options : dict
+        Copy of the options with tuned ``"solution_draws"``, ``"estimation_draws"`` and
+        ``"interpolation_points"``.
+    info : dict
+        Contains the largest standard errors of the pilot, ``"emax_standard_error"``
+        and ``"probability_standard_error"``, and the largest relative errors of the
+        interpolation for each evaluated number of points, ``"interpolation_errors"``.
+
+    Raises
+    ------
+    ValueError
+        If the integration is not done by Monte Carlo simulation or if the shocks are
+        not normally distributed.
+
+    Examples
+    --------
+    >>> import respy as rp
+    >>> params, options = rp.get_example_model("robinson_crusoe_basic", with_data=False)
+    >>> tuned_options, info = rp.tune_monte_carlo_options(
+    ...     params, options, emax_tolerance=0.1
+    ... )
+    >>> tuned_options["solution_draws"] < options["solution_draws"]
+    True
+
+    """
+    optim_paras, _ = process_params_and_options(params, options)
+    emax_integration = options.get(
+        "emax_integration", DEFAULT_OPTIONS["emax_integration"]
+    )
+    if emax_integration != "monte_carlo":
+        raise ValueError("Only Monte Carlo integration can be tuned.")
+    if optim_paras["shocks_distribution"] != "normal":
+        raise ValueError(
+            "Only models with normal shocks can be tuned. Models with extreme value "
+            "shocks do not need draws."
+        )
+
+    user_options = options
+    options = {
+        **options,
+        "monte_carlo_standard_errors": True,
+        "solution_draws": options.get(
+            "solution_draws", DEFAULT_OPTIONS["solution_draws"]
+        ),
+        "estimation_draws": options.get(
+            "estimation_draws", DEFAULT_OPTIONS["estimation_draws"]
+        ),
+    }
+    info = {}
+
+    state_space = get_solve_func(params, {**options, "interpolation_points": -1})(
+        params
+    )
+    relative_standard_errors = _compute_relative_deviations(
+        state_space.expected_value_functions_standard_errors.data,
+        state_space.expected_value_functions.data,
+    )
+    info["emax_standard_error"] = relative_standard_errors.max(initial=0)
+    options["solution_draws"] = _compute_necessary_draws(
+        options["solution_draws"], info["emax_standard_error"], emax_tolerance
+    )
+
+    if df is not None:
+        log_like = get_log_like_func(params, options, df, return_scalar=False)
+        standard_errors = log_like(params)["choice_probability_standard_errors"]
+        info["probability_standard_error"] = standard_errors.max()
+        options["estimation_draws"] = _compute_necessary_draws(
+            options["estimation_draws"],
+            info["probability_standard_error"],
+            probability_tolerance,
+        )
+
+    if interpolation_tolerance is not None:
+        (
+            options["interpolation_points"],
+            info["interpolation_errors"],
+        ) = _tune_interpolation_points(
+            params, options, interpolation_tolerance, interpolation_points_grid
+        )
+
+    tuned_options = {
+        **user_options,
+        "solution_draws": options["solution_draws"],
+        "estimation_draws": options["estimation_draws"],
+    }
+    if interpolation_tolerance is not None:
+        tuned_options["interpolation_points"] = options["interpolation_points"]
+
+    return tuned_options, info
+
+
+def _tune_interpolation_points(params, options, tolerance, grid):
+    """Find the smallest number of interpolation points which meets the tolerance.
+
+    The state space is created once and shared by all solutions with the state space
+    cache.
+
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        options = {
+            **options,
+            "monte_carlo_standard_errors": False,
+            "state_space_cache": options.get("state_space_cache") or directory,
+        }
+        state_space = get_solve_func(params, {**options, "interpolation_points": -1})(
+            params
+        )
+        expected_value_functions = state_space.expected_value_functions.data.copy()
+
+        if grid is None:
+            grid = _create_interpolation_points_grid(state_space)
+
+        errors = {}
+        interpolation_points = -1
+        for n_points in sorted(grid):
+            state_space = get_solve_func(
+                params, {**options, "interpolation_points": int(n_points)}
+            )(params)
+            errors[int(n_points)] = _compute_relative_deviations(
+                state_space.expected_value_functions.data - expected_value_functions,
+                expected_value_functions,
+            ).max(initial=0)
+            if errors[int(n_points)] <= tolerance:
+                interpolation_points = int(n_points)
+                break
+
+    return interpolation_points, errors
+
+
+def _create_interpolation_points_grid(state_space, n_points=10):
+    """Create a grid of interpolation points which lead to interpolation.
+
+    A period is interpolated if the number of points is smaller than the number of
+    states in the period and at least twice the number of dense keys in the period.
+
+    """
+    periods = sorted(state_space.period_to_dense_keys)
+    n_states = np.array(
+        [
+            sum(
+                len(state_space.dense_key_to_core_indices[key])
+                for key in state_space.period_to_dense_keys[period]
+            )
+            for period in periods
+        ]
+    )
+    n_keys = np.array(
+        [len(state_space.period_to_dense_keys[period]) for period in periods]
+    )
+
+    can_be_interpolated = n_states > 2 * n_keys
+    if not can_be_interpolated.any():
+        return []
+
+    lower = (2 * n_keys[can_be_interpolated]).min()
+    upper = n_states[can_be_interpolated].max() - 1
+    grid = np.unique(np.geomspace(lower, upper, n_points).astype(int))
+
+    return grid.tolist()
+
+
+def _compute_necessary_draws(n_draws, standard_error, tolerance):
+    """Compute the number of draws to reduce the standard error below the tolerance.
+
+    Examples
+    --------
+    >>> _compute_necessary_draws(100, 0.02, 0.01)
+    400
+    >>> _compute_necessary_draws(100, 0, 0.01)
+    1
+
+    """
+    return max(math.ceil(n_draws * (standard_error / tolerance) ** 2), 1)
+
+
+def _compute_relative_deviations(deviations, values):
+    """Compute absolute deviations relative to the absolute values.
+
+    Values of zero are exact and excluded. NaNs belong to interpolated states and are
+    excluded as well.
+
+    """
+    is_valid = (values != 0) & ~np.isnan(deviations)
+    return np.abs(deviations[is_valid]) / np.abs(values[is_valid])